@@ -0,0 +1,301 @@
+import argparse
+import hashlib
+import json
+import math
+import threading
+import warnings
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Hashable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from preprocess_data import OUTPUT_PATH
+from utils.bank_store import get_bank_store
+from utils.compact import to_float64
+from utils.data_loader import LOWER_IS_BETTER, MARKET_STANDARDS, get_dataset_version
+from utils.metric_catalog import get_metric, get_metric_type
+from utils.ratios import RATIO_REGISTRY, get_ratio_view
+from utils.refresher import start_refresher
+from utils.shared_dataset import SharedDataset, get_shared_dataset
+from utils.thresholds import evaluate_thresholds, get_breach_summary
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8502
+MAX_CACHED_RESPONSES = 1024
+GRADE_LABELS = np.array(['C', 'B', 'A'])
+
+def _to_json_list(values: np.ndarray) -> List[Optional[float]]:
+    """Convert values to a JSON-safe list: NaN and infinities become null."""
+    return [v if math.isfinite(v) else None for v in np.asarray(values, dtype=float).tolist()]
+
+class ApiData:
+    """Everything the endpoints read for one dataset version, computed once.
+
+    Pass/fail uses the market standards. Grades follow the financial analysis app's
+    quartile rule: A at or above the 75th percentile, B at or above the 25th, C
+    below, with lower-is-better metrics ranked in reverse.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.version = get_dataset_version(df)
+        self.store = get_bank_store(df)
+        ratio_view = get_ratio_view(df)
+        numeric = df.select_dtypes(include='number').columns.tolist()
+        self.metrics = numeric + [r for r in ratio_view.available(RATIO_REGISTRY) if r not in numeric]
+        self._positions = {metric: i for i, metric in enumerate(self.metrics)}
+        self.values = np.column_stack([
+            to_float64(ratio_view.get(metric)) for metric in self.metrics
+        ]) if self.metrics else np.zeros((len(df), 0))
+
+        passed = evaluate_thresholds(pd.DataFrame(self.values, columns=self.metrics))
+        self.passed = {metric: self._pass_flags(passed[metric].to_numpy(), metric) for metric in passed.columns}
+        self.grades = self._grade(self.values)
+
+    def _pass_flags(self, passed: np.ndarray, metric: str) -> np.ndarray:
+        # A missing value is neither a pass nor a breach, matching /breaches
+        flags = passed.astype(object)
+        flags[np.isnan(self.values[:, self._positions[metric]])] = None
+        return flags
+
+    def _grade(self, values: np.ndarray) -> np.ndarray:
+        signs = np.array([-1.0 if m in LOWER_IS_BETTER else 1.0 for m in self.metrics])
+        ranked = values * signs
+        with warnings.catch_warnings(), np.errstate(invalid='ignore'):
+            # Metrics no bank reports have NaN cut points, and every bank there is ungraded
+            warnings.simplefilter('ignore', RuntimeWarning)
+            p25, p75 = np.nanpercentile(ranked, [25, 75], axis=0) if len(ranked) else (signs, signs)
+            positions = (ranked >= p25).astype(np.int8) + (ranked >= p75)
+        grades = GRADE_LABELS[positions].astype(object)
+        grades[np.isnan(ranked)] = None
+        return grades
+
+    def has_metric(self, metric: str) -> bool:
+        return metric in self._positions
+
+    def describe_metric(self, metric: str) -> Dict:
+        entry = get_metric(metric)
+        return {
+            'metric': metric,
+            'type': get_metric_type(metric),
+            'threshold': MARKET_STANDARDS.get(metric),
+            'direction': 'lower' if metric in LOWER_IS_BETTER else 'higher',
+            'groups': [] if entry is None else list(entry.groups)
+        }
+
+    def metric_values(self, metric: str) -> Dict:
+        """Get every bank's value, pass/fail and grade for one metric."""
+        column = self._positions[metric]
+        passed = self.passed.get(metric)
+        return {
+            **self.describe_metric(metric),
+            'banks': [
+                {
+                    'bank': bank,
+                    'value': value,
+                    'passed': None if passed is None else passed[i],
+                    'grade': self.grades[i, column]
+                }
+                for i, (bank, value) in enumerate(zip(
+                    self.df['Bank Name'].tolist(), _to_json_list(self.values[:, column])
+                ))
+            ]
+        }
+
+    def bank_analysis(self, bank_name: str) -> Dict:
+        """Get one bank's value, threshold, pass/fail and grade for every metric."""
+        position = self.store.position(bank_name)
+        values = _to_json_list(self.values[position])
+        analysis = {}
+        for column, metric in enumerate(self.metrics):
+            passed = self.passed.get(metric)
+            analysis[metric] = {
+                'value': values[column],
+                'threshold': MARKET_STANDARDS.get(metric),
+                'passed': None if passed is None else passed[position],
+                'grade': self.grades[position, column]
+            }
+        return {'bank': bank_name, 'metrics': analysis}
+
+    def breaches(self, bank_name: Optional[str] = None, metric: Optional[str] = None) -> List[Dict]:
+        """List the (bank, metric) pairs that fail their threshold, optionally for one bank or metric."""
+        breaches = get_breach_summary(pd.DataFrame(self.values, columns=self.metrics).assign(
+            **{'Bank Name': self.df['Bank Name'].to_numpy()}
+        ))
+        if bank_name is not None:
+            breaches = breaches[breaches['Bank Name'] == bank_name]
+        if metric is not None:
+            breaches = breaches[breaches['Metric'] == metric]
+        return [
+            {'bank': bank, 'metric': name, 'value': value, 'threshold': threshold}
+            for bank, name, value, threshold in zip(
+                breaches['Bank Name'].tolist(), breaches['Metric'].tolist(),
+                _to_json_list(breaches['Value'].to_numpy()), breaches['Threshold'].tolist()
+            )
+        ]
+
+class ResponseCache:
+    """Thread-safe LRU cache of encoded responses and their ETags.
+
+    Keys start with the dataset version, so a new version never serves a stale
+    response; the old version's entries age out.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESPONSES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Tuple[int, bytes, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[int, bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, status: int, payload) -> Tuple[int, bytes, str]:
+        body = json.dumps(payload).encode('utf-8')
+        entry = (status, body, f'"{hashlib.sha1(body).hexdigest()[:20]}"')
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+class MetricsApi:
+    """Routes requests to ApiData for the dataset's current version and caches the responses."""
+
+    def __init__(self, dataset: SharedDataset):
+        self.dataset = dataset
+        self.cache = ResponseCache()
+        self._data: Optional[ApiData] = None
+        self._data_lock = threading.Lock()
+
+    def get_data(self) -> ApiData:
+        """Get the ApiData for the current version, building it once per version."""
+        frame = self.dataset.current()
+        if frame is None:
+            frame = self.dataset.get()
+        data = self._data
+        if data is None or data.version != get_dataset_version(frame):
+            with self._data_lock:
+                if self._data is None or self._data.version != get_dataset_version(frame):
+                    self._data = ApiData(frame)
+                data = self._data
+        return data
+
+    def respond(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, bytes, str]:
+        """Get the status, JSON body and ETag for a request, from the cache when possible."""
+        data = self.get_data()
+        key = (data.version, path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        entry = self.cache.get(key)
+        if entry is None:
+            status, payload = self.route(data, path, query)
+            entry = self.cache.put(key, status, payload)
+        return entry
+
+    def route(self, data: ApiData, path: str, query: Dict[str, List[str]]) -> Tuple[int, object]:
+        # Split before unquoting, so bank names may contain an encoded slash
+        parts = [unquote(part) for part in path.strip('/').split('/') if part]
+        first = lambda name: query[name][0] if name in query else None
+
+        if parts == ['health']:
+            return HTTPStatus.OK, {
+                'dataset_version': data.version,
+                'generation': self.dataset.generation,
+                'banks': len(data.df)
+            }
+        if parts == ['metrics']:
+            return HTTPStatus.OK, [data.describe_metric(metric) for metric in data.metrics]
+        if len(parts) == 2 and parts[0] == 'metrics':
+            if not data.has_metric(parts[1]):
+                return HTTPStatus.NOT_FOUND, {'error': f"Unknown metric: {parts[1]}"}
+            return HTTPStatus.OK, data.metric_values(parts[1])
+        if parts == ['banks']:
+            return HTTPStatus.OK, data.df['Bank Name'].tolist()
+        if len(parts) == 2 and parts[0] == 'banks':
+            if parts[1] not in data.store:
+                return HTTPStatus.NOT_FOUND, {'error': f"Unknown bank: {parts[1]}"}
+            return HTTPStatus.OK, data.bank_analysis(parts[1])
+        if parts == ['breaches']:
+            return HTTPStatus.OK, data.breaches(first('bank'), first('metric'))
+        return HTTPStatus.NOT_FOUND, {'error': f"Unknown endpoint: /{'/'.join(parts)}"}
+
+def make_handler(api: MetricsApi, quiet: bool = False):
+    """Build a request handler class bound to an API instance."""
+
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive lets clients reuse connections between requests; headers and body
+        # go out in separate writes, which Nagle's algorithm would hold back
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            try:
+                status, body, etag = api.respond(url.path, parse_qs(url.query))
+            except Exception as e:
+                status, body, etag = HTTPStatus.INTERNAL_SERVER_ERROR, json.dumps({'error': str(e)}).encode(), None
+
+            if etag is not None and status == HTTPStatus.OK and self._matches(etag):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if etag is not None:
+                self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _matches(self, etag: str) -> bool:
+            header = self.headers.get('If-None-Match')
+            if not header:
+                return False
+            tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+            return '*' in tags or etag in tags
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    return Handler
+
+def serve(data_path: str = OUTPUT_PATH, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          quiet: bool = False) -> None:
+    """Serve the metrics API until interrupted, refreshing the data in the background."""
+    dataset = get_shared_dataset(data_path, compact=True)
+    start_refresher(dataset)
+    api = MetricsApi(dataset)
+    api.get_data()
+
+    server = ThreadingHTTPServer((host, port), make_handler(api, quiet))
+    server.daemon_threads = True
+    print(f"Serving {data_path} on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve bank metrics, analysis and breaches over HTTP.")
+    parser.add_argument('--data', default=OUTPUT_PATH, help="Processed data file to serve")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument('--quiet', action='store_true', help="Don't log every request")
+    args = parser.parse_args()
+    serve(args.data, args.host, args.port, args.quiet)
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,37 @@
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 from pathlib import Path
 import sys
+from typing import Optional
 
 # Add the project root to Python path
 sys.path.append(str(Path(__file__).parent))
 
 from utils.styling import get_css_styles, get_plotly_config, get_color_scale
 from utils.data_loader import (
-    load_data,
-    check_stress_threshold,
-    get_market_standards
+    get_market_standards,
+    get_dataset_version
+)
+from utils.metric_catalog import available_metrics, get_group
+from utils.refresher import start_refresher
+from utils.shared_dataset import get_shared_dataset
+from utils.thresholds import evaluate_thresholds, get_breach_summary
+from utils.bank_store import get_bank_store
+from utils.compact import to_float64
+from utils.ratios import get_ratio_view
+from utils.figure_cache import get_cached_figure
+from utils.peers import DEFAULT_PEERS, MAX_PEERS, get_peer_index
+from utils.correlation import METHODS, build_heatmap, build_pair_scatter, get_correlation
+from utils.stress import SCENARIOS, STRESSED_METRICS, MONTE_CARLO_METRIC, can_project, get_stress_frame
+from utils.instrumentation import start_run, finish_run, stage, mark_first_chart, render_stage_panel
+from utils.chart_reduction import (
+    LARGE_UNIVERSE_THRESHOLD,
+    LARGE_UNIVERSE_MODES,
+    build_large_universe_figure,
+    get_axis_titles,
+    resolve_chart_mode
 )
 
 # Page configuration
@@ -24,42 +44,80 @@ st.set_page_config(
 # Apply custom styling
 st.markdown(get_css_styles(), unsafe_allow_html=True)
 
-def create_bar_chart(df: pd.DataFrame, metric: str) -> go.Figure:
+def create_bar_chart(df: pd.DataFrame, metric: str, selected_bank: Optional[str] = None,
+                     mode: str = 'auto') -> go.Figure:
+    # Figures are shared across reruns and sessions until the dataset changes
+    mode = resolve_chart_mode(len(df), mode)
+    key = (get_dataset_version(df), metric, mode, selected_bank)
+    return get_cached_figure(key, lambda: build_bar_chart(df, metric, selected_bank, mode))
+
+def build_bar_chart(df: pd.DataFrame, metric: str, selected_bank: Optional[str] = None,
+                    mode: str = 'bars') -> go.Figure:
     colors = get_color_scale()
     standards = get_market_standards()
 
-    bar_colors = [colors['neutral']] * len(df)
+    if metric in standards:
+        passed = evaluate_thresholds(df[[metric]])[metric].to_numpy()
+        bar_colors = np.where(passed, colors['pass'], colors['fail'])
+    else:
+        bar_colors = [colors['neutral']] * len(df)
 
-    fig = go.Figure()
+    selected_position = None
+    if selected_bank is not None:
+        selected_position = get_bank_store(df).position(selected_bank)
 
-    fig.add_trace(
-        go.Bar(
-            x=df['Bank Name'],
-            y=df[metric],
-            marker_color=bar_colors,
-            text=df[metric].round(3),
-            textposition='auto',
-            name='Bank Values'
-        )
-    )
+    if mode == 'bars':
+        # Outline the selected bank's bar
+        line_widths = np.zeros(len(df))
+        if selected_position is not None:
+            line_widths[selected_position] = 3
+
+        # Compacted columns are float32; label them at their stored precision
+        values = to_float64(df[metric])
+        fig = go.Figure()
 
-    if metric in standards:
         fig.add_trace(
-            go.Scatter(
+            go.Bar(
                 x=df['Bank Name'],
-                y=[standards[metric]] * len(df),
-                mode='lines',
-                name='Market Standard',
-                line=dict(color='red', width=2, dash='dash'),
+                y=values,
+                marker_color=bar_colors,
+                marker_line=dict(color='#ffffff', width=line_widths),
+                text=np.round(values, 3),
+                textposition='auto',
+                name='Bank Values'
             )
         )
 
+        if metric in standards:
+            fig.add_trace(
+                go.Scatter(
+                    x=df['Bank Name'],
+                    y=[standards[metric]] * len(df),
+                    mode='lines',
+                    name='Market Standard',
+                    line=dict(color='red', width=2, dash='dash'),
+                )
+            )
+    else:
+        # Reduce large universes on the server so the payload stays bounded
+        fig = build_large_universe_figure(
+            df['Bank Name'].to_numpy(),
+            df[metric].to_numpy(dtype=float),
+            metric,
+            mode,
+            bar_colors=bar_colors,
+            standard=standards.get(metric),
+            highlight_position=selected_position,
+            colors=colors
+        )
+
+    xaxis_title, yaxis_title = get_axis_titles(mode, metric)
     config = get_plotly_config()
     fig.update_layout(
         **config['layout'],
         title=f"{metric} by Bank",
-        xaxis_title="Banks",
-        yaxis_title=metric,
+        xaxis_title=xaxis_title,
+        yaxis_title=yaxis_title,
         height=400
     )
 
@@ -68,66 +126,170 @@ def create_bar_chart(df: pd.DataFrame, metric: str) -> go.Figure:
 def main():
     st.markdown('<h1 class="main-title">Bank Stax Pro</h1>', unsafe_allow_html=True)
 
+    # Stage timings are always logged; the panel also turns on memory tracing
+    show_stages = st.sidebar.checkbox("Show stage timings", value=False)
+    recorder = start_run('bank_stax_pro', trace_memory=show_stages)
+
     try:
-        df = pd.read_excel("data/bank_data_processed.xlsx")
+        render_dashboard()
+    finally:
+        finish_run(recorder)
+        if show_stages:
+            render_stage_panel(recorder)
+
+def render_dashboard():
+    try:
+        # One frozen copy per server process; each rerun gets a zero-copy read-only view.
+        # New versions are loaded and swapped in by a background refresher.
+        dataset = get_shared_dataset("data/bank_data_processed.xlsx", compact=True)
+        refresher = start_refresher(dataset)
+        df = dataset.get()
+        if refresher.last_error:
+            st.warning(f"Showing the last good data; the latest file could not be loaded: {refresher.last_error}")
+
+        failures = df.attrs.get('ingest_failures')
+        if failures:
+            st.warning(f"{len(failures)} files could not be loaded: " + ", ".join(sorted(failures)))
+
+        quality = df.attrs.get('quality_report')
+        if quality is not None and len(quality.issues):
+            bad_rows = int(quality.bad_rows.sum())
+            with st.expander(f"Data quality: {len(quality.issues)} issues, {bad_rows} rows with errors"):
+                st.dataframe(quality.issues, use_container_width=True, hide_index=True)
 
         bank_names = df['Bank Name'].tolist()
         selected_bank = st.selectbox("Select Bank for Peer Comparison", bank_names)
 
-        key_financials = [
-            'PAT',
-            'Depreciation',
-            'Total Liabilities (excluding equity)',
-            'Cash & cash equivalents',
-            'Total Assets',
-            'Current Assets',
-            'Current Liabilities',
-            'Accounts Receivables',
-            'Marketable Securities',
-            'Core Deposits',
-            'Total Deposits',
-            'Loans',
-            'Non performing assets',
-            'Tier-1 Capital',
-            'Tier-2 capital',
-            'Risk weighted assets'
-        ]
-        available_financials = [f for f in key_financials if f in df.columns]
+        # Narrow every chart to the selected bank and its nearest peers; 0 keeps all banks
+        peer_count = 0
+        if len(df) > 1:
+            peer_count = st.slider(
+                "Nearest peers",
+                min_value=0,
+                max_value=min(MAX_PEERS, len(df) - 1),
+                value=min(DEFAULT_PEERS, len(df) - 1),
+                help="Banks most similar on key financials and key metrics; 0 compares against every bank"
+            )
+
+        def narrow(frame: pd.DataFrame) -> pd.DataFrame:
+            if peer_count == 0:
+                return frame
+            return get_peer_index(df).peer_frame(frame, selected_bank, peer_count)
+
+        if peer_count:
+            with stage('peer_search'):
+                peer_table = get_peer_index(df).peer_table(selected_bank, peer_count)
+            with st.expander(f"Peer group ({len(peer_table)} banks)"):
+                st.dataframe(peer_table, use_container_width=True, hide_index=True)
+        chart_df = narrow(df)
+
+        chart_mode = 'auto'
+        if len(chart_df) > LARGE_UNIVERSE_THRESHOLD:
+            chart_mode = st.radio(
+                f"Chart view ({len(chart_df)} banks)",
+                LARGE_UNIVERSE_MODES,
+                format_func=lambda m: {
+                    'extremes': 'Top and bottom banks',
+                    'quantiles': 'Percentile buckets',
+                    'histogram': 'Histogram',
+                    'points': 'All banks (WebGL)'
+                }[m],
+                horizontal=True
+            )
+
+        available_financials = available_metrics(df.columns, 'key_financials')
         selected_financial = st.selectbox("Select Key Financial", available_financials)
 
-        fig_financial = create_bar_chart(df, selected_financial)
-        st.plotly_chart(fig_financial, use_container_width=True)
+        with stage('build_chart:financial'):
+            fig_financial = create_bar_chart(chart_df, selected_financial, selected_bank, chart_mode)
+        with stage('render_chart:financial'):
+            st.plotly_chart(fig_financial, use_container_width=True)
+        mark_first_chart()
 
         # Add Key Metrics section
         st.subheader("Key Metrics")
-        key_metrics = [
-            'Core Deposits to Total Deposits',
-            'NPAs to Total Loans',
-            'Liquidity Ratio',
-            'Capital Adequacy Ratio',
-            'Solvency Ratio',
-            'Loans to Deposit Ratio'
-        ]
-        available_metrics = [m for m in key_metrics if m in df.columns]
-        selected_metric = st.selectbox("Select Key Metric", available_metrics)
-
-        fig_metric = create_bar_chart(df, selected_metric)
-        st.plotly_chart(fig_metric, use_container_width=True)
+        # Ratios missing from the file are computed on first selection and memoized
+        ratio_view = get_ratio_view(df)
+        key_metrics = ratio_view.available(get_group('key_metrics'))
+        selected_metric = st.selectbox("Select Key Metric", key_metrics)
+
+        with stage('compute_ratios'):
+            metric_frame = narrow(ratio_view.frame([selected_metric]))
+        with stage('build_chart:metric'):
+            fig_metric = create_bar_chart(metric_frame, selected_metric, selected_bank, chart_mode)
+        with stage('render_chart:metric'):
+            st.plotly_chart(fig_metric, use_container_width=True)
 
         # Add CCAR Stress Test Analysis section
         st.subheader("CCAR Stress Test Analysis")
-        ccar_metrics = [
-            'Common Equity Tier 1 Capital',
-            'Tier 1 Capital Ratio',
-            'Total Capital',
-            'Leverage Ratio',
-            'Supplementary Tier 1'
-        ]
-        available_ccar = [c for c in ccar_metrics if c in df.columns]
-        selected_ccar = st.selectbox("Select CCAR Metric", available_ccar)
-
-        fig_ccar = create_bar_chart(df, selected_ccar)
-        st.plotly_chart(fig_ccar, use_container_width=True)
+        available_ccar = list(available_metrics(df.columns, 'ccar'))
+        stressed_metrics = list(STRESSED_METRICS) + [MONTE_CARLO_METRIC] if can_project(df) else []
+        selected_ccar = st.selectbox("Select CCAR Metric", available_ccar + stressed_metrics)
+
+        ccar_frame = chart_df
+        if selected_ccar in stressed_metrics:
+            # Projections are cached per dataset version and scenario
+            scenario_names = [s.name for s in SCENARIOS]
+            scenario = st.selectbox("Stress Scenario", scenario_names, index=len(scenario_names) - 1)
+            with stage('stress_projection'):
+                ccar_frame = narrow(get_stress_frame(df, scenario))
+            st.caption("Lowest ratio over the nine-quarter horizon; the Monte Carlo metric is "
+                       "the 5th percentile across simulated paths.")
+
+        with stage('build_chart:ccar'):
+            fig_ccar = create_bar_chart(ccar_frame, selected_ccar, selected_bank, chart_mode)
+        with stage('render_chart:ccar'):
+            st.plotly_chart(fig_ccar, use_container_width=True)
+
+        with stage('breach_summary'):
+            breaches = get_breach_summary(df)
+        if not breaches.empty:
+            st.caption(f"{len(breaches)} threshold breaches across {breaches['Bank Name'].nunique()} banks")
+            st.dataframe(breaches, use_container_width=True, hide_index=True)
+
+        # Add Metric Correlations section
+        st.subheader("Metric Correlations")
+        method = st.radio("Correlation", METHODS, format_func=str.title, horizontal=True)
+        with stage('correlation'):
+            correlation = get_correlation(df, method)
+        if len(correlation.metrics) >= 2:
+            config = get_plotly_config()
+            with stage('build_chart:correlation'):
+                fig_heatmap = get_cached_figure(
+                    (correlation.version, 'correlation', method),
+                    lambda: build_heatmap(correlation).update_layout(
+                        **config['layout'],
+                        title=f"{method.title()} correlation across {len(correlation.metrics)} metrics",
+                        height=max(500, 14 * len(correlation.metrics))
+                    )
+                )
+            with stage('render_chart:correlation'):
+                st.plotly_chart(fig_heatmap, use_container_width=True)
+            with st.expander("Strongest correlations"):
+                st.dataframe(correlation.strongest_pairs(), use_container_width=True, hide_index=True)
+
+            # Drill into one pair; large universes are sampled on the server
+            col_x, col_y = st.columns(2)
+            pair_x = col_x.selectbox("Metric", correlation.metrics)
+            pair_y = col_y.selectbox("Versus", correlation.metrics, index=1)
+            r, banks = correlation.pair(pair_x, pair_y)
+            st.caption(f"{method.title()} r = {r:.3f} across {banks} banks reporting both metrics"
+                       if not np.isnan(r) else f"Too few banks report both metrics ({banks})")
+            with stage('build_chart:pair'):
+                fig_pair = get_cached_figure(
+                    (correlation.version, 'pair', pair_x, pair_y, selected_bank),
+                    lambda: build_pair_scatter(
+                        df, pair_x, pair_y, get_bank_store(df).position(selected_bank), colors=get_color_scale()
+                    ).update_layout(
+                        **config['layout'],
+                        title=f"{pair_y} vs {pair_x}",
+                        xaxis_title=pair_x,
+                        yaxis_title=pair_y,
+                        height=450
+                    )
+                )
+            with stage('render_chart:pair'):
+                st.plotly_chart(fig_pair, use_container_width=True)
 
     except Exception as e:
         st.error(f"Error: {str(e)}")
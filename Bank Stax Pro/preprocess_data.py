@@ -1,43 +1,177 @@
+import argparse
+import os
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 
+from utils.data_loader import load_data
+from utils.ratios import RatioView, PRECOMPUTED_RATIOS, RATIO_REGISTRY
+
+INPUT_PATH = 'data/bank_data.xlsx'
+OUTPUT_PATH = 'data/bank_data_processed.xlsx'
+KEY_COLUMN = 'Bank Name'
+
+def get_ratio_columns(df: pd.DataFrame) -> list:
+    """Get the ratios calculate_ratios writes for this input.
+
+    The precomputed ratios are always recalculated. Every other registered ratio
+    that the input lacks is filled in too, so the app doesn't compute ratios at
+    runtime. Ratios whose inputs are missing are skipped.
+    """
+    view = RatioView(df, recompute=PRECOMPUTED_RATIOS)
+    names = PRECOMPUTED_RATIOS + [
+        name for name in RATIO_REGISTRY if name not in df.columns and name not in PRECOMPUTED_RATIOS
+    ]
+    return view.available(names)
+
 def calculate_ratios(df: pd.DataFrame) -> pd.DataFrame:
-    """Calculate financial ratios from raw data."""
-    df_with_ratios = df.copy()
-    
-    # Calculate Core Deposits to Total Deposits ratio
-    if 'Core Deposits' in df.columns and 'Total Deposits' in df.columns:
-        df_with_ratios['Core Deposits to Total Deposits'] = df['Core Deposits'] / df['Total Deposits']
-    
-    # Calculate NPAs to Total Loans ratio
-    if 'Non performing assets' in df.columns and 'Loans' in df.columns:
-        df_with_ratios['NPAs to Total Loans'] = df['Non performing assets'] / df['Loans']
-    
-    # Calculate Loans to Deposit ratio
-    if 'Loans' in df.columns and 'Total Deposits' in df.columns:
-        df_with_ratios['Loans to Deposit Ratio'] = df['Loans'] / df['Total Deposits']
-    
-    # Calculate Solvency Ratio
-    if 'Total Assets' in df.columns and 'Total Liabilities (excluding equity)' in df.columns:
-        df_with_ratios['Solvency Ratio'] = df['Total Assets'] / df['Total Liabilities (excluding equity)']
-    
-    return df_with_ratios
-
-# Read the original data
-print("Reading original data...")
-df = pd.read_excel('data/bank_data.xlsx')
-print("\nOriginal columns:", df.columns.tolist())
-
-# Calculate ratios
-print("\nCalculating ratios...")
-df_processed = calculate_ratios(df)
-print("\nProcessed columns:", df_processed.columns.tolist())
-
-# Save processed data
-print("\nSaving processed data...")
-df_processed.to_excel('data/bank_data_processed.xlsx', index=False)
-print("Done!")
-
-# Print first few rows of processed data
-print("\nFirst few rows of processed data:")
-print(df_processed.head())
+    """Calculate the financial ratios from raw data; formulas live in the ratio registry."""
+    view = RatioView(df, recompute=PRECOMPUTED_RATIOS)
+    ratios = {name: view.get(name) for name in get_ratio_columns(df)}
+    return df.assign(**ratios)
+
+def get_fingerprint_path(output_path: str) -> Path:
+    """Get the path of the per-bank fingerprint file kept next to the processed output."""
+    output = Path(output_path)
+    return output.with_name(f"{output.stem}.fingerprints.csv")
+
+def fingerprint_rows(df: pd.DataFrame) -> pd.Series:
+    """Hash each bank's input line items into one fingerprint per bank.
+
+    Values are hashed in a canonical form, numbers as float64 and everything else
+    as text, so a dtype change alone, such as an int column turning float when
+    another bank's value goes missing, doesn't mark every bank as changed.
+    """
+    canonical = pd.DataFrame({
+        column: series.to_numpy(dtype=np.float64, na_value=np.nan)
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+        else series.astype(str)
+        for column, series in df.items()
+    })
+    hashes = pd.util.hash_pandas_object(canonical, index=False)
+    return pd.Series(hashes.to_numpy(), index=df[KEY_COLUMN].to_numpy(), name='fingerprint')
+
+def write_excel_atomic(df: pd.DataFrame, output_path: str) -> None:
+    """Write the workbook to a temporary file and move it into place in one step."""
+    output = Path(output_path)
+    tmp_path = output.with_name(f".{output.stem}.tmp{output.suffix}")
+    df.to_excel(tmp_path, index=False)
+    os.replace(tmp_path, output)
+
+def save_fingerprints(fingerprints: pd.Series, columns: list, output_path: str) -> None:
+    """Save the fingerprints together with the input schema they were taken over."""
+    frame = fingerprints.rename_axis(KEY_COLUMN).reset_index()
+    path = get_fingerprint_path(output_path)
+    with open(path, 'w') as f:
+        f.write('# columns: ' + '|'.join(map(str, columns)) + '\n')
+        frame.to_csv(f, index=False)
+
+def load_fingerprints(output_path: str):
+    """Load saved fingerprints and their input schema, or (None, None) if there are none."""
+    path = get_fingerprint_path(output_path)
+    if not path.exists() or not Path(output_path).exists():
+        return None, None
+    with open(path, 'r') as f:
+        columns = f.readline()[len('# columns: '):].rstrip('\n').split('|')
+        frame = pd.read_csv(f, dtype={'fingerprint': np.uint64})
+    return frame.set_index(KEY_COLUMN)['fingerprint'], columns
+
+def preprocess_full(df: pd.DataFrame, output_path: str) -> dict:
+    """Recompute every ratio and rewrite the processed output."""
+    df_processed = calculate_ratios(df)
+    write_excel_atomic(df_processed, output_path)
+    save_fingerprints(fingerprint_rows(df), df.columns.tolist(), output_path)
+    return {
+        'mode': 'full',
+        'added': df[KEY_COLUMN].tolist(),
+        'changed': [],
+        'removed': [],
+        'unchanged': 0
+    }
+
+def preprocess_incremental(df: pd.DataFrame, output_path: str) -> dict:
+    """Recompute ratios only for new or changed banks and merge them into the processed output.
+
+    Only the ratio work scales with the change. The processed workbook is still read
+    in full (from its snapshot when unchanged) and rewritten in full, since Excel
+    files can't be updated row by row; a run with no changes writes nothing.
+    """
+    old_fingerprints, old_columns = load_fingerprints(output_path)
+    if old_fingerprints is None or old_columns != list(map(str, df.columns)):
+        # No usable previous run, or the input schema changed
+        return preprocess_full(df, output_path)
+    if df[KEY_COLUMN].duplicated().any():
+        raise ValueError(f"Incremental mode needs unique values in '{KEY_COLUMN}'")
+
+    fingerprints = fingerprint_rows(df)
+    is_new = ~fingerprints.index.isin(old_fingerprints.index)
+    is_changed = np.zeros(len(fingerprints), dtype=bool)
+    previous = old_fingerprints.reindex(fingerprints.index[~is_new]).to_numpy()
+    is_changed[~is_new] = previous != fingerprints.to_numpy()[~is_new]
+    touched = is_new | is_changed
+    removed = old_fingerprints.index.difference(fingerprints.index)
+
+    report = {
+        'mode': 'incremental',
+        'added': df[KEY_COLUMN][is_new].tolist(),
+        'changed': df[KEY_COLUMN][is_changed].tolist(),
+        'removed': removed.tolist(),
+        'unchanged': int((~touched).sum())
+    }
+
+    # The processed workbook is served from its snapshot when it is unchanged
+    processed = load_data(output_path)
+    if set(get_ratio_columns(df)) - set(processed.columns):
+        # Written before some ratios were registered; merging would leave gaps,
+        # and even unchanged input needs the new ratios filled in
+        return preprocess_full(df, output_path)
+    if not touched.any() and removed.empty:
+        return report
+
+    kept = processed[processed[KEY_COLUMN].isin(df[KEY_COLUMN][~touched])]
+    recomputed = calculate_ratios(df[touched])
+
+    # Merge and restore the input's bank order
+    merged = pd.concat([kept, recomputed], ignore_index=True)
+    merged = merged.set_index(KEY_COLUMN).loc[df[KEY_COLUMN]].reset_index()
+
+    write_excel_atomic(merged, output_path)
+    save_fingerprints(fingerprints, df.columns.tolist(), output_path)
+    return report
+
+def print_report(report: dict) -> None:
+    """Print which banks a preprocessing run touched."""
+    print(f"\nMode: {report['mode']}")
+    for key in ('added', 'changed', 'removed'):
+        names = report[key]
+        print(f"{key.capitalize()}: {len(names)}" + (f" ({', '.join(map(str, names))})" if names else ''))
+    print(f"Unchanged: {report['unchanged']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Calculate financial ratios for the bank data.")
+    parser.add_argument('--input', default=INPUT_PATH, help="Raw bank data workbook")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="Processed workbook to write")
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help="Only recompute ratios for banks whose line items changed since the last run"
+    )
+    args = parser.parse_args()
+
+    # Read the original data
+    print("Reading original data...")
+    df = load_data(args.input)
+    print("\nOriginal columns:", df.columns.tolist())
+
+    # Calculate ratios and save processed data
+    print("\nCalculating ratios...")
+    if args.incremental:
+        report = preprocess_incremental(df, args.output)
+    else:
+        report = preprocess_full(df, args.output)
+    print_report(report)
+    print("Done!")
+
+if __name__ == "__main__":
+    main()
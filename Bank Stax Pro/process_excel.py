@@ -1,19 +1,49 @@
+import argparse
+
 import pandas as pd
 
-# Read the Excel file
-df = pd.read_excel('Line items latest (1).xlsx')
+from utils.ingest import (
+    CHUNK_SIZE,
+    convert_workbook,
+    is_workbook_batch,
+    iter_workbook_chunks,
+    load_workbooks
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Promote the header row of line-items workbooks and save them.")
+    parser.add_argument('--input', default='Line items latest (1).xlsx',
+                        help="Line-items workbook, or a directory or glob of workbooks to combine")
+    parser.add_argument('--output', default='financial-dashboard/data/bank_data.xlsx', help="CSV or Excel file to write")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows parsed per chunk")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes used to parse a directory of workbooks (default: one per core)")
+    args = parser.parse_args()
 
-# Get the column names from the first row
-columns = df.iloc[0].tolist()
-columns[0] = 'Bank Name'  # Fix the first column name
+    if is_workbook_batch(args.input):
+        # Parse the workbooks in parallel and combine them, tagged with their source file
+        df, failures = load_workbooks(args.input, max_workers=args.workers, chunk_size=args.chunk_size)
+        if args.output.endswith('.csv'):
+            df.to_csv(args.output, index=False)
+        else:
+            df.to_excel(args.output, index=False)
+        rows = len(df)
+        for path, error in failures.items():
+            print(f"Failed: {path}: {error}")
+        print(f"Loaded {df['Source File'].nunique()} workbooks, {len(failures)} failed")
+    else:
+        # Stream the workbook into the output chunk by chunk
+        rows = convert_workbook(args.input, args.output, chunk_size=args.chunk_size)
 
-# Create new dataframe with proper column names
-df_clean = df.iloc[1:].copy()
-df_clean.columns = columns
+    if args.output.endswith('.csv'):
+        preview = pd.read_csv(args.output, nrows=5)
+    else:
+        preview = next(iter_workbook_chunks(args.output, chunk_size=5))
 
-# Save to Excel
-df_clean.to_excel('financial-dashboard/data/bank_data.xlsx', index=False)
+    print("Processed columns:", preview.columns.tolist())
+    print(f"\nRows written: {rows}")
+    print("\nFirst few rows:")
+    print(preview)
 
-print("Processed columns:", df_clean.columns.tolist())
-print("\nFirst few rows:")
-print(df_clean.head())
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from .data_loader import get_dataset_version
+
+MAX_CACHED_STORES = 8
+
+# Bank stores keyed by (dataset version, id column), oldest first
+_store_cache: Dict[Tuple[str, Optional[str]], 'BankStore'] = {}
+
+def _first_positions(values: pd.Series) -> Dict[Hashable, int]:
+    """Map each distinct value to the row position it first appears at."""
+    # Positional, so a non-unique index doesn't matter
+    first = ~values.duplicated().to_numpy()
+    return dict(zip(values.to_numpy()[first], np.flatnonzero(first).tolist()))
+
+class BankStore:
+    """Row index over the bank data for constant-time per-bank lookups."""
+
+    def __init__(self, df: pd.DataFrame, name_column: str = 'Bank Name', id_column: Optional[str] = None):
+        self.df = df
+        self.name_column = name_column
+        self.id_column = id_column
+
+        # The first row wins for duplicate names, matching boolean-mask lookups
+        self._positions = _first_positions(df[name_column])
+        self._id_positions: Dict[Hashable, int] = {}
+        if id_column is not None and id_column in df.columns:
+            self._id_positions = _first_positions(df[id_column])
+
+        self.metrics = df.select_dtypes(include='number').columns.tolist()
+        self._metric_positions = {metric: i for i, metric in enumerate(self.metrics)}
+        self._values: Optional[np.ndarray] = None
+
+    @property
+    def values(self) -> np.ndarray:
+        """Every numeric column as one float64 matrix, built on the first row access."""
+        # Most callers only need positions, so the copy isn't made up front
+        if self._values is None:
+            self._values = self.df[self.metrics].to_numpy(dtype=float, na_value=np.nan)
+        return self._values
+
+    def __contains__(self, bank_name: str) -> bool:
+        return bank_name in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def position(self, bank_name: str) -> int:
+        """Get the row position of a bank."""
+        try:
+            return self._positions[bank_name]
+        except KeyError:
+            raise KeyError(f"Unknown bank: {bank_name}") from None
+
+    def position_by_id(self, bank_id: Hashable) -> int:
+        """Get the row position of a bank by its ID."""
+        try:
+            return self._id_positions[bank_id]
+        except KeyError:
+            raise KeyError(f"Unknown bank ID: {bank_id}") from None
+
+    def get_row(self, bank_name: str) -> pd.Series:
+        """Get a bank's full row."""
+        return self.df.iloc[self.position(bank_name)]
+
+    def get_vector(self, bank_name: str, metrics: Optional[List[str]] = None) -> np.ndarray:
+        """Get a bank's metric values as a NumPy vector."""
+        row = self.values[self.position(bank_name)]
+        if metrics is None:
+            return row
+        return row[[self._metric_positions[m] for m in metrics]]
+
+    def get_value(self, bank_name: str, metric: str) -> float:
+        """Get a single metric value for a bank."""
+        return self.values[self.position(bank_name), self._metric_positions[metric]]
+
+def get_bank_store(df: pd.DataFrame, id_column: Optional[str] = None) -> BankStore:
+    """Get the cached bank store for this dataset version."""
+    key = (get_dataset_version(df), id_column)
+    if key not in _store_cache:
+        if len(_store_cache) >= MAX_CACHED_STORES:
+            _store_cache.pop(next(iter(_store_cache)))
+        _store_cache[key] = BankStore(df, id_column=id_column)
+    return _store_cache[key]
+
+def clear_store_cache() -> None:
+    """Drop every cached bank store."""
+    _store_cache.clear()
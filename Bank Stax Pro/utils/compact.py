@@ -0,0 +1,110 @@
+import sys
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Charts label values to at most this many decimals; float32 must not change any label
+DISPLAY_DECIMALS = 3
+# float32 carries about 7 significant digits
+FLOAT32_RTOL = 1e-6
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+def fits_float32(values: np.ndarray, threshold: Optional[float] = None) -> bool:
+    """Check whether float64 values survive a float32 round trip without a visible change.
+
+    With a threshold, no value may cross it in the round trip, in either direction.
+    """
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return True
+    if np.abs(values).max() > np.finfo(np.float32).max:
+        return False
+    restored = values.astype(np.float32).astype(np.float64)
+    if not (np.allclose(restored, values, rtol=FLOAT32_RTOL, atol=0)
+            and np.array_equal(np.round(restored, DISPLAY_DECIMALS), np.round(values, DISPLAY_DECIMALS))):
+        return False
+    if threshold is not None:
+        return (np.array_equal(restored >= threshold, values >= threshold)
+                and np.array_equal(restored <= threshold, values <= threshold))
+    return True
+
+def fits_int32(values: np.ndarray) -> bool:
+    """Check whether float64 values are all whole numbers within the int32 range."""
+    return bool(
+        np.isfinite(values).all()
+        and (values >= INT32_MIN).all() and (values <= INT32_MAX).all()
+        and (np.floor(values) == values).all()
+    )
+
+def to_float64(values: pd.Series) -> np.ndarray:
+    """Get a column as float64; float32 values go through their shortest text form, so 1.2 stays 1.2."""
+    if values.dtype == np.float32:
+        # A plain upcast gives 1.2000000476837158, and that is what charts and JSON would show
+        return values.to_numpy().astype(str).astype(np.float64)
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+def compact_frame(df: pd.DataFrame, thresholds: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """Downcast columns to smaller dtypes wherever that is lossless for display.
+
+    Floats become float32, or int32 for whole amounts too large for float32.
+    Text columns with repeated values, such as bank names in a panel, become
+    categoricals; mostly-unique text such as one name per bank is stored as
+    Arrow strings instead, since a categorical of unique labels costs more
+    than it saves. Columns with an entry in ``thresholds`` only go to float32
+    if no value's pass/fail result would change.
+    """
+    thresholds = thresholds or {}
+    dtypes = {}
+    for column in df.columns:
+        series = df[column]
+        if series.dtype == np.float64:
+            values = series.to_numpy()
+            if fits_float32(values, thresholds.get(column)):
+                dtypes[column] = np.float32
+            elif fits_int32(values):
+                dtypes[column] = np.int32
+        elif pd.api.types.is_integer_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            # Never below int32: sums of line items such as Tier-1 plus Tier-2 capital
+            # must not overflow
+            if series.dtype.itemsize > 4 and fits_int32(series.to_numpy(dtype=np.float64, na_value=np.nan)):
+                dtypes[column] = np.int32
+        elif series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == 'string':
+            if series.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+                dtypes[column] = 'category'
+            else:
+                dtypes[column] = 'string[pyarrow]'
+    return df.astype(dtypes) if dtypes else df
+
+def get_memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Compare per-column dtypes and deep memory usage of two versions of a frame, with a total row."""
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'dtype_after': after.dtypes.astype(str),
+        'bytes_before': before.memory_usage(index=False, deep=True),
+        'bytes_after': after.memory_usage(index=False, deep=True)
+    })
+    report.loc['Total'] = ['', '', report['bytes_before'].sum(), report['bytes_after'].sum()]
+    report['reduction'] = report['bytes_before'] / report['bytes_after']
+    return report
+
+def compact_with_report(df: pd.DataFrame,
+                        thresholds: Optional[Dict[str, float]] = None) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """Compact a frame and get its total deep memory usage before and after."""
+    compacted = compact_frame(df, thresholds)
+    usage = {
+        'bytes_before': int(df.memory_usage(index=True, deep=True).sum()),
+        'bytes_after': int(compacted.memory_usage(index=True, deep=True).sum())
+    }
+    return compacted, usage
+
+if __name__ == "__main__":
+    # python -m utils.compact <data file>
+    from .data_loader import load_data, get_market_standards
+
+    source = load_data(sys.argv[1], use_snapshot=False)
+    report = get_memory_report(source, compact_frame(source, get_market_standards()))
+    with pd.option_context('display.width', 200, 'display.max_rows', None):
+        print(report.round(2).to_string())
@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from typing import Dict, List, Optional, Tuple
+
+from .chart_reduction import MAX_POINTS
+from .data_loader import get_dataset_version
+from .ratios import RATIO_REGISTRY, get_ratio_view
+
+METHODS = ['pearson', 'spearman']
+MAX_CACHED_MATRICES = 8
+# Metrics per block; each block pair is a handful of (rows x block) matrix products
+BLOCK_COLUMNS = 128
+# Fewest banks reporting both metrics for their correlation to be shown
+MIN_PERIODS = 3
+SAMPLE_SEED = 0
+
+# Correlation matrices keyed by (dataset version, method), oldest first
+_correlation_cache: Dict[Tuple[str, str], 'CorrelationMatrix'] = {}
+
+def get_metric_values(df: pd.DataFrame) -> Tuple[List[str], np.ndarray]:
+    """Get every numeric column and computable ratio as one float64 matrix, one column per metric."""
+    ratio_view = get_ratio_view(df)
+    numeric = df.select_dtypes(include='number').columns.tolist()
+    metrics = numeric + [r for r in ratio_view.available(RATIO_REGISTRY) if r not in numeric]
+    if not metrics:
+        return metrics, np.zeros((len(df), 0))
+    values = np.column_stack([ratio_view.get(metric).to_numpy(dtype=np.float64, na_value=np.nan) for metric in metrics])
+    # Infinite ratios carry no rank or covariance information
+    values[np.isinf(values)] = np.nan
+    return metrics, values
+
+def _standardize(values: np.ndarray) -> np.ndarray:
+    """Center and scale each column; correlations don't change, but the sums below stay well conditioned."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        counts = np.count_nonzero(~np.isnan(values), axis=0)
+        means = np.nansum(values, axis=0) / counts
+        centered = values - means
+        scales = np.sqrt(np.nansum(centered * centered, axis=0) / counts)
+        return centered / np.where(scales > 0, scales, 1.0)
+
+def blocked_correlation(values: np.ndarray, block: int = BLOCK_COLUMNS,
+                        min_periods: int = MIN_PERIODS) -> Tuple[np.ndarray, np.ndarray]:
+    """Pairwise-complete Pearson correlation of every pair of columns, one block of columns at a time.
+
+    Missing values are dropped per pair, as in ``DataFrame.corr``. Each block pair is
+    computed from matrix products of the zero-filled values and their validity masks,
+    and only blocks on or above the diagonal are computed. Returns the correlations and
+    the number of rows each pair was computed over.
+    """
+    n_metrics = values.shape[1]
+    z = _standardize(values)
+    valid = ~np.isnan(z)
+    z[~valid] = 0.0
+    mask = valid.astype(np.float64)
+    squares = z * z
+    complete = bool(valid.all())
+
+    corr = np.full((n_metrics, n_metrics), np.nan)
+    counts = np.zeros((n_metrics, n_metrics), dtype=np.int64)
+    for i in range(0, n_metrics, block):
+        zi, mi, si = z[:, i:i + block], mask[:, i:i + block], squares[:, i:i + block]
+        for j in range(i, n_metrics, block):
+            zj, mj, sj = z[:, j:j + block], mask[:, j:j + block], squares[:, j:j + block]
+            sxy = zi.T @ zj
+            if complete:
+                # No missing values: every column already has mean 0 and unit variance
+                n = np.full(sxy.shape, float(len(z)))
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    var_x = np.broadcast_to((si.sum(axis=0) / len(z))[:, None], sxy.shape)
+                    var_y = np.broadcast_to((sj.sum(axis=0) / len(z))[None, :], sxy.shape)
+                    r = sxy / len(z) / np.sqrt(var_x * var_y)
+            else:
+                n = mi.T @ mj
+                sx, sy = zi.T @ mj, mi.T @ zj
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    cov = sxy - sx * sy / n
+                    var_x = (si.T @ mj) - sx * sx / n
+                    var_y = (mi.T @ sj) - sy * sy / n
+                    r = cov / np.sqrt(var_x * var_y)
+            # Rounding can leave a zero variance slightly negative or push r past +-1
+            r[(n < min_periods) | ~(var_x > 1e-12) | ~(var_y > 1e-12)] = np.nan
+            r = np.clip(r, -1.0, 1.0)
+            corr[i:i + block, j:j + block] = r
+            corr[j:j + block, i:i + block] = r.T
+            counts[i:i + block, j:j + block] = n
+            counts[j:j + block, i:i + block] = n.T
+
+    diagonal = np.arange(n_metrics)
+    corr[diagonal, diagonal] = np.where(np.isnan(corr[diagonal, diagonal]), np.nan, 1.0)
+    return corr, counts
+
+def _rank_columns(values: np.ndarray) -> np.ndarray:
+    """Rank each column, ties averaged and missing values kept missing."""
+    return pd.DataFrame(values).rank(method='average').to_numpy(dtype=np.float64)
+
+class CorrelationMatrix:
+    """Correlation of every pair of metrics, computed once per dataset version and method.
+
+    Spearman is Pearson on each metric's ranks. Ranks are taken over every bank that
+    reports the metric, so with missing values it can differ slightly from re-ranking
+    each pair's common banks, which would cost a sort per pair.
+    """
+
+    def __init__(self, df: pd.DataFrame, method: str = 'pearson'):
+        if method not in METHODS:
+            raise ValueError(f"Unknown correlation method: {method}")
+        self.version = get_dataset_version(df)
+        self.method = method
+        self.metrics, values = get_metric_values(df)
+        self._positions = {metric: i for i, metric in enumerate(self.metrics)}
+        self.values, self.counts = blocked_correlation(_rank_columns(values) if method == 'spearman' else values)
+
+    def has_metric(self, metric: str) -> bool:
+        return metric in self._positions
+
+    def frame(self) -> pd.DataFrame:
+        """Get the matrix as a frame indexed by metric on both axes."""
+        return pd.DataFrame(self.values, index=self.metrics, columns=self.metrics)
+
+    def pair(self, x: str, y: str) -> Tuple[float, int]:
+        """Get one pair's correlation and the number of banks reporting both metrics."""
+        i, j = self._positions[x], self._positions[y]
+        return float(self.values[i, j]), int(self.counts[i, j])
+
+    def strongest_pairs(self, n: int = 10) -> pd.DataFrame:
+        """Get the n most strongly correlated distinct pairs, by absolute correlation."""
+        upper = np.triu_indices(len(self.metrics), k=1)
+        r = self.values[upper]
+        valid = np.flatnonzero(~np.isnan(r))
+        n = min(n, len(valid))
+        if n < len(valid):
+            valid = valid[np.argpartition(-np.abs(r[valid]), n - 1)[:n]]
+        order = valid[np.argsort(-np.abs(r[valid]), kind='stable')]
+        metrics = np.asarray(self.metrics, dtype=object)
+        return pd.DataFrame({
+            'Metric': metrics[upper[0][order]],
+            'Versus': metrics[upper[1][order]],
+            'Correlation': r[order].round(3),
+            'Banks': self.counts[upper][order]
+        })
+
+def get_correlation(df: pd.DataFrame, method: str = 'pearson') -> CorrelationMatrix:
+    """Get the cached correlation matrix for this dataset version and method."""
+    key = (get_dataset_version(df), method)
+    if key not in _correlation_cache:
+        if len(_correlation_cache) >= MAX_CACHED_MATRICES:
+            _correlation_cache.pop(next(iter(_correlation_cache)))
+        _correlation_cache[key] = CorrelationMatrix(df, method)
+    return _correlation_cache[key]
+
+def clear_correlation_cache() -> None:
+    """Drop every cached correlation matrix."""
+    _correlation_cache.clear()
+
+def build_heatmap(matrix: CorrelationMatrix) -> go.Figure:
+    """Build the correlation heatmap; layout is left to the caller."""
+    # Rounded cells keep the payload small when there are hundreds of metrics
+    return go.Figure(go.Heatmap(
+        z=np.round(matrix.values, 3),
+        x=matrix.metrics,
+        y=matrix.metrics,
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        customdata=matrix.counts,
+        hovertemplate="%{y}<br>%{x}<br>r = %{z:.3f}<br>%{customdata} banks<extra></extra>"
+    ))
+
+def sample_positions(n_rows: int, max_points: int = MAX_POINTS, keep: Optional[int] = None) -> np.ndarray:
+    """Pick at most max_points row positions, sorted, always including ``keep``.
+
+    The sample is uniform and seeded, so the same data always gives the same points.
+    """
+    if n_rows <= max_points:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(SAMPLE_SEED)
+    positions = rng.choice(n_rows, size=max_points, replace=False)
+    if keep is not None and keep not in positions:
+        positions[0] = keep
+    return np.sort(positions)
+
+def build_pair_scatter(df: pd.DataFrame, x: str, y: str, highlight_position: Optional[int] = None,
+                       max_points: int = MAX_POINTS, colors: Optional[Dict[str, str]] = None) -> go.Figure:
+    """Build a scatter of two metrics with a least-squares line; layout is left to the caller.
+
+    Large universes are downsampled on the server to at most max_points banks. The
+    line is fitted on every bank reporting both metrics, not only the plotted ones.
+    """
+    colors = colors or {'neutral': '#636efa'}
+    ratio_view = get_ratio_view(df)
+    x_values = ratio_view.get(x).to_numpy(dtype=np.float64, na_value=np.nan)
+    y_values = ratio_view.get(y).to_numpy(dtype=np.float64, na_value=np.nan)
+    both = np.flatnonzero(np.isfinite(x_values) & np.isfinite(y_values))
+
+    keep = None
+    if highlight_position is not None:
+        found = np.searchsorted(both, highlight_position)
+        if found < len(both) and both[found] == highlight_position:
+            keep = int(found)
+    shown = both[sample_positions(len(both), max_points, keep)]
+    names = df['Bank Name'].to_numpy(dtype=object)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=x_values[shown],
+        y=y_values[shown],
+        mode='markers',
+        marker=dict(color=colors['neutral'], size=5, opacity=0.7),
+        text=names[shown],
+        hovertemplate="%{text}<br>%{x:.3f}, %{y:.3f}<extra></extra>",
+        name=f"{len(shown)} of {len(both)} banks" if len(shown) < len(both) else f"{len(both)} banks"
+    ))
+    if len(both) >= 2 and np.ptp(x_values[both]) > 0:
+        slope, intercept = np.polyfit(x_values[both], y_values[both], 1)
+        ends = np.array([x_values[both].min(), x_values[both].max()])
+        fig.add_trace(go.Scatter(
+            x=ends,
+            y=slope * ends + intercept,
+            mode='lines',
+            line=dict(color='red', width=2, dash='dash'),
+            name='Least-squares fit'
+        ))
+    if keep is not None:
+        fig.add_trace(go.Scattergl(
+            x=[x_values[highlight_position]],
+            y=[y_values[highlight_position]],
+            mode='markers',
+            marker=dict(color='#ffffff', size=12, symbol='diamond'),
+            name=str(names[highlight_position])
+        ))
+    return fig
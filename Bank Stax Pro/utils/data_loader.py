@@ -1,120 +1,152 @@
+import hashlib
+import weakref
+
 import pandas as pd
-from typing import List, Dict
+from typing import Dict, List, Mapping, Optional
 
-def load_data(file_path: str) -> pd.DataFrame:
-    """Load and validate the data file containing bank financial data."""
-    try:
+from .instrumentation import stage
+from .metric_catalog import LOWER_IS_BETTER, THRESHOLDS, available_metrics
+
+def read_source(file_path: str) -> pd.DataFrame:
+    """Parse a CSV or Excel data file."""
+    with stage('read_source'):
         if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path, engine='openpyxl')
+            return pd.read_csv(file_path)
+        return pd.read_excel(file_path, engine='openpyxl')
+
+def load_data(file_path: str, use_snapshot: bool = True, compact: bool = False,
+              quarantine: bool = False) -> pd.DataFrame:
+    """Load and validate the data file containing bank financial data.
+
+    Reads go through a columnar snapshot of the source file unless
+    ``use_snapshot`` is False, so reruns skip the Excel parse. A panel
+    store directory loads as its latest-period view; any other directory
+    or glob pattern loads every workbook in it, with failed files listed
+    in ``attrs['ingest_failures']``.
+
+    Every load is checked for type errors, missing and infinite values,
+    negative denominators, out-of-range ratios and duplicate bank names; the
+    report is in ``attrs['quality_report']``. With ``quarantine``, rows with
+    errors are dropped and counted in the report.
+
+    With ``compact``, float columns are stored as float32 and text columns
+    as categoricals or Arrow strings wherever that is lossless for display
+    and leaves every market-standard pass/fail result unchanged. The memory
+    used before and after is recorded in ``attrs['memory_usage']``.
+    """
+    # Imported here, so modules that only need versions or metric lists don't load
+    # the ingest, snapshot, panel store and compaction code; validation also needs
+    # the ratio registry, which imports this module
+    from .compact import compact_with_report
+    from .ingest import is_workbook_batch, load_workbooks
+    from .panel_store import is_panel_store, load_latest_period
+    from .snapshot import load_snapshot
+    from .validation import check_quality, quarantine_rows
+
+    try:
+        with stage('load_data'):
+            if is_panel_store(file_path):
+                df = load_latest_period(file_path)
+            elif is_workbook_batch(file_path):
+                df, failures = load_workbooks(file_path)
+                df.attrs['ingest_failures'] = failures
+            elif use_snapshot:
+                df = load_snapshot(file_path, read_source)
+            else:
+                df = read_source(file_path)
+        # Snapshots and panel stores identify their content; keep that version for the final frame
+        source_version = df.attrs.get('dataset_version')
         
         if 'Bank Name' not in df.columns:
             raise ValueError("Missing required column: Bank Name")
-            
+
+        with stage('validate'):
+            report = check_quality(df)
+        df.attrs['quality_report'] = report
+        if quarantine:
+            df, _ = quarantine_rows(df, report)
+
+        if compact:
+            with stage('compact'):
+                df, usage = compact_with_report(df, MARKET_STANDARDS)
+            df.attrs['memory_usage'] = usage
+
+        # Quarantined frames lose rows, so they are hashed on first use instead
+        if source_version is not None and not quarantine:
+            set_dataset_version(df, source_version)
         return df
     except Exception as e:
         raise Exception(f"Error loading data: {str(e)}")
 
+class DatasetOwner:
+    """Weak reference to the frame a dataset version was stamped on.
+
+    Deep copies keep pointing at the stamped frame, and pickles point at nothing,
+    so neither a derived frame nor one sent to another process passes for it.
+    """
+    __slots__ = ('_ref',)
+
+    def __init__(self, df: Optional[pd.DataFrame] = None):
+        self._ref = None if df is None else weakref.ref(df)
+
+    def __call__(self) -> Optional[pd.DataFrame]:
+        return None if self._ref is None else self._ref()
+
+    def __deepcopy__(self, memo: Dict) -> 'DatasetOwner':
+        return self
+
+    def __reduce__(self):
+        return DatasetOwner, ()
+
+def set_dataset_version(df: pd.DataFrame, version: str) -> None:
+    """Stamp a frame with its dataset version; frames derived from it don't inherit the stamp.
+
+    pandas copies ``attrs`` into every derived frame, such as a sorted copy or one
+    with a replaced column, but the copied owner still points at this frame, so
+    get_dataset_version hashes the derived frame instead.
+    """
+    df.attrs['dataset_version'] = version
+    df.attrs['dataset_owner'] = DatasetOwner(df)
+    df.attrs['dataset_shape'] = df.shape
+
+def get_dataset_version(df: pd.DataFrame) -> str:
+    """Get a content hash identifying this version of the dataset.
+
+    Loads served from a snapshot already carry the source file hash.
+    """
+    version = df.attrs.get('dataset_version')
+    owner = df.attrs.get('dataset_owner')
+    # Only trust a stamp made on this very frame, and not since resized in place
+    if version is None or owner is None or owner() is not df or df.attrs.get('dataset_shape') != df.shape:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        digest = hashlib.sha256(row_hashes.tobytes())
+        digest.update('|'.join(map(str, df.columns)).encode('utf-8'))
+        version = digest.hexdigest()
+        set_dataset_version(df, version)
+    return version
+
 def get_financial_ratios(df: pd.DataFrame) -> List[str]:
     """Get list of available financial ratios."""
-    financial_ratios = [
-        'PAT',
-        'Depreciation',
-        'Total Liabilities (excluding equity)',
-        'Cash & cash equivalents',
-        'Total Assets',
-        'Current Assets',
-        'Current Liabilities',
-        'Accounts Receivables',
-        'Marketable Securities',
-        'Core Deposits',
-        'Total Deposits',
-        'Loans',
-        'Non performing assets'
-    ]
-    return [col for col in financial_ratios if col in df.columns]
+    return list(available_metrics(df.columns, 'financial'))
 
 def get_capital_metrics(df: pd.DataFrame) -> List[str]:
     """Get list of capital-related metrics."""
-    capital_metrics = [
-        'Tier-1 Capital',
-        'Tier-2 capital',
-        'Risk weighted assets',
-        'Common Equity Tier 1 Capital',
-        'Tier 1 Capital Ratio',
-        'Total Capital',
-        'Leverage Ratio',
-        'Supplementary Tier 1',
-        'Capital Conservation'
-    ]
-    return [col for col in capital_metrics if col in df.columns]
+    return list(available_metrics(df.columns, 'capital'))
 
 def get_stress_metrics(df: pd.DataFrame) -> List[str]:
     """Get list of stress test metrics."""
-    stress_metrics = [
-        'Common Equity Tier 1 Capital',
-        'Tier 1 Capital Ratio',
-        'Total Capital',
-        'Leverage Ratio'
-    ]
-    return [col for col in stress_metrics if col in df.columns]
-
-def get_market_standards() -> Dict[str, float]:
-    """Get market standard values for different metrics."""
-    return {
-        'PAT': 10000,
-        'Core Deposits': 0.80,
-        'Non performing assets': 0.015,
-        'Tier-1 Capital': 11.0,
-        'Tier-2 capital': 2.0,
-        'Common Equity Tier 1 Capital': 11.0,
-        'Tier 1 Capital Ratio': 10.5,
-        'Total Capital': 15.0,
-        'Leverage Ratio': 7.5,
-        'Supplementary Tier 1': 2.0,
-        'Capital Conservation': 2.5,
-        'Current Ratio': 1.5,
-        'Total Assets': 100000,
-        'Loans': 50000
-    }
+    return list(available_metrics(df.columns, 'stress'))
+
+# Thresholds and directions come from the shared metric catalog
+MARKET_STANDARDS: Mapping[str, float] = THRESHOLDS
+
+def get_market_standards() -> Mapping[str, float]:
+    """Get market standard values for different metrics; the mapping is read-only."""
+    return MARKET_STANDARDS
 
 def check_stress_threshold(metric: str, value: float) -> bool:
     """Check if a metric passes its threshold."""
-    standards = get_market_standards()
-    
-    # Metrics where lower is better
-    lower_is_better = ['Non performing assets']
-    
-    if metric in lower_is_better:
-        return value <= standards.get(metric, float('inf'))
-    else:
-        return value >= standards.get(metric, float('-inf'))
-
-def get_metric_type(metric: str) -> str:
-    """Get the type of metric (financial, stress, or capital)."""
-    capital_metrics = [
-        'Tier-1 Capital',
-        'Tier-2 capital',
-        'Risk weighted assets',
-        'Common Equity Tier 1 Capital',
-        'Tier 1 Capital Ratio',
-        'Total Capital',
-        'Leverage Ratio',
-        'Supplementary Tier 1',
-        'Capital Conservation'
-    ]
-    
-    stress_metrics = [
-        'Common Equity Tier 1 Capital',
-        'Tier 1 Capital Ratio',
-        'Total Capital',
-        'Leverage Ratio'
-    ]
-    
-    if metric in stress_metrics:
-        return 'stress'
-    elif metric in capital_metrics:
-        return 'capital'
+    if metric in LOWER_IS_BETTER:
+        return value <= MARKET_STANDARDS.get(metric, float('inf'))
     else:
-        return 'financial'
+        return value >= MARKET_STANDARDS.get(metric, float('-inf'))
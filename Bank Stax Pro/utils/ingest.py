@@ -0,0 +1,168 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+CHUNK_SIZE = 5000
+HEADER_SCAN_ROWS = 50
+WORKBOOK_SUFFIXES = ('.xlsx', '.xlsm')
+SOURCE_FILE_COLUMN = 'Source File'
+
+def detect_header(ws) -> Tuple[int, List[str]]:
+    """Find the header row: the first row whose non-empty cells are all text.
+
+    Returns the 1-based row number and the normalized column names.
+    """
+    for row_number, row in enumerate(ws.iter_rows(max_row=HEADER_SCAN_ROWS, values_only=True), start=1):
+        cells = [cell for cell in row if cell is not None]
+        if len(cells) >= 2 and all(isinstance(cell, str) for cell in cells):
+            # Trim the trailing empty cells that spreadsheet dimensions often include
+            width = max(i for i, cell in enumerate(row) if cell is not None) + 1
+            return row_number, normalize_header(row[:width])
+    raise ValueError(f"No header row found in the first {HEADER_SCAN_ROWS} rows")
+
+def normalize_header(row: Tuple) -> List[str]:
+    """Turn a raw header row into column names, with the first column as the bank name."""
+    columns = [str(cell).strip() if cell is not None else f"Column {i + 1}" for i, cell in enumerate(row)]
+    columns[0] = 'Bank Name'  # Fix the first column name
+    return columns
+
+def iter_workbook_chunks(file_path: str, chunk_size: int = CHUNK_SIZE,
+                         sheet_name: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Stream a line-items workbook as data frames of at most chunk_size rows.
+
+    The workbook is read in openpyxl read-only mode, so only one chunk is held in memory.
+    """
+    # openpyxl is only imported once a workbook is read, not when the loader imports this module
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.active
+        header_row, columns = detect_header(ws)
+
+        chunk = []
+        for row in ws.iter_rows(min_row=header_row + 1, max_col=len(columns), values_only=True):
+            if all(cell is None for cell in row):
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame.from_records(chunk, columns=columns).infer_objects()
+                chunk = []
+        if chunk:
+            yield pd.DataFrame.from_records(chunk, columns=columns).infer_objects()
+    finally:
+        wb.close()
+
+def read_workbook(file_path: str, chunk_size: int = CHUNK_SIZE, sheet_name: Optional[str] = None) -> pd.DataFrame:
+    """Read a line-items workbook into one data frame with the header promoted."""
+    chunks = list(iter_workbook_chunks(file_path, chunk_size, sheet_name))
+    if not chunks:
+        raise ValueError(f"No data rows found in {file_path}")
+    return pd.concat(chunks, ignore_index=True)
+
+def convert_workbook(input_path: str, output_path: str, chunk_size: int = CHUNK_SIZE,
+                     sheet_name: Optional[str] = None) -> int:
+    """Stream a line-items workbook into a clean CSV or Excel file, chunk by chunk.
+
+    Returns the number of data rows written.
+    """
+    output = Path(output_path)
+    tmp_path = output.with_name(f".{output.stem}.tmp{output.suffix}")
+    rows_written = 0
+
+    if output.suffix == '.csv':
+        with open(tmp_path, 'w', newline='') as f:
+            for chunk in iter_workbook_chunks(input_path, chunk_size, sheet_name):
+                chunk.to_csv(f, header=rows_written == 0, index=False)
+                rows_written += len(chunk)
+    else:
+        from openpyxl import Workbook
+
+        # Write-only workbooks stream rows to disk instead of building the sheet in memory
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        header_written = False
+        for chunk in iter_workbook_chunks(input_path, chunk_size, sheet_name):
+            if not header_written:
+                ws.append(list(chunk.columns))
+                header_written = True
+            for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+                ws.append(list(row))
+            rows_written += len(chunk)
+        wb.save(tmp_path)
+
+    os.replace(tmp_path, output)
+    return rows_written
+
+def is_workbook_batch(source: str) -> bool:
+    """Check whether a source is a directory or glob pattern rather than a single file."""
+    return os.path.isdir(source) or glob.has_magic(source)
+
+def find_workbooks(source: str) -> List[str]:
+    """Expand a directory or glob pattern into a sorted list of workbook paths.
+
+    Excel lock files (``~$name.xlsx``) are skipped.
+    """
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source)
+    return sorted(
+        p for p in paths
+        if os.path.isfile(p) and p.lower().endswith(WORKBOOK_SUFFIXES)
+        and not os.path.basename(p).startswith('~$')
+    )
+
+def _read_workbook_task(file_path: str, chunk_size: int, sheet_name: Optional[str]) -> pd.DataFrame:
+    df = read_workbook(file_path, chunk_size, sheet_name)
+    df[SOURCE_FILE_COLUMN] = os.path.basename(file_path)
+    return df
+
+def load_workbooks(source: str, max_workers: Optional[int] = None, chunk_size: int = CHUNK_SIZE,
+                   sheet_name: Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Read every workbook in a directory or glob in a process pool and concatenate them.
+
+    Each workbook gets the same header promotion as ``read_workbook`` and a
+    'Source File' column. Files that fail to parse are left out and returned
+    with their error messages instead of aborting the batch.
+
+    Returns the combined frame, in file order, and a dict of failed file -> error.
+    """
+    paths = find_workbooks(source)
+    if not paths:
+        raise ValueError(f"No workbooks found in {source}")
+
+    frames: Dict[str, pd.DataFrame] = {}
+    failures: Dict[str, str] = {}
+    max_workers = min(max_workers or os.cpu_count() or 1, len(paths))
+
+    if max_workers == 1:
+        for path in paths:
+            try:
+                frames[path] = _read_workbook_task(path, chunk_size, sheet_name)
+            except Exception as e:
+                failures[path] = f"{type(e).__name__}: {e}"
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_read_workbook_task, path, chunk_size, sheet_name): path
+                for path in paths
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    frames[path] = future.result()
+                except Exception as e:
+                    # Includes a worker crashing, which fails the files it was holding
+                    failures[path] = f"{type(e).__name__}: {e}"
+
+    if not frames:
+        raise ValueError(f"All {len(paths)} workbooks in {source} failed to load")
+    # Files with different line items line up on the union of their columns
+    df = pd.concat([frames[p] for p in paths if p in frames], ignore_index=True, sort=False)
+    df.insert(len(df.columns) - 1, SOURCE_FILE_COLUMN, df.pop(SOURCE_FILE_COLUMN))
+    return df, failures
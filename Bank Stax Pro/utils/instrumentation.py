@@ -0,0 +1,255 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+import warnings
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+# JSON-lines log of stage timings; set to an empty string to disable logging
+STAGE_LOG_ENV = 'STAGE_LOG_PATH'
+DEFAULT_STAGE_LOG = 'logs/stage_timings.jsonl'
+# Set to 1 to trace allocations on every rerun, not only while the debug panel is open
+TRACE_MEMORY_ENV = 'STAGE_TRACE_MEMORY'
+
+_local = threading.local()
+_log_lock = threading.Lock()
+_first_chart_lock = threading.Lock()
+_first_chart_recorded = False
+# tracemalloc is process-wide: it runs while any rerun traces memory, and every
+# reset_peak() bumps a counter so stages can tell another session reset the peak
+_trace_lock = threading.Lock()
+_traced_runs = 0
+_started_tracing = False
+_peak_resets = 0
+# Fallback start time on platforms without /proc: the moment this module was imported
+_import_time = time.time()
+
+def get_stage_log_path() -> Optional[str]:
+    """Get the stage log path, or None when logging is disabled."""
+    return os.environ.get(STAGE_LOG_ENV, DEFAULT_STAGE_LOG) or None
+
+def get_process_start_time() -> float:
+    """Get the wall-clock time this process started, or this module's import time without /proc."""
+    try:
+        with open('/proc/self/stat', 'r') as f:
+            # The command name can contain spaces, so split after its closing parenthesis
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/stat', 'r') as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith('btime'))
+        return boot_time + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, StopIteration):
+        return _import_time
+
+def _start_tracing() -> None:
+    global _traced_runs, _started_tracing
+    with _trace_lock:
+        _traced_runs += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+
+def _stop_tracing() -> None:
+    """Stop tracing once no rerun needs it, unless it was on before us or is turned on for the process."""
+    global _traced_runs, _started_tracing
+    with _trace_lock:
+        _traced_runs -= 1
+        if _traced_runs == 0 and _started_tracing and os.environ.get(TRACE_MEMORY_ENV) != '1':
+            tracemalloc.stop()
+            _started_tracing = False
+
+def _max_peak(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    # None marks a peak another session's reset made unreliable
+    return None if a is None or b is None else max(a, b)
+
+class StageRecorder:
+    """Records wall time, CPU time and allocated memory for the stages of one rerun.
+
+    Memory is measured with tracemalloc, which is process-wide: concurrent sessions
+    allocating at the same time show up in each other's numbers. A stage's peak is
+    None if another session reset the peak while the stage ran.
+    """
+
+    def __init__(self, app: str, trace_memory: bool = False):
+        self.app = app
+        self.run_id = uuid.uuid4().hex[:12]
+        self.trace_memory = trace_memory
+        self.records: List[Dict] = []
+        self._stack: List[Dict] = []
+        self._run_start = time.perf_counter()
+        # Value of the reset counter after this recorder's own latest reset
+        self._last_reset = None
+        if trace_memory:
+            _start_tracing()
+
+    def close(self) -> None:
+        """Release this rerun's hold on memory tracing."""
+        if self.trace_memory:
+            self.trace_memory = False
+            _stop_tracing()
+
+    def _read_peak(self) -> Tuple[int, Optional[int]]:
+        # The peak only belongs to this recorder if nobody else reset it since
+        current, peak = tracemalloc.get_traced_memory()
+        return current, peak if _peak_resets == self._last_reset else None
+
+    def _reset_peak(self) -> None:
+        global _peak_resets
+        tracemalloc.reset_peak()
+        _peak_resets += 1
+        self._last_reset = _peak_resets
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a stage; stages can nest, and each records its parent's name."""
+        frame = {'name': name, 'peak': 0}
+        if self.trace_memory:
+            with _trace_lock:
+                current, peak = self._read_peak()
+                if self._stack:
+                    # Bank the parent's peak so far before resetting it for this stage
+                    self._stack[-1]['peak'] = _max_peak(self._stack[-1]['peak'], peak)
+                self._reset_peak()
+            frame['start_memory'] = current
+        parent = self._stack[-1]['name'] if self._stack else None
+        self._stack.append(frame)
+
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.thread_time() - start_cpu
+            self._stack.pop()
+            record = {
+                'stage': name,
+                'parent': parent,
+                'wall_ms': wall * 1000,
+                'cpu_ms': cpu * 1000,
+                'allocated_bytes': None,
+                'peak_bytes': None
+            }
+            if 'start_memory' in frame:
+                with _trace_lock:
+                    current, peak = self._read_peak()
+                peak = _max_peak(frame['peak'], peak)
+                record['allocated_bytes'] = current - frame['start_memory']
+                record['peak_bytes'] = None if peak is None else peak - frame['start_memory']
+                if self._stack:
+                    self._stack[-1]['peak'] = _max_peak(self._stack[-1]['peak'], peak)
+            self.records.append(record)
+
+    def mark_first_chart(self) -> None:
+        """Record the time from process start, and from this rerun's start, to the process's first chart."""
+        global _first_chart_recorded
+        with _first_chart_lock:
+            if _first_chart_recorded:
+                return
+            _first_chart_recorded = True
+        for stage_name, elapsed in (
+            ('first_chart_since_process_start', time.time() - get_process_start_time()),
+            ('first_chart_since_run_start', time.perf_counter() - self._run_start)
+        ):
+            self.records.append({
+                'stage': stage_name,
+                'parent': None,
+                'wall_ms': elapsed * 1000,
+                'cpu_ms': None,
+                'allocated_bytes': None,
+                'peak_bytes': None
+            })
+
+    def to_frame(self) -> pd.DataFrame:
+        """Get the recorded stages in the order they started."""
+        frame = pd.DataFrame(self.records, columns=[
+            'stage', 'parent', 'wall_ms', 'cpu_ms', 'allocated_bytes', 'peak_bytes'
+        ])
+        # Stages are recorded when they finish, so parents come after their children
+        return frame.iloc[::-1].reset_index(drop=True)
+
+    def write_log(self, path: Optional[str] = None) -> None:
+        """Append one JSON line per stage to the stage log."""
+        path = path or get_stage_log_path()
+        if path is None or not self.records:
+            return
+        timestamp = datetime.now(timezone.utc).isoformat()
+        lines = [
+            json.dumps({'timestamp': timestamp, 'app': self.app, 'run_id': self.run_id, **record})
+            for record in self.records
+        ]
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with _log_lock, open(path, 'a') as f:
+                f.write('\n'.join(lines) + '\n')
+        except OSError as e:
+            # Instrumentation must never take the dashboard down
+            warnings.warn(f"could not write stage log {path}: {e}", RuntimeWarning, stacklevel=2)
+
+def start_run(app: str, trace_memory: bool = False) -> StageRecorder:
+    """Start recording a rerun on this thread; loaders pick the recorder up through stage()."""
+    trace_memory = trace_memory or os.environ.get(TRACE_MEMORY_ENV) == '1'
+    recorder = StageRecorder(app, trace_memory)
+    _local.recorder = recorder
+    return recorder
+
+def finish_run(recorder: StageRecorder) -> None:
+    """Stop recording on this thread and append the rerun to the stage log."""
+    if getattr(_local, 'recorder', None) is recorder:
+        _local.recorder = None
+    recorder.close()
+    recorder.write_log()
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a stage in this thread's current rerun; does nothing outside a rerun."""
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is None:
+        yield
+        return
+    with recorder.stage(name):
+        yield
+
+def mark_first_chart() -> None:
+    """Record the time to the process's first chart in this thread's current rerun, if any."""
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is not None:
+        recorder.mark_first_chart()
+
+def render_stage_panel(recorder: StageRecorder) -> None:
+    """Show the rerun's stage timings in the sidebar."""
+    import streamlit as st
+
+    frame = recorder.to_frame()
+    st.sidebar.caption(f"Rerun {recorder.run_id}")
+    if frame.empty:
+        st.sidebar.write("No stages recorded")
+        return
+    frame['peak_mb'] = frame['peak_bytes'] / 1e6
+    st.sidebar.dataframe(
+        frame[['stage', 'wall_ms', 'cpu_ms', 'peak_mb']].round(2),
+        use_container_width=True,
+        hide_index=True
+    )
+
+def summarize_log(path: Optional[str] = None) -> pd.DataFrame:
+    """Get p50/p95 wall time, CPU time and peak memory per (app, stage) from the stage log."""
+    path = path or get_stage_log_path()
+    log = pd.read_json(path, lines=True)
+    grouped = log.groupby(['app', 'stage'])
+    summary = grouped.size().rename('runs').to_frame()
+    for column in ['wall_ms', 'cpu_ms', 'peak_bytes']:
+        summary[f"{column}_p50"] = grouped[column].quantile(0.5)
+        summary[f"{column}_p95"] = grouped[column].quantile(0.95)
+    return summary.reset_index()
+
+if __name__ == "__main__":
+    # python -m utils.instrumentation [log path]
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(summarize_log(sys.argv[1] if len(sys.argv) > 1 else None).round(2).to_string(index=False))
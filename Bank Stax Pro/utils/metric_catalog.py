@@ -0,0 +1,227 @@
+"""The one catalog of metric metadata: type, direction, thresholds, valid range, role and display groups.
+
+This is the only copy: financial-dashboard and financial_analysis load this file
+through their own metric_catalog modules. It has no imports outside the standard
+library, so every app can load it as a package module or by path.
+"""
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Hashable, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+class Metric(NamedTuple):
+    name: str
+    # 'financial', 'capital' or 'stress'
+    type: str
+    # 'higher' or 'lower': which way is better
+    direction: str = 'higher'
+    # Market or regulatory standard the metric is checked against
+    threshold: Optional[float] = None
+    # Lowest and highest values that make sense; None leaves that side open
+    bounds: Tuple[Optional[float], Optional[float]] = (None, None)
+    # Role the metric is graded for in the role scorecards, and that role's threshold
+    role: Optional[str] = None
+    role_threshold: Optional[float] = None
+    description: str = ''
+    # Display groups the metric is listed in, filled in from GROUPS
+    groups: Tuple[str, ...] = ()
+
+# Metrics with a market or regulatory standard come first, in the order the
+# standards are checked
+_METRICS = (
+    Metric('PAT', 'financial', threshold=10000),
+    Metric('Core Deposits', 'financial', threshold=0.80),
+    Metric('Non performing assets', 'financial', direction='lower', threshold=0.015),
+    Metric('Tier-1 Capital', 'capital', threshold=11.0),
+    Metric('Tier-2 capital', 'capital', threshold=2.0),
+    Metric('Common Equity Tier 1 Capital', 'stress', threshold=11.0),
+    Metric('Tier 1 Capital Ratio', 'stress', threshold=10.5),
+    Metric('Total Capital', 'stress', threshold=15.0),
+    Metric('Leverage Ratio', 'stress', threshold=7.5),
+    Metric('Supplementary Tier 1', 'capital', threshold=2.0),
+    Metric('Capital Conservation', 'capital', threshold=2.5),
+    Metric('Current Ratio', 'financial', threshold=1.5),
+    Metric('Total Assets', 'financial', threshold=100000),
+    Metric('Loans', 'financial', threshold=50000),
+    # Regulatory minimums for the lowest ratios projected by Bank Stax Pro's utils.stress
+    Metric('Stressed CET1 Ratio', 'stress', threshold=4.5),
+    Metric('Stressed Tier 1 Ratio', 'stress', threshold=6.0),
+    Metric('Stressed Leverage Ratio', 'stress', threshold=4.0),
+    Metric('Stressed CET1 Ratio (MC p5)', 'stress', threshold=4.5),
+    # Regulatory thresholds for the CCAR stress results in financial-dashboard data
+    Metric('Post Stress CET1 Ratio', 'stress', threshold=4.5, bounds=(None, 100),
+           description="Minimum required CET1 ratio after stress"),
+    Metric('Stress Loss %', 'stress', direction='lower', threshold=3.0, bounds=(0, 100),
+           description="Maximum acceptable loss percentage"),
+
+    Metric('Depreciation', 'financial'),
+    Metric('Total Liabilities (excluding equity)', 'financial'),
+    Metric('Cash & cash equivalents', 'financial'),
+    Metric('Current Assets', 'financial'),
+    Metric('Current Liabilities', 'financial'),
+    Metric('Accounts Receivables', 'financial'),
+    Metric('Marketable Securities', 'financial'),
+    Metric('Total Deposits', 'financial'),
+    Metric('Risk weighted assets', 'capital'),
+    Metric('Minimum Capital Requirement', 'capital'),
+    Metric('Core Deposits to Total Deposits', 'financial', bounds=(0, 1)),
+    Metric('NPAs to Total Loans', 'financial', direction='lower', bounds=(0, 1)),
+    Metric('Capital Adequacy Ratio', 'capital', bounds=(0, None)),
+    Metric('Solvency Ratio', 'financial', bounds=(0, None)),
+    Metric('Loans to Deposit Ratio', 'financial', bounds=(0, None)),
+
+    Metric('Capital Ratio', 'capital', role='Depositor', role_threshold=12,
+           description="Measures bank's capital strength"),
+    Metric('Liquidity Ratio', 'financial', bounds=(0, None), role='Depositor', role_threshold=100,
+           description="Indicates bank's ability to meet short-term obligations"),
+    Metric('NPL Ratio', 'financial', direction='lower', bounds=(0, 100), role='Depositor', role_threshold=3,
+           description="Shows quality of loan portfolio (lower is better)"),
+    Metric('ROE', 'financial', role='Depositor', role_threshold=15,
+           description="Indicates profitability and efficiency"),
+    Metric('Interest Coverage Ratio', 'financial', role='Borrower', role_threshold=2.5,
+           description="Ability to pay interest on debt"),
+    Metric('Debt Service Coverage Ratio', 'financial', role='Borrower', role_threshold=1.8,
+           description="Ability to service total debt"),
+    Metric('Cost-to-Income Ratio', 'financial', direction='lower', role='Borrower', role_threshold=55,
+           description="Operational efficiency (lower is better)"),
+    Metric('Loan-to-Deposit Ratio', 'financial', role='Borrower', role_threshold=85,
+           description="Lending practice sustainability")
+)
+
+# Display groups, each in the order its metrics are listed
+GROUPS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    # Bank Stax Pro metric lists
+    'financial': (
+        'PAT',
+        'Depreciation',
+        'Total Liabilities (excluding equity)',
+        'Cash & cash equivalents',
+        'Total Assets',
+        'Current Assets',
+        'Current Liabilities',
+        'Accounts Receivables',
+        'Marketable Securities',
+        'Core Deposits',
+        'Total Deposits',
+        'Loans',
+        'Non performing assets'
+    ),
+    'capital': (
+        'Tier-1 Capital',
+        'Tier-2 capital',
+        'Risk weighted assets',
+        'Common Equity Tier 1 Capital',
+        'Tier 1 Capital Ratio',
+        'Total Capital',
+        'Leverage Ratio',
+        'Supplementary Tier 1',
+        'Capital Conservation'
+    ),
+    'stress': (
+        'Common Equity Tier 1 Capital',
+        'Tier 1 Capital Ratio',
+        'Total Capital',
+        'Leverage Ratio'
+    ),
+    # Bank Stax Pro dashboard sections
+    'key_financials': (
+        'PAT',
+        'Depreciation',
+        'Total Liabilities (excluding equity)',
+        'Cash & cash equivalents',
+        'Total Assets',
+        'Current Assets',
+        'Current Liabilities',
+        'Accounts Receivables',
+        'Marketable Securities',
+        'Core Deposits',
+        'Total Deposits',
+        'Loans',
+        'Non performing assets',
+        'Tier-1 Capital',
+        'Tier-2 capital',
+        'Risk weighted assets'
+    ),
+    'key_metrics': (
+        'Core Deposits to Total Deposits',
+        'NPAs to Total Loans',
+        'Liquidity Ratio',
+        'Capital Adequacy Ratio',
+        'Solvency Ratio',
+        'Loans to Deposit Ratio'
+    ),
+    'ccar': (
+        'Common Equity Tier 1 Capital',
+        'Tier 1 Capital Ratio',
+        'Total Capital',
+        'Leverage Ratio',
+        'Supplementary Tier 1'
+    ),
+    'stress_projections': (
+        'Stressed CET1 Ratio',
+        'Stressed Tier 1 Ratio',
+        'Stressed Leverage Ratio',
+        'Stressed CET1 Ratio (MC p5)'
+    ),
+    # financial-dashboard sections
+    'ratio_analysis': (
+        'Liquidity Ratio',
+        'Capital Adequacy Ratio',
+        'ROE'
+    ),
+    'ccar_stress': (
+        'Post Stress CET1 Ratio',
+        'Stress Loss %'
+    )
+})
+
+ROLES: Tuple[str, ...] = ('Depositor', 'Borrower')
+
+def _build_catalog() -> Mapping[str, Metric]:
+    groups = {metric.name: [] for metric in _METRICS}
+    for group, names in GROUPS.items():
+        for name in names:
+            groups[name].append(group)
+    return MappingProxyType({
+        metric.name: metric._replace(groups=tuple(groups[metric.name])) for metric in _METRICS
+    })
+
+METRICS: Mapping[str, Metric] = _build_catalog()
+
+THRESHOLDS: Mapping[str, float] = MappingProxyType({
+    name: metric.threshold for name, metric in METRICS.items() if metric.threshold is not None
+})
+BOUNDS: Mapping[str, Tuple[Optional[float], Optional[float]]] = MappingProxyType({
+    name: metric.bounds for name, metric in METRICS.items() if metric.bounds != (None, None)
+})
+LOWER_IS_BETTER = frozenset(name for name, metric in METRICS.items() if metric.direction == 'lower')
+ROLE_METRICS: Mapping[str, Tuple[Metric, ...]] = MappingProxyType({
+    role: tuple(metric for metric in METRICS.values() if metric.role == role) for role in ROLES
+})
+
+def get_metric(name: str) -> Optional[Metric]:
+    """Get a metric's catalog entry, or None if it isn't catalogued."""
+    return METRICS.get(name)
+
+def get_metric_type(name: str) -> str:
+    """Get a metric's type; uncatalogued metrics are financial."""
+    metric = METRICS.get(name)
+    return 'financial' if metric is None else metric.type
+
+def get_group(group: str) -> Tuple[str, ...]:
+    """Get a display group's metrics in display order."""
+    return GROUPS[group]
+
+def get_thresholds(group: Optional[str] = None) -> Mapping[str, float]:
+    """Get the thresholds of every metric, or of one display group's metrics."""
+    if group is None:
+        return THRESHOLDS
+    return MappingProxyType({name: THRESHOLDS[name] for name in GROUPS[group] if name in THRESHOLDS})
+
+@lru_cache(maxsize=64)
+def _resolve(schema: Tuple[Hashable, ...], group: str) -> Tuple[str, ...]:
+    columns = frozenset(schema)
+    return tuple(name for name in GROUPS[group] if name in columns)
+
+def available_metrics(columns: Iterable[Hashable], group: str) -> Tuple[str, ...]:
+    """Get a display group's metrics that are among the columns, resolved once per schema."""
+    return _resolve(tuple(columns), group)
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from .bank_store import get_bank_store
+from .data_loader import get_dataset_version, set_dataset_version
+from .metric_catalog import get_group
+from .ratios import get_ratio_view
+
+MAX_CACHED_INDEXES = 8
+DEFAULT_PEERS = 10
+MAX_PEERS = 50
+
+# The key financials, compared on a log scale so peers are banks of similar size
+PEER_FINANCIALS = list(get_group('key_financials'))
+# The key metrics, compared as-is; missing ones are computed from the line items
+PEER_RATIOS = list(get_group('key_metrics'))
+
+# Peer indexes keyed by dataset version, oldest first
+_index_cache: Dict[str, 'PeerIndex'] = {}
+
+def normalize_features(values: np.ndarray, log_scale: np.ndarray) -> np.ndarray:
+    """Standardize each feature column to mean 0 and standard deviation 1.
+
+    Columns flagged in ``log_scale`` are moved to a signed log scale first. Missing
+    and infinite values become 0, the column mean, so they don't pull banks apart.
+    Constant columns become all 0.
+    """
+    values = np.where(np.isfinite(values), values, np.nan)
+    values[:, log_scale] = np.sign(values[:, log_scale]) * np.log1p(np.abs(values[:, log_scale]))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+    std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+    normalized = (values - mean) / std
+    return np.nan_to_num(normalized, nan=0.0)
+
+class PeerIndex:
+    """Normalized metric vectors for finding each bank's nearest peers.
+
+    The matrix and its squared row norms are built once per dataset version, so a
+    query is one matrix-vector product over the universe plus a partial sort:
+    no pairwise distance matrix is ever formed.
+    """
+
+    def __init__(self, df: pd.DataFrame, features: Optional[List[str]] = None):
+        self.df = df
+        self.store = get_bank_store(df)
+        ratio_view = get_ratio_view(df)
+        if features is None:
+            features = PEER_FINANCIALS + PEER_RATIOS
+        self.features = ratio_view.available(dict.fromkeys(features))
+
+        values = np.column_stack([
+            ratio_view.get(f).to_numpy(dtype=np.float64) for f in self.features
+        ]) if self.features else np.zeros((len(df), 0))
+        log_scale = np.array([f in PEER_FINANCIALS for f in self.features], dtype=bool)
+        self._matrix = np.ascontiguousarray(normalize_features(values, log_scale), dtype=np.float32)
+        self._norms = np.einsum('ij,ij->i', self._matrix, self._matrix)
+
+    def __len__(self) -> int:
+        return len(self._matrix)
+
+    def nearest(self, bank_name: str, k: int = DEFAULT_PEERS) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the row positions and distances of a bank's k nearest peers, closest first.
+
+        The bank itself is never its own peer; duplicate rows of it are.
+        """
+        position = self.store.position(bank_name)
+        query = self._matrix[position]
+        # |x - q|^2 = |x|^2 - 2 x.q + |q|^2
+        distances = self._norms - 2 * (self._matrix @ query) + self._norms[position]
+        np.maximum(distances, 0, out=distances)
+        distances[position] = np.inf
+
+        k = max(0, min(k, len(distances) - 1))
+        if k == 0:
+            return np.array([], dtype=np.intp), np.array([], dtype=np.float32)
+        if k < len(distances) - 1:
+            candidates = np.argpartition(distances, k)[:k]
+        else:
+            candidates = np.flatnonzero(np.isfinite(distances))
+        # Break distance ties by row position so the peer group is stable
+        order = np.lexsort((candidates, distances[candidates]))
+        peers = candidates[order]
+        return peers, np.sqrt(distances[peers])
+
+    def peer_frame(self, frame: pd.DataFrame, bank_name: str, k: int = DEFAULT_PEERS) -> pd.DataFrame:
+        """Narrow a frame with the indexed rows down to a bank and its k nearest peers.
+
+        The bank comes first, then its peers closest first. The result carries a
+        derived dataset version, so figure caches keyed on it stay cheap.
+        """
+        peers, _ = self.nearest(bank_name, k)
+        positions = np.concatenate([[self.store.position(bank_name)], peers])
+        narrowed = frame.iloc[positions]
+        set_dataset_version(narrowed, f"{get_dataset_version(frame)}:peers:{bank_name}:{k}")
+        return narrowed
+
+    def peer_table(self, bank_name: str, k: int = DEFAULT_PEERS) -> pd.DataFrame:
+        """Get a bank's nearest peers with their distances, closest first."""
+        peers, distances = self.nearest(bank_name, k)
+        return pd.DataFrame({
+            'Bank Name': self.df['Bank Name'].to_numpy()[peers],
+            'Distance': distances.round(3)
+        })
+
+def get_peer_index(df: pd.DataFrame) -> PeerIndex:
+    """Get the cached peer index for this dataset version."""
+    version = get_dataset_version(df)
+    if version not in _index_cache:
+        if len(_index_cache) >= MAX_CACHED_INDEXES:
+            _index_cache.pop(next(iter(_index_cache)))
+        _index_cache[version] = PeerIndex(df)
+    return _index_cache[version]
+
+def clear_index_cache() -> None:
+    """Drop every cached peer index."""
+    _index_cache.clear()
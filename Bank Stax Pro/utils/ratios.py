@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .data_loader import get_dataset_version, set_dataset_version
+
+MAX_CACHED_VIEWS = 8
+
+class Ratio(NamedTuple):
+    """A derived column: its formula is called with the input columns in order."""
+    name: str
+    inputs: Tuple[str, ...]
+    formula: Callable[..., pd.Series]
+    description: str = ''
+
+RATIO_REGISTRY: Dict[str, Ratio] = {}
+
+def register_ratio(name: str, inputs: Iterable[str], formula: Callable[..., pd.Series], description: str = '') -> Ratio:
+    """Add a ratio to the registry. Inputs may be raw columns or other registered ratios."""
+    ratio = Ratio(name, tuple(inputs), formula, description)
+    RATIO_REGISTRY[name] = ratio
+    return ratio
+
+def _divide(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    # A zero denominator gives an infinite ratio; leave it missing instead of charting it
+    ratio = numerator / denominator
+    return ratio.where(np.isfinite(ratio))
+
+def _percent(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    return _divide(numerator, denominator) * 100
+
+register_ratio(
+    'Core Deposits to Total Deposits', ['Core Deposits', 'Total Deposits'], _divide,
+    "Share of deposits that are stable core funding"
+)
+register_ratio(
+    'NPAs to Total Loans', ['Non performing assets', 'Loans'], _divide,
+    "Share of the loan book that is non-performing"
+)
+register_ratio(
+    'Loans to Deposit Ratio', ['Loans', 'Total Deposits'], _divide,
+    "Lending funded per unit of deposits"
+)
+register_ratio(
+    'Solvency Ratio', ['Total Assets', 'Total Liabilities (excluding equity)'], _divide,
+    "Assets available per unit of liabilities"
+)
+register_ratio(
+    'Liquidity Ratio', ['Current Assets', 'Current Liabilities'], _divide,
+    "Short-term assets per unit of short-term liabilities"
+)
+register_ratio(
+    'Total Capital Base', ['Tier-1 Capital', 'Tier-2 capital'], lambda tier1, tier2: tier1 + tier2,
+    "Tier 1 plus Tier 2 capital"
+)
+register_ratio(
+    'Capital Adequacy Ratio', ['Total Capital Base', 'Risk weighted assets'], _percent,
+    "Total capital as a percentage of risk weighted assets"
+)
+
+def get_denominators(registry: Optional[Dict[str, Ratio]] = None) -> List[str]:
+    """Get the columns registered ratios divide by, in registration order."""
+    registry = RATIO_REGISTRY if registry is None else registry
+    denominators = [r.inputs[-1] for r in registry.values() if r.formula in (_divide, _percent)]
+    return list(dict.fromkeys(denominators))
+
+# Ratios that preprocess_data materializes into the processed workbook
+PRECOMPUTED_RATIOS = [
+    'Core Deposits to Total Deposits',
+    'NPAs to Total Loans',
+    'Loans to Deposit Ratio',
+    'Solvency Ratio'
+]
+
+class RatioView:
+    """Resolves ratios against a frame on first request and memoizes each computed column.
+
+    Columns already present in the frame are used as-is unless listed in ``recompute``.
+    Every intermediate result is memoized, so shared inputs are evaluated once.
+    """
+
+    def __init__(self, df: pd.DataFrame, registry: Optional[Dict[str, Ratio]] = None, recompute: Iterable[str] = ()):
+        self.df = df
+        self.registry = RATIO_REGISTRY if registry is None else registry
+        self.recompute = frozenset(recompute)
+        self._columns: Dict[str, pd.Series] = {}
+        self._frames: Dict[Tuple[str, ...], pd.DataFrame] = {}
+
+    def _is_derived(self, name: str) -> bool:
+        if name in self.registry and name in self.recompute:
+            return True
+        return name not in self.df.columns and name in self.registry
+
+    def can_compute(self, name: str, _visiting: frozenset = frozenset()) -> bool:
+        """Check whether a column exists or all of its inputs can be resolved."""
+        if name in self._columns:
+            return True
+        if not self._is_derived(name):
+            return name in self.df.columns
+        if name in _visiting:
+            return False
+        return all(self.can_compute(i, _visiting | {name}) for i in self.registry[name].inputs)
+
+    def available(self, names: Iterable[str]) -> List[str]:
+        """Filter names down to those that exist or can be computed."""
+        return [name for name in names if self.can_compute(name)]
+
+    def get(self, name: str, _visiting: frozenset = frozenset()) -> pd.Series:
+        """Get a column, computing it and its dependencies on first use."""
+        if name in self._columns:
+            return self._columns[name]
+        if not self._is_derived(name):
+            if name not in self.df.columns:
+                raise KeyError(f"Unknown column or ratio: {name}")
+            return self.df[name]
+        if name in _visiting:
+            raise ValueError(f"Circular ratio definition: {name}")
+
+        ratio = self.registry[name]
+        inputs = [self.get(i, _visiting | {name}) for i in ratio.inputs]
+        # Compact frames store inputs as float32 or int32; evaluate formulas at full
+        # precision, and without integer overflow
+        inputs = [
+            i.astype(np.float64) if i.dtype == np.float32 or pd.api.types.is_integer_dtype(i.dtype) else i
+            for i in inputs
+        ]
+        self._columns[name] = ratio.formula(*inputs).rename(name)
+        return self._columns[name]
+
+    def frame(self, names: Iterable[str]) -> pd.DataFrame:
+        """Get a frame with the bank names and the requested columns."""
+        key = tuple(names)
+        if key not in self._frames:
+            frame = pd.DataFrame({'Bank Name': self.df['Bank Name']})
+            for name in key:
+                frame[name] = self.get(name)
+            # Derived frames get their own version so caches keyed on it stay cheap
+            set_dataset_version(frame, f"{get_dataset_version(self.df)}:{'|'.join(key)}")
+            self._frames[key] = frame
+        return self._frames[key]
+
+_view_cache: Dict[str, RatioView] = {}
+
+def get_ratio_view(df: pd.DataFrame) -> RatioView:
+    """Get the cached ratio view for this dataset version."""
+    version = get_dataset_version(df)
+    if version not in _view_cache:
+        if len(_view_cache) >= MAX_CACHED_VIEWS:
+            _view_cache.pop(next(iter(_view_cache)))
+        _view_cache[version] = RatioView(df)
+    return _view_cache[version]
+
+def clear_view_cache() -> None:
+    """Drop every cached ratio view."""
+    _view_cache.clear()
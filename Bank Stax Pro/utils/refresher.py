@@ -0,0 +1,131 @@
+import threading
+import time
+import warnings
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .bank_store import clear_store_cache
+from .correlation import clear_correlation_cache
+from .figure_cache import clear_figure_cache
+from .peers import clear_index_cache
+from .ratios import clear_view_cache
+from .shared_dataset import SharedDataset, get_source_signature
+from .stress import clear_results_cache
+
+# Seconds between checks of a watched data file
+POLL_INTERVAL = 1.0
+# A changed file is loaded once its modification time and size hold still for this many polls
+STABLE_POLLS = 2
+
+# Refreshers keyed by the dataset they watch
+_refreshers: Dict[SharedDataset, 'DataRefresher'] = {}
+_refreshers_lock = threading.Lock()
+
+def invalidate_caches() -> None:
+    """Drop every cache derived from a dataset version, so the replaced version can be freed."""
+    for clear in (clear_figure_cache, clear_store_cache, clear_view_cache, clear_index_cache, clear_results_cache,
+                  clear_correlation_cache):
+        clear()
+
+def validate_frame(df: pd.DataFrame) -> None:
+    """Check that a freshly loaded dataset is fit to publish; load_data checks the required columns."""
+    if df.empty:
+        raise ValueError("Data file has no rows")
+    duplicated = df.columns[df.columns.duplicated()].tolist()
+    if duplicated:
+        raise ValueError(f"Duplicate columns: {', '.join(map(str, duplicated))}")
+
+class DataRefresher:
+    """Watches a shared dataset's source file and publishes each new version from a background thread.
+
+    A changed file is only loaded once it has stopped changing, and only published if it
+    loads, validates and is still unchanged afterwards, so reruns never wait on I/O or
+    see a half-written file. A file that fails is retried once it changes again.
+    """
+
+    def __init__(self, dataset: SharedDataset, interval: float = POLL_INTERVAL, stable_polls: int = STABLE_POLLS,
+                 on_publish: Optional[Callable[[], None]] = invalidate_caches):
+        self.dataset = dataset
+        self.interval = interval
+        self.stable_polls = stable_polls
+        self.on_publish = on_publish
+        self.last_error: Optional[str] = None
+        self.last_refresh: Optional[float] = None
+        self._pending: Optional[Tuple[int, int]] = None
+        self._stable = 0
+        self._failed: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'DataRefresher':
+        """Start watching; from now on reruns never reload the dataset themselves."""
+        if self._thread is None:
+            self.dataset.watched = True
+            self._thread = threading.Thread(target=self._run, name='data-refresher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop watching and hand reloading back to reruns."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.dataset.watched = False
+
+    def _run(self) -> None:
+        # Load the first version here too, unless a rerun got there first
+        if self.dataset.current() is None:
+            try:
+                self.dataset.reload()
+            except Exception as e:
+                self.last_error = str(e)
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                # The watcher must outlive any single bad poll
+                self.last_error = str(e)
+
+    def poll(self) -> bool:
+        """Check the source once and publish a new version if it is ready; True if one was published."""
+        signature = get_source_signature(self.dataset.source)
+        # A missing file is mid-replace or gone; keep serving the current version
+        if signature is None or signature == self.dataset.signature or signature == self._failed:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            self._pending, self._stable = signature, 0
+        self._stable += 1
+        if self._stable < self.stable_polls:
+            return False
+        return self.refresh(signature)
+
+    def refresh(self, signature: Tuple[int, int]) -> bool:
+        """Load, validate and publish the source as of this signature; True if it was published."""
+        try:
+            df = self.dataset.loader()
+            validate_frame(df)
+        except Exception as e:
+            self._failed = signature
+            self.last_error = str(e)
+            warnings.warn(f"keeping the current data, {self.dataset.source} failed to load: {e}", RuntimeWarning, stacklevel=2)
+            return False
+        if get_source_signature(self.dataset.source) != signature:
+            # Changed while loading; later polls pick up the newer version
+            return False
+
+        self.dataset.publish(df, signature)
+        self._pending = None
+        self.last_error = None
+        self.last_refresh = time.time()
+        if self.on_publish is not None:
+            self.on_publish()
+        return True
+
+def start_refresher(dataset: SharedDataset, interval: float = POLL_INTERVAL) -> DataRefresher:
+    """Start watching a shared dataset in the background, once per dataset per process."""
+    with _refreshers_lock:
+        if dataset not in _refreshers:
+            _refreshers[dataset] = DataRefresher(dataset, interval).start()
+        return _refreshers[dataset]
@@ -0,0 +1,140 @@
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import get_dataset_version, load_data, set_dataset_version
+
+# Shared datasets keyed by (absolute source path, compact)
+_datasets: Dict[Tuple[str, bool], 'SharedDataset'] = {}
+_registry_lock = threading.Lock()
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    values = np.array(values, copy=True)
+    values.flags.writeable = False
+    return values
+
+def freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy a frame onto read-only column arrays, so in-place writes raise instead of changing it.
+
+    NumPy columns and categorical codes are made read-only; Arrow-backed columns
+    are immutable buffers already. The dataset version is computed once here.
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns[name] = pd.Categorical.from_codes(_read_only(series.cat.codes.to_numpy()), dtype=series.dtype)
+        elif isinstance(series.dtype, np.dtype):
+            columns[name] = _read_only(series.to_numpy())
+        else:
+            columns[name] = series.array
+    frozen = pd.DataFrame(columns, index=df.index, copy=False)
+    frozen.attrs.update(df.attrs)
+    # Same contents as the loaded frame, so it keeps the loaded frame's version
+    set_dataset_version(frozen, get_dataset_version(df))
+    return frozen
+
+def make_view(frame: pd.DataFrame) -> pd.DataFrame:
+    """Get a session's zero-copy view of a frozen frame.
+
+    Adding or replacing columns only changes the view. Extension arrays other than
+    categoricals are re-wrapped, since they swap their buffers on assignment; for
+    Arrow columns that copies no data.
+    """
+    view = frame.copy(deep=False)
+    # Iterating dtypes, not columns, avoids building and caching a Series per column
+    for name, dtype in frame.dtypes.items():
+        if not isinstance(dtype, (np.dtype, pd.CategoricalDtype)):
+            view[name] = frame[name].array.copy()
+    # A view shares the frozen data, so it shares its version too
+    set_dataset_version(view, get_dataset_version(frame))
+    return view
+
+def get_source_signature(file_path: str) -> Optional[Tuple[int, int]]:
+    """Get a data file's modification time and size, or None for globs and missing paths."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class SharedDataset:
+    """One frozen copy of a dataset per server process, shared by every session.
+
+    Sessions get zero-copy views, so each extra session costs a few objects rather
+    than a copy of the data. A new version is loaded by one thread while the others
+    keep serving the current one, then swapped in with a single reference assignment.
+    """
+
+    def __init__(self, loader: Callable[[], pd.DataFrame], source: Optional[str] = None):
+        self.loader = loader
+        self.source = source
+        self._load_lock = threading.Lock()
+        # (frozen frame, source signature), replaced as one reference so readers never see a mix
+        self._current: Tuple[Optional[pd.DataFrame], Optional[Tuple[int, int]]] = (None, None)
+        self.generation = 0
+        # Set by a background refresher, which then owns reloading
+        self.watched = False
+
+    def current(self) -> Optional[pd.DataFrame]:
+        """Get the frozen frame currently served, or None before the first load."""
+        return self._current[0]
+
+    @property
+    def signature(self) -> Optional[Tuple[int, int]]:
+        """Get the source signature the current version was loaded from."""
+        return self._current[1]
+
+    def is_stale(self) -> bool:
+        """Check whether the source file changed since the current version was loaded."""
+        return self.source is not None and get_source_signature(self.source) != self._current[1]
+
+    def get(self) -> pd.DataFrame:
+        """Get a session view of the current version, loading it first if it is missing or stale.
+
+        Once a refresher watches the dataset, only the first load happens here.
+        """
+        frame = self.current()
+        if frame is None or (not self.watched and self.is_stale()):
+            frame = self.reload(wait=frame is None)
+        return make_view(frame)
+
+    def reload(self, wait: bool = True) -> pd.DataFrame:
+        """Load the source again and publish it, unless it is unchanged since the last load.
+
+        Without ``wait``, a reload already running in another thread is not waited
+        for; the current version is returned instead.
+        """
+        if not self._load_lock.acquire(blocking=wait):
+            return self.current()
+        try:
+            # The signature is taken before loading, so a change mid-load triggers another reload
+            signature = get_source_signature(self.source) if self.source is not None else None
+            frame, loaded_signature = self._current
+            if frame is not None and self.source is not None and signature == loaded_signature:
+                return frame
+            return self.publish(self.loader(), signature)
+        finally:
+            self._load_lock.release()
+
+    def publish(self, df: pd.DataFrame, signature: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+        """Freeze a frame and swap it in; reruns already holding a view keep the version they started with."""
+        frozen = freeze_frame(df)
+        self._current = (frozen, signature)
+        self.generation += 1
+        return frozen
+
+def get_shared_dataset(file_path: str, compact: bool = False) -> SharedDataset:
+    """Get the process-wide shared dataset for a data file."""
+    key = (os.path.abspath(file_path), compact)
+    with _registry_lock:
+        if key not in _datasets:
+            _datasets[key] = SharedDataset(lambda: load_data(file_path, compact=compact), source=file_path)
+        return _datasets[key]
+
+def load_shared_data(file_path: str, compact: bool = False) -> pd.DataFrame:
+    """Get a read-only view of the process-wide copy of a data file, loading it once per version."""
+    return get_shared_dataset(file_path, compact).get()
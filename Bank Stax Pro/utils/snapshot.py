@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from .instrumentation import stage
+
+SNAPSHOT_DIR_NAME = '.snapshots'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def get_file_hash(file_path: str) -> str:
+    """Return the SHA-256 content hash of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_snapshot_paths(file_path: str) -> Dict[str, Path]:
+    """Get the snapshot and manifest paths for a source file."""
+    source = Path(file_path).resolve()
+    snapshot_dir = source.parent / SNAPSHOT_DIR_NAME
+    # Key the snapshot files by the absolute source path
+    key = hashlib.sha1(str(source).encode('utf-8')).hexdigest()[:16]
+    return {
+        'snapshot': snapshot_dir / f"{source.stem}-{key}.feather",
+        'manifest': snapshot_dir / f"{source.stem}-{key}.json"
+    }
+
+
+def read_manifest(manifest_path: Path) -> Optional[dict]:
+    """Read a snapshot manifest, returning None if it is missing or corrupt."""
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_snapshot(df: pd.DataFrame, paths: Dict[str, Path], manifest: dict) -> None:
+    """Write the snapshot and its manifest, replacing any previous version atomically."""
+    paths['snapshot'].parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_snapshot = paths['snapshot'].with_suffix('.feather.tmp')
+    df.reset_index(drop=True).to_feather(tmp_snapshot)
+    os.replace(tmp_snapshot, paths['snapshot'])
+    write_manifest(paths['manifest'], manifest)
+
+
+def write_manifest(manifest_path: Path, manifest: dict) -> None:
+    """Write a snapshot manifest through a temporary file, so readers never see a partial one."""
+    tmp_manifest = manifest_path.with_suffix('.json.tmp')
+    with open(tmp_manifest, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_manifest, manifest_path)
+
+
+def load_snapshot(file_path: str, reader: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Load a data file through its columnar snapshot, rebuilding it only when the source changes.
+
+    The snapshot is keyed by the source path, its modification time and its content
+    hash. An unchanged mtime serves the snapshot directly; a changed mtime triggers a
+    hash check so that a touched-but-identical file does not force a full re-parse.
+
+    Args:
+        file_path (str): Path to the source data file
+        reader (Callable): Function that parses the source file into a DataFrame
+
+    Returns:
+        pd.DataFrame: Data frame with the source content hash in ``attrs['dataset_version']``
+    """
+    paths = get_snapshot_paths(file_path)
+    stat = os.stat(file_path)
+    manifest = read_manifest(paths['manifest'])
+    content_hash = None
+
+    if manifest is not None and paths['snapshot'].exists():
+        if manifest['mtime_ns'] == stat.st_mtime_ns and manifest['size'] == stat.st_size:
+            content_hash = manifest['content_hash']
+        else:
+            with stage('hash_source'):
+                content_hash = get_file_hash(file_path)
+            if content_hash == manifest['content_hash']:
+                # Same content, new mtime: refresh the manifest and keep the snapshot
+                manifest.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                try:
+                    write_manifest(paths['manifest'], manifest)
+                except OSError as e:
+                    # The snapshot is still valid; the next load just hashes the source again
+                    warnings.warn(f"could not refresh snapshot manifest for {file_path}: {e}",
+                                  RuntimeWarning, stacklevel=2)
+
+        if content_hash == manifest['content_hash']:
+            try:
+                with stage('read_snapshot'):
+                    df = pd.read_feather(paths['snapshot'])
+                df.attrs['dataset_version'] = content_hash
+                return df
+            except Exception:
+                # Fall through and rebuild a corrupt snapshot
+                pass
+
+    if content_hash is None:
+        with stage('hash_source'):
+            content_hash = get_file_hash(file_path)
+    df = reader(file_path)
+    try:
+        with stage('write_snapshot'):
+            write_snapshot(df, paths, {
+                'source': str(Path(file_path).resolve()),
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'content_hash': content_hash
+            })
+    except (ImportError, OSError, ValueError, TypeError) as e:
+        # A read-only data directory or mixed-type columns only cost us the cache
+        warnings.warn(f"could not write snapshot for {file_path}: {e}", RuntimeWarning, stacklevel=2)
+    df.attrs['dataset_version'] = content_hash
+    return df
@@ -0,0 +1,276 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+from .data_loader import get_dataset_version, set_dataset_version
+
+HORIZON_QUARTERS = 9
+MAX_CACHED_RESULTS = 8
+# Tensor elements per Monte Carlo block, which bounds memory whatever the path count
+MC_BLOCK_ELEMENTS = 4_000_000
+DEFAULT_PATHS = 1000
+TAX_RATE = 0.21
+# Share of newly non-performing loans provisioned for when they migrate
+NPA_PROVISION_RATE = 0.5
+# Non-performing exposures are risk weighted at 150% instead of 100%
+NPA_EXTRA_RISK_WEIGHT = 0.5
+# Loss on the liquid assets sold to meet deposit runoff
+FIRE_SALE_HAIRCUT = 0.05
+# Scenario severity by quarter: shocks build, peak in the first year, then fade
+SHOCK_PROFILE = np.array([0.6, 0.8, 1.0, 1.0, 0.9, 0.8, 0.7, 0.6, 0.5])
+# Monte Carlo shocks are lognormal factors with mean 1: a systemic one per
+# (scenario, quarter, path) shared by every bank, and one per (bank, path) on its credit losses
+SYSTEMIC_VOLATILITY = 0.25
+IDIOSYNCRATIC_VOLATILITY = 0.15
+
+REQUIRED_COLUMNS = ['Loans', 'Tier-1 Capital', 'Risk weighted assets']
+
+class Scenario(NamedTuple):
+    """Quarterly shock rates at the scenario's peak."""
+    name: str
+    loss_rate: float        # Share of performing loans charged off per quarter
+    npa_migration: float    # Share of performing loans turning non-performing per quarter
+    deposit_runoff: float   # Share of deposits withdrawn per quarter
+    ppnr_multiplier: float  # Pre-provision earnings relative to the current run-rate
+
+SCENARIOS = [
+    Scenario('Baseline', 0.0015, 0.0020, 0.000, 1.0),
+    Scenario('Adverse', 0.0050, 0.0060, 0.010, 0.6),
+    Scenario('Severely Adverse', 0.0100, 0.0120, 0.025, 0.2)
+]
+
+# Chart columns: the lowest projected ratio over the horizon, and its regulatory minimum
+STRESSED_METRICS: Dict[str, str] = {
+    'Stressed CET1 Ratio': 'cet1_ratio',
+    'Stressed Tier 1 Ratio': 'tier1_ratio',
+    'Stressed Leverage Ratio': 'leverage_ratio'
+}
+MONTE_CARLO_METRIC = 'Stressed CET1 Ratio (MC p5)'
+
+# Stress results keyed by (dataset version, scenario, paths), oldest first
+_results_cache: Dict[Tuple[str, str, int], pd.DataFrame] = {}
+
+def can_project(df: pd.DataFrame) -> bool:
+    """Check whether the frame has the line items the projection starts from."""
+    return all(column in df.columns for column in REQUIRED_COLUMNS)
+
+def get_starting_position(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Get each bank's starting balance sheet from its line items.
+
+    CET1 and leverage come as percentages; without them CET1 falls back to Tier 1
+    capital and the leverage exposure to total assets.
+    """
+    def column(name: str, default: float = 0.0) -> np.ndarray:
+        if name not in df.columns:
+            return np.full(len(df), default)
+        return np.nan_to_num(df[name].to_numpy(dtype=np.float64), nan=default)
+
+    rwa = column('Risk weighted assets', np.nan)
+    tier1 = column('Tier-1 Capital', np.nan)
+    cet1_pct = column('Common Equity Tier 1 Capital', np.nan)
+    leverage_pct = column('Leverage Ratio', np.nan)
+    total_assets = column('Total Assets', np.nan)
+
+    cet1 = np.where(np.isnan(cet1_pct), tier1, np.minimum(cet1_pct / 100 * rwa, tier1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exposure = np.where(leverage_pct > 0, tier1 / (leverage_pct / 100), total_assets)
+
+    return {
+        'loans': column('Loans') - column('Non performing assets'),
+        'deposits': column('Total Deposits'),
+        # PAT is annual and after tax; the quarterly pre-tax run-rate stands in for PPNR
+        'ppnr': column('PAT') / (1 - TAX_RATE) / 4,
+        'cet1': cet1,
+        'additional_tier1': tier1 - cet1,
+        'rwa': rwa,
+        'exposure': exposure
+    }
+
+def get_scenario_rates(scenarios: Sequence[Scenario]) -> Dict[str, np.ndarray]:
+    """Get each scenario's quarterly rates as (scenarios, quarters) arrays."""
+    profile = SHOCK_PROFILE[:HORIZON_QUARTERS]
+    rates = {
+        field: np.array([getattr(s, field) for s in scenarios])[:, None] * profile
+        for field in ('loss_rate', 'npa_migration', 'deposit_runoff')
+    }
+    rates['ppnr_multiplier'] = np.repeat(
+        np.array([s.ppnr_multiplier for s in scenarios])[:, None], len(profile), axis=1
+    )
+    return rates
+
+def _shift(cumulative: np.ndarray) -> np.ndarray:
+    """Turn end-of-quarter cumulative products into start-of-quarter ones (axis 1)."""
+    ones = np.ones_like(cumulative[:, :1])
+    return np.concatenate([ones, cumulative[:, :-1]], axis=1)
+
+def get_path_factors(rates: Dict[str, np.ndarray], systemic: np.ndarray) -> Dict[str, np.ndarray]:
+    """Get the cumulative effect of each scenario path per unit of balance sheet.
+
+    Rates are (scenarios, quarters) and systemic shocks (scenarios, quarters, paths).
+    Each factor is (scenarios, quarters, paths), cumulative to the end of each
+    quarter: e.g. 'loan_capital' is the CET1 lost per unit of performing loans.
+    Every balance in the projection is linear in these factors, so the per-bank
+    work reduces to a few multiply-adds.
+    """
+    loss = rates['loss_rate'][:, :, None] * systemic
+    migration = rates['npa_migration'][:, :, None] * systemic
+    runoff = rates['deposit_runoff'][:, :, None] * systemic
+    performing = _shift(np.cumprod(np.clip(1 - loss - migration, 0, 1), axis=1))
+    deposits = _shift(np.cumprod(1 - runoff, axis=1))
+
+    return {
+        'loan_capital': np.cumsum((1 - TAX_RATE) * (loss + NPA_PROVISION_RATE * migration) * performing, axis=1),
+        'loan_rwa': np.cumsum((NPA_EXTRA_RISK_WEIGHT * migration - loss) * performing, axis=1),
+        'loan_exposure': np.cumsum(loss * performing, axis=1),
+        'deposit_capital': np.cumsum((1 - TAX_RATE) * FIRE_SALE_HAIRCUT * runoff * deposits, axis=1),
+        'deposit_exposure': np.cumsum((1 + FIRE_SALE_HAIRCUT) * runoff * deposits, axis=1),
+        # Earnings fall as losses rise
+        'earnings': np.cumsum((1 - TAX_RATE) * rates['ppnr_multiplier'][:, :, None] / np.sqrt(systemic), axis=1)
+    }
+
+def _project(start: Dict[str, np.ndarray], factors: Dict[str, np.ndarray], scenario: int,
+             idiosyncratic: np.ndarray, metrics: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Project one scenario's ratios as (banks, quarters, paths) arrays, in percent.
+
+    ``idiosyncratic`` is a (banks, paths) multiplier on each bank's own credit losses.
+    It scales losses but does not deplete the bank's loan book any further, which
+    keeps the projection linear in the shared path factors; without shocks the two
+    are identical. Works in place on a single scratch buffer, since every full-size
+    temporary costs a pass over the tensor.
+    """
+    def factor(name: str) -> np.ndarray:
+        return factors[name][scenario][None, :, :]
+
+    def bank(values: np.ndarray) -> np.ndarray:
+        return values[:, None, None]
+
+    loans = (start['loans'][:, None] * idiosyncratic)[:, None, :]
+    earnings = (start['ppnr'][:, None] / np.sqrt(idiosyncratic))[:, None, :]
+    scratch = np.empty(np.broadcast_shapes(loans.shape, factor('earnings').shape), dtype=loans.dtype)
+    projected = {}
+
+    cet1 = earnings * factor('earnings')
+    cet1 -= np.multiply(loans, factor('loan_capital'), out=scratch)
+    cet1 -= np.multiply(bank(start['deposits']), factor('deposit_capital'), out=scratch)
+    cet1 += bank(start['cet1'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 100 / RWA, reused for both risk-based ratios
+        rwa_scale = loans * factor('loan_rwa')
+        rwa_scale += bank(start['rwa'])
+        np.divide(100, rwa_scale, out=rwa_scale)
+        if 'cet1_ratio' in metrics:
+            projected['cet1_ratio'] = cet1 * rwa_scale
+        tier1 = cet1
+        tier1 += bank(start['additional_tier1'])
+        if 'tier1_ratio' in metrics:
+            projected['tier1_ratio'] = tier1 * rwa_scale
+        if 'leverage_ratio' in metrics:
+            exposure = np.multiply(loans, factor('loan_exposure'), out=rwa_scale)
+            exposure += np.multiply(bank(start['deposits']), factor('deposit_exposure'), out=scratch)
+            np.subtract(bank(start['exposure']), exposure, out=exposure)
+            np.divide(tier1, exposure, out=exposure)
+            exposure *= 100
+            projected['leverage_ratio'] = exposure
+    return projected
+
+def _sorted_percentiles(values: np.ndarray, percentiles: Sequence[float]) -> np.ndarray:
+    """Get linearly interpolated percentiles along the last axis, as np.percentile does.
+
+    Sorting short rows is several times faster than np.percentile's partitioning
+    for the many rows of a Monte Carlo run; NaN sorts last, as it is ignored here.
+    """
+    values = np.sort(values, axis=-1)
+    counts = np.maximum((~np.isnan(values)).sum(axis=-1, keepdims=True), 1)
+    results = []
+    for q in percentiles:
+        position = (counts - 1) * (q / 100)
+        lower = np.floor(position).astype(np.intp)
+        upper = np.minimum(lower + 1, counts - 1)
+        below = np.take_along_axis(values, lower, axis=-1)
+        above = np.take_along_axis(values, upper, axis=-1)
+        results.append((below + (above - below) * (position - lower))[..., 0])
+    return np.stack(results, axis=-1)
+
+def project_scenarios(df: pd.DataFrame, scenarios: Sequence[Scenario] = SCENARIOS) -> Dict[str, np.ndarray]:
+    """Project CET1, Tier 1 and leverage ratios for every bank under every scenario.
+
+    Returns one (banks, scenarios, quarters) array per ratio, in percent.
+    """
+    start = get_starting_position(df)
+    factors = get_path_factors(get_scenario_rates(scenarios), np.ones((len(scenarios), HORIZON_QUARTERS, 1)))
+    no_shock = np.ones((len(df), 1))
+    metrics = list(STRESSED_METRICS.values())
+    projected = [_project(start, factors, s, no_shock, metrics) for s in range(len(scenarios))]
+    return {
+        metric: np.stack([p[metric][:, :, 0] for p in projected], axis=1)
+        for metric in STRESSED_METRICS.values()
+    }
+
+def simulate_scenarios(df: pd.DataFrame, n_paths: int = DEFAULT_PATHS, scenarios: Sequence[Scenario] = SCENARIOS,
+                       percentiles: Sequence[float] = (5, 50, 95), seed: int = 0,
+                       metrics: Sequence[str] = tuple(STRESSED_METRICS.values())) -> Dict[str, np.ndarray]:
+    """Run Monte Carlo paths around every scenario and summarize each bank's worst quarter.
+
+    The banks x quarters x paths tensor runs in float32 blocks sized by
+    MC_BLOCK_ELEMENTS, so memory stays flat as the path count grows. Returns one
+    (banks, scenarios, percentiles) array per ratio in ``metrics``: percentiles
+    across paths of the lowest ratio over the horizon.
+    """
+    rng = np.random.default_rng(seed)
+    n_banks, n_scenarios = len(df), len(scenarios)
+
+    def lognormal(shape: Tuple[int, ...], sigma: float) -> np.ndarray:
+        return np.exp(sigma * rng.standard_normal(shape, dtype=np.float32) - np.float32(sigma ** 2 / 2))
+
+    start = {k: v.astype(np.float32) for k, v in get_starting_position(df).items()}
+    systemic = lognormal((n_scenarios, HORIZON_QUARTERS, n_paths), SYSTEMIC_VOLATILITY)
+    idiosyncratic = lognormal((n_banks, n_paths), IDIOSYNCRATIC_VOLATILITY)
+    factors = {
+        k: v.astype(np.float32)
+        for k, v in get_path_factors(get_scenario_rates(scenarios), systemic).items()
+    }
+
+    minimums = {metric: np.empty((n_banks, n_scenarios, n_paths), dtype=np.float32)
+                for metric in metrics}
+    block = max(1, MC_BLOCK_ELEMENTS // max(1, n_banks * HORIZON_QUARTERS))
+    for first in range(0, n_paths, block):
+        paths = slice(first, min(first + block, n_paths))
+        block_factors = {k: v[:, :, paths] for k, v in factors.items()}
+        for s in range(n_scenarios):
+            projected = _project(start, block_factors, s, idiosyncratic[:, paths], metrics)
+            for metric, values in projected.items():
+                minimums[metric][:, s, paths] = values.min(axis=1)
+
+    return {
+        metric: _sorted_percentiles(values, percentiles)
+        for metric, values in minimums.items()
+    }
+
+def build_stress_frame(df: pd.DataFrame, scenario: str, n_paths: int = DEFAULT_PATHS) -> pd.DataFrame:
+    """Build the chartable stress results for one scenario: the lowest ratios over the horizon."""
+    position = [s.name for s in SCENARIOS].index(scenario)
+    projected = project_scenarios(df, [SCENARIOS[position]])
+    frame = pd.DataFrame({'Bank Name': df['Bank Name'].to_numpy()}, index=df.index)
+    for name, metric in STRESSED_METRICS.items():
+        # fmin skips NaN like nanmin, but banks without RWA data stay NaN without an All-NaN warning
+        frame[name] = np.fmin.reduce(projected[metric][:, 0, :], axis=1)
+    if n_paths:
+        simulated = simulate_scenarios(df, n_paths, [SCENARIOS[position]], percentiles=[5], metrics=['cet1_ratio'])
+        frame[MONTE_CARLO_METRIC] = simulated['cet1_ratio'][:, 0, 0]
+    return frame
+
+def get_stress_frame(df: pd.DataFrame, scenario: str, n_paths: int = DEFAULT_PATHS) -> pd.DataFrame:
+    """Get the cached stress results for this dataset version and scenario."""
+    version = get_dataset_version(df)
+    key = (version, scenario, n_paths)
+    if key not in _results_cache:
+        if len(_results_cache) >= MAX_CACHED_RESULTS:
+            _results_cache.pop(next(iter(_results_cache)))
+        frame = build_stress_frame(df, scenario, n_paths)
+        set_dataset_version(frame, f"{version}:stress:{scenario}:{n_paths}")
+        _results_cache[key] = frame
+    return _results_cache[key]
+
+def clear_results_cache() -> None:
+    """Drop every cached stress result."""
+    _results_cache.clear()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+from .data_loader import MARKET_STANDARDS, LOWER_IS_BETTER
+
+def build_threshold_rules(standards: Dict[str, float], lower_is_better: Iterable[str] = ()) -> pd.DataFrame:
+    """Build a rule table (metric, bound, direction) from a standards mapping."""
+    lower_is_better = set(lower_is_better)
+    return pd.DataFrame({
+        'metric': list(standards.keys()),
+        'bound': [float(v) for v in standards.values()],
+        'direction': ['lower' if m in lower_is_better else 'higher' for m in standards]
+    })
+
+# The default rule table is built once at import instead of on every check
+THRESHOLD_RULES = build_threshold_rules(MARKET_STANDARDS, LOWER_IS_BETTER)
+
+def get_threshold_rules() -> pd.DataFrame:
+    """Get the default threshold rule table."""
+    return THRESHOLD_RULES
+
+def evaluate_thresholds(df: pd.DataFrame, rules: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Return a banks x metrics boolean pass mask for every rule whose metric is in df.
+
+    Missing values never pass.
+    """
+    if rules is None:
+        rules = THRESHOLD_RULES
+    rules = rules[rules['metric'].isin(df.columns)]
+    metrics = rules['metric'].tolist()
+
+    values = df[metrics].to_numpy(dtype=float, na_value=np.nan)
+    bounds = rules['bound'].to_numpy(dtype=float)
+    # Flip the sign of lower-is-better metrics so every rule reads "value >= bound"
+    signs = np.where(rules['direction'].to_numpy() == 'lower', -1.0, 1.0)
+    with np.errstate(invalid='ignore'):
+        passed = values * signs >= bounds * signs
+
+    return pd.DataFrame(passed, index=df.index, columns=metrics)
+
+def get_breach_summary(df: pd.DataFrame, rules: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """List every (bank, metric) pair whose value fails its threshold; missing values are left out."""
+    if rules is None:
+        rules = THRESHOLD_RULES
+    mask = evaluate_thresholds(df, rules)
+    values = df[mask.columns].to_numpy(dtype=float, na_value=np.nan)
+    # Missing values never pass, but they aren't breaches; the data-quality report lists them
+    rows, cols = np.nonzero(~mask.to_numpy() & ~np.isnan(values))
+    metrics = mask.columns.to_numpy()[cols]
+    bounds = rules.set_index('metric')['bound']
+
+    return pd.DataFrame({
+        'Bank Name': df['Bank Name'].to_numpy()[rows],
+        'Metric': metrics,
+        'Value': values[rows, cols],
+        'Threshold': bounds.reindex(metrics).to_numpy()
+    })
@@ -0,0 +1,135 @@
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metric_catalog import BOUNDS, METRICS
+from .ratios import RATIO_REGISTRY, get_denominators
+
+# Banks named per issue in the report
+MAX_EXAMPLES = 3
+
+# Checks whose rows are quarantined; the rest are only reported
+ERROR_CHECKS = frozenset(['missing_name', 'duplicate_name', 'non_numeric', 'infinite',
+                          'negative_denominator', 'out_of_range'])
+ISSUE_COLUMNS = ['check', 'column', 'severity', 'count', 'examples']
+
+class QualityReport(NamedTuple):
+    """Issues found in a frame, one row per (check, column), and the rows with errors.
+
+    Reports are read-only, so copying one returns it as-is; pandas deep-copies
+    ``attrs`` into every derived frame, and a report there then costs nothing.
+    """
+    issues: pd.DataFrame
+    bad_rows: np.ndarray
+    rows: int
+    quarantined: int = 0
+
+    def __copy__(self) -> 'QualityReport':
+        return self
+
+    def __deepcopy__(self, memo: Dict) -> 'QualityReport':
+        return self
+
+    @property
+    def is_clean(self) -> bool:
+        return not (self.issues['severity'] == 'error').any()
+
+    def to_dict(self) -> Dict:
+        """Get a JSON-safe summary of the report."""
+        return {
+            'rows': self.rows,
+            'bad_rows': int(self.bad_rows.sum()),
+            'quarantined': self.quarantined,
+            'issues': self.issues.to_dict('records')
+        }
+
+def get_numeric_columns(df: pd.DataFrame, expected: Optional[Iterable[str]] = None) -> List[str]:
+    """Get the columns that should hold numbers: numeric dtypes plus catalogued metrics and ratios."""
+    expected = set(METRICS) | set(RATIO_REGISTRY) if expected is None else set(expected)
+    return [
+        name for name, dtype in df.dtypes.items()
+        if name in expected or (pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype))
+    ]
+
+def _examples(names: np.ndarray, rows: np.ndarray) -> List[str]:
+    return [str(name) for name in names[rows[:MAX_EXAMPLES]]]
+
+def check_quality(df: pd.DataFrame, name_column: str = 'Bank Name',
+                  numeric_columns: Optional[List[str]] = None) -> QualityReport:
+    """Check every column for type errors, missing and infinite values, negative denominators,
+    out-of-range ratios and duplicate bank names.
+
+    Each check is one vectorized operation per column, so the cost grows with the
+    number of columns, not rows, in Python.
+    """
+    issues = []
+    bad_rows = np.zeros(len(df), dtype=bool)
+    names = df[name_column].to_numpy(dtype=object)
+
+    def record(check: str, column: str, mask: np.ndarray) -> None:
+        count = np.count_nonzero(mask)
+        if count:
+            severity = 'error' if check in ERROR_CHECKS else 'warning'
+            issues.append((check, column, severity, count, _examples(names, np.flatnonzero(mask))))
+            if severity == 'error':
+                bad_rows[mask] = True
+
+    # One factorize finds every duplicate; missing names get code -1
+    codes, uniques = pd.factorize(names)
+    record('missing_name', name_column, codes < 0)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    if len(counts) and counts.max() > 1:
+        duplicated = (codes >= 0) & (counts[codes] > 1)
+        record('duplicate_name', name_column, duplicated)
+        # The first row for a name stays; only later copies are quarantined
+        first = np.zeros(len(df), dtype=bool)
+        first[np.unique(codes, return_index=True)[1]] = True
+        bad_rows[duplicated & first] = False
+
+    if numeric_columns is None:
+        numeric_columns = get_numeric_columns(df)
+    denominators = set(get_denominators())
+    for column in numeric_columns:
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+            missing = np.isnan(values)
+        else:
+            # Text in a numeric column: values that don't parse count as type errors
+            values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            missing = series.isna().to_numpy()
+            record('non_numeric', column, np.isnan(values) & ~missing)
+        record('missing', column, missing)
+        record('infinite', column, np.isinf(values))
+
+        with np.errstate(invalid='ignore'):
+            if column in denominators:
+                record('negative_denominator', column, values < 0)
+            if column in BOUNDS:
+                lower, upper = BOUNDS[column]
+                record('out_of_range', column, (values < (-np.inf if lower is None else lower))
+                       | (values > (np.inf if upper is None else upper)))
+
+    bad_rows.flags.writeable = False
+    return QualityReport(pd.DataFrame(issues, columns=ISSUE_COLUMNS), bad_rows, len(df))
+
+def quarantine_rows(df: pd.DataFrame, report: QualityReport) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split a frame into the rows without errors and the quarantined rows.
+
+    The clean rows carry the report in ``attrs['quality_report']``, with the
+    number of rows quarantined.
+    """
+    clean, quarantined = df[~report.bad_rows], df[report.bad_rows]
+    clean.attrs['quality_report'] = report._replace(quarantined=len(quarantined))
+    return clean, quarantined
+
+if __name__ == "__main__":
+    # python -m utils.validation <data file>
+    from .data_loader import load_data
+
+    report = load_data(sys.argv[1], use_snapshot=False).attrs['quality_report']
+    print(f"{report.rows} rows, {int(report.bad_rows.sum())} with errors")
+    with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.max_colwidth', 80):
+        print(report.issues.to_string(index=False) if len(report.issues) else "No issues found")
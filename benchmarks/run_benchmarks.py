@@ -0,0 +1,214 @@
+"""Headless benchmarks for the data and chart hot paths over synthetic bank universes.
+
+Example:
+
+    python benchmarks/run_benchmarks.py --sizes 10,1000,100000 --output results.json
+    python benchmarks/run_benchmarks.py --baseline results.json --tolerance 0.25
+"""
+import argparse
+import gc
+import importlib
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, List, Optional
+
+from synthetic import generate_bank_universe, generate_line_items, write_universe
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BANK_STAX_DIR = REPO_ROOT / 'Bank Stax Pro'
+DASHBOARD_DIR = REPO_ROOT / 'financial-dashboard'
+ANALYSIS_DIR = REPO_ROOT / 'financial_analysis' / 'src'
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+DEFAULT_FORMATS = ['csv', 'xlsx', 'columnar']
+# Writing and parsing Excel grows slowly enough to dominate a run, so it is capped by default
+DEFAULT_MAX_XLSX_BANKS = 10000
+# Timings below this many seconds are too noisy to flag as regressions
+NOISE_FLOOR_SECONDS = 0.005
+
+def import_app_modules(app_dir: Path, module_names: List[str]) -> Dict[str, ModuleType]:
+    """Import modules from one app directory.
+
+    The apps share top-level module names such as ``utils``, so each app is imported
+    with its directory first on sys.path and its modules are dropped from
+    sys.modules afterwards. The returned modules keep working.
+    """
+    shadowed = ('utils', 'app', 'grading', 'bank_store', 'preprocess_data')
+
+    def drop_shadowed():
+        for name in list(sys.modules):
+            if name.split('.')[0] in shadowed:
+                del sys.modules[name]
+
+    drop_shadowed()
+    sys.path.insert(0, str(app_dir))
+    try:
+        return {name: importlib.import_module(name) for name in module_names}
+    finally:
+        sys.path.remove(str(app_dir))
+        drop_shadowed()
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Time a function (best of repeat) and measure its peak traced allocation in a separate run."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    # Tracing slows allocation down, so memory is measured apart from timing
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': min(timings), 'peak_memory_bytes': peak}
+
+def run_benchmarks(sizes: List[int], formats: List[str], repeat: int,
+                   max_xlsx_banks: int, work_dir: Path) -> List[dict]:
+    """Run every benchmark for every size and format."""
+    bank_stax = import_app_modules(BANK_STAX_DIR, ['app', 'preprocess_data', 'utils.data_loader'])
+    dashboard = import_app_modules(DASHBOARD_DIR, ['app'])
+    analysis = import_app_modules(ANALYSIS_DIR, ['utils', 'grading', 'bank_store'])
+
+    load_data = bank_stax['utils.data_loader'].load_data
+    calculate_ratios = bank_stax['preprocess_data'].calculate_ratios
+    bank_stax_chart = bank_stax['app'].build_bar_chart
+    dashboard_chart = dashboard['app'].build_bar_chart
+    create_radar_chart = analysis['utils'].create_radar_chart
+    get_metric_analysis = analysis['utils'].get_metric_analysis
+    depositor_metrics = analysis['utils'].get_role_metrics('Depositor')
+
+    def clear_analysis_caches():
+        # Grade tables and bank stores are cached per dataset version; time the cold path
+        analysis['grading'].clear_grade_cache()
+        analysis['bank_store'].clear_store_cache()
+
+    def cold(func: Callable[[], object]) -> Callable[[], object]:
+        def run():
+            clear_analysis_caches()
+            return func()
+        return run
+
+    results = []
+
+    def record(benchmark: str, n_banks: int, file_format: Optional[str], func: Callable[[], object]):
+        measured = measure(func, repeat)
+        results.append({
+            'benchmark': benchmark,
+            'format': file_format,
+            'banks': n_banks,
+            'seconds': measured['seconds'],
+            'banks_per_second': n_banks / measured['seconds'] if measured['seconds'] > 0 else None,
+            'peak_memory_bytes': measured['peak_memory_bytes']
+        })
+        print(f"{benchmark:<28} {file_format or '-':<9} {n_banks:>7} banks "
+              f"{measured['seconds'] * 1000:>10.2f} ms {measured['peak_memory_bytes'] / 1e6:>9.1f} MB")
+
+    for n_banks in sizes:
+        df = generate_bank_universe(n_banks)
+        line_items = generate_line_items(n_banks)
+        middle_bank = df['Bank Name'].iloc[n_banks // 2]
+
+        for file_format in formats:
+            if file_format == 'xlsx' and n_banks > max_xlsx_banks:
+                continue
+            source_format = 'csv' if file_format == 'columnar' else file_format
+            path = work_dir / f"universe_{n_banks}.{source_format}"
+            if not path.exists():
+                write_universe(df, str(path), source_format)
+            if file_format == 'columnar':
+                # Build the snapshot once, then time the warm path that reruns take
+                load_data(str(path))
+                record('load_data', n_banks, file_format, lambda: load_data(str(path)))
+            else:
+                record('load_data', n_banks, file_format, lambda: load_data(str(path), use_snapshot=False))
+
+        record('calculate_ratios', n_banks, None, lambda: calculate_ratios(line_items))
+        record('bank_stax_bar_chart', n_banks, None, lambda: bank_stax_chart(df, 'Leverage Ratio', middle_bank))
+        record('dashboard_bar_chart', n_banks, None,
+               lambda: dashboard_chart(df, 'Post Stress CET1 Ratio', is_stress_metric=True))
+        record('create_radar_chart', n_banks, None,
+               cold(lambda: create_radar_chart(df, middle_bank, depositor_metrics)))
+        record('get_metric_analysis', n_banks, None,
+               cold(lambda: get_metric_analysis(df, middle_bank, depositor_metrics)))
+
+    return results
+
+def result_key(result: dict) -> str:
+    return f"{result['benchmark']}|{result['format']}|{result['banks']}"
+
+def find_regressions(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Compare results with a baseline run and describe every metric that got worse beyond tolerance."""
+    baseline_by_key = {result_key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline_by_key.get(result_key(result))
+        if previous is None:
+            continue
+        if (result['seconds'] > NOISE_FLOOR_SECONDS
+                and result['seconds'] > previous['seconds'] * (1 + tolerance)):
+            regressions.append(
+                f"{result_key(result)}: {previous['seconds'] * 1000:.2f} ms -> {result['seconds'] * 1000:.2f} ms"
+            )
+        if result['peak_memory_bytes'] > previous['peak_memory_bytes'] * (1 + tolerance):
+            regressions.append(
+                f"{result_key(result)}: {previous['peak_memory_bytes'] / 1e6:.1f} MB -> "
+                f"{result['peak_memory_bytes'] / 1e6:.1f} MB peak memory"
+            )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data and chart hot paths.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated universe sizes (number of banks)")
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS),
+                        help="Comma-separated load formats: csv, xlsx, columnar")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark; the best is kept")
+    parser.add_argument('--max-xlsx-banks', type=int, default=DEFAULT_MAX_XLSX_BANKS,
+                        help="Skip xlsx loads above this many banks")
+    parser.add_argument('--output', default='benchmark_results.json', help="Results file to write")
+    parser.add_argument('--baseline', help="Previous results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown or memory growth over the baseline, as a fraction")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    formats = [f for f in args.formats.split(',') if f]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_benchmarks(sizes, formats, args.repeat, args.max_xlsx_banks, Path(work_dir))
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results
+        }, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+# Raw line items, as promoted from the "Line items latest" workbook
+LINE_ITEM_COLUMNS = [
+    'PAT',
+    'Depreciation',
+    'Total Liabilities (excluding equity)',
+    'Cash & cash equivalents',
+    'Total Assets',
+    'Current Assets',
+    'Current Liabilities',
+    'Accounts Receivables',
+    'Marketable Securities',
+    'Core Deposits',
+    'Total Deposits',
+    'Loans',
+    'Non performing assets',
+    'Tier-1 Capital',
+    'Tier-2 capital',
+    'Risk weighted assets',
+    'Common Equity Tier 1 Capital',
+    'Tier 1 Capital Ratio',
+    'Total Capital',
+    'Leverage Ratio',
+    'Supplementary Tier 1',
+    'Capital Conservation'
+]
+
+# Ratio columns of the bank_data.csv files
+RATIO_COLUMNS = [
+    'Liquidity Ratio',
+    'Capital Adequacy Ratio',
+    'ROE',
+    'Core Deposits to Total Deposits',
+    'NPAs to Total Loans',
+    'Solvency Ratio',
+    'Loans to Deposit Ratio',
+    'Common Equity Tier 1 Ratio',
+    'Minimum Tier 1 Capital Ratio',
+    'Total Capital Ratio',
+    'Supplementary Tier 1 Ratio',
+    'Capital Conservation Buffer Ratio',
+    'Post Stress CET1 Ratio',
+    'Stress Loss %',
+    'Minimum Capital Requirement'
+]
+
+# Role metrics used by financial_analysis
+ROLE_METRIC_COLUMNS = [
+    'Capital Ratio',
+    'NPL Ratio',
+    'Cost-to-Income Ratio',
+    'Loan-to-Deposit Ratio',
+    'Interest Coverage Ratio',
+    'Debt Service Coverage Ratio'
+]
+
+def generate_line_items(n_banks: int, seed: int = 0) -> pd.DataFrame:
+    """Generate raw line items for a synthetic bank universe."""
+    rng = np.random.default_rng(seed)
+    total_assets = rng.lognormal(mean=12.0, sigma=1.5, size=n_banks).round()
+    liabilities = total_assets * rng.uniform(0.85, 0.95, n_banks)
+    total_deposits = liabilities * rng.uniform(0.6, 0.85, n_banks)
+    loans = total_deposits * rng.uniform(0.5, 1.0, n_banks)
+    rwa = total_assets * rng.uniform(0.35, 0.7, n_banks)
+    tier1 = rwa * rng.uniform(0.10, 0.17, n_banks)
+
+    df = pd.DataFrame({
+        'Bank Name': [f"Synthetic Bank {i:06d}" for i in range(n_banks)],
+        'PAT': (total_assets * rng.uniform(0.005, 0.015, n_banks)).round(),
+        'Depreciation': (total_assets * rng.uniform(0.0005, 0.002, n_banks)).round(),
+        'Total Liabilities (excluding equity)': liabilities.round(),
+        'Cash & cash equivalents': (total_assets * rng.uniform(0.02, 0.12, n_banks)).round(),
+        'Total Assets': total_assets,
+        'Current Assets': (total_assets * rng.uniform(0.4, 0.6, n_banks)).round(),
+        'Current Liabilities': (liabilities * rng.uniform(0.6, 0.9, n_banks)).round(),
+        'Accounts Receivables': (total_assets * rng.uniform(0.01, 0.04, n_banks)).round(),
+        'Marketable Securities': (total_assets * rng.uniform(0.05, 0.2, n_banks)).round(),
+        'Core Deposits': (total_deposits * rng.uniform(0.7, 0.99, n_banks)).round(),
+        'Total Deposits': total_deposits.round(),
+        'Loans': loans.round(),
+        'Non performing assets': (loans * rng.uniform(0.002, 0.03, n_banks)).round(),
+        'Tier-1 Capital': tier1.round(),
+        'Tier-2 capital': (tier1 * rng.uniform(0.05, 0.3, n_banks)).round(),
+        'Risk weighted assets': rwa.round(),
+        'Common Equity Tier 1 Capital': rng.uniform(10.0, 16.0, n_banks).round(1),
+        'Tier 1 Capital Ratio': rng.uniform(11.0, 17.0, n_banks).round(1),
+        'Total Capital': rng.uniform(13.0, 20.0, n_banks).round(1),
+        'Leverage Ratio': rng.uniform(5.0, 10.0, n_banks).round(1),
+        'Supplementary Tier 1': rng.uniform(5.0, 8.0, n_banks).round(2),
+        'Capital Conservation': rng.uniform(2.0, 3.0, n_banks).round(2)
+    })
+    return df
+
+def generate_bank_universe(n_banks: int, seed: int = 0) -> pd.DataFrame:
+    """Generate a bank universe with line items, bank_data.csv ratios and role metrics."""
+    rng = np.random.default_rng(seed + 1)
+    df = generate_line_items(n_banks, seed)
+
+    ratios = pd.DataFrame({
+        'Liquidity Ratio': rng.uniform(1.0, 1.4, n_banks).round(2),
+        'Capital Adequacy Ratio': rng.uniform(12.0, 18.0, n_banks).round(1),
+        'ROE': rng.uniform(8.0, 16.0, n_banks).round(1),
+        'Core Deposits to Total Deposits': df['Core Deposits'] / df['Total Deposits'],
+        'NPAs to Total Loans': df['Non performing assets'] / df['Loans'],
+        'Solvency Ratio': rng.uniform(0.14, 0.2, n_banks).round(2),
+        'Loans to Deposit Ratio': df['Loans'] / df['Total Deposits'],
+        'Common Equity Tier 1 Ratio': rng.uniform(11.0, 15.0, n_banks).round(1),
+        'Minimum Tier 1 Capital Ratio': rng.uniform(10.0, 13.0, n_banks).round(1),
+        'Total Capital Ratio': rng.uniform(15.0, 19.0, n_banks).round(1),
+        'Supplementary Tier 1 Ratio': rng.uniform(1.5, 2.6, n_banks).round(1),
+        'Capital Conservation Buffer Ratio': rng.uniform(1.9, 2.8, n_banks).round(1),
+        'Post Stress CET1 Ratio': rng.uniform(4.0, 11.0, n_banks).round(1),
+        'Stress Loss %': rng.uniform(2.0, 3.5, n_banks).round(1),
+        'Minimum Capital Requirement': np.full(n_banks, 4.5),
+        'Capital Ratio': rng.uniform(10.0, 17.0, n_banks).round(1),
+        'NPL Ratio': rng.uniform(1.0, 4.0, n_banks).round(1),
+        'Cost-to-Income Ratio': rng.uniform(45.0, 65.0, n_banks).round(1),
+        'Loan-to-Deposit Ratio': rng.uniform(75.0, 95.0, n_banks).round(1),
+        'Interest Coverage Ratio': rng.uniform(1.8, 3.5, n_banks).round(2),
+        'Debt Service Coverage Ratio': rng.uniform(1.3, 2.4, n_banks).round(2)
+    })
+    return pd.concat([df, ratios], axis=1)
+
+def write_universe(df: pd.DataFrame, path: str, file_format: str) -> None:
+    """Write a universe as csv, xlsx or feather."""
+    if file_format == 'csv':
+        df.to_csv(path, index=False)
+    elif file_format == 'xlsx':
+        df.to_excel(path, index=False)
+    elif file_format == 'feather':
+        df.to_feather(path)
+    else:
+        raise ValueError(f"Unknown format: {file_format}")
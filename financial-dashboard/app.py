@@ -1,6 +1,7 @@
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 from pathlib import Path
 import sys
 
@@ -8,10 +9,24 @@ import sys
 sys.path.append(str(Path(__file__).parent))
 
 from utils.data_loader import (
-    load_data, 
     get_financial_ratios, 
     get_stress_metrics, 
-    check_stress_threshold
+    get_dataset_version,
+    STRESS_THRESHOLDS
+)
+from utils.ranking import DEFAULT_LEAGUE_SIZE, MAX_LEAGUE_SIZE, get_rank_table
+from utils.refresher import start_refresher
+from utils.shared_dataset import get_shared_dataset
+from utils.thresholds import evaluate_thresholds, get_breach_summary
+from utils.compact import to_float64
+from utils.figure_cache import get_cached_figure
+from utils.instrumentation import start_run, finish_run, stage, mark_first_chart, render_stage_panel
+from utils.chart_reduction import (
+    LARGE_UNIVERSE_THRESHOLD,
+    LARGE_UNIVERSE_MODES,
+    build_large_universe_figure,
+    get_axis_titles,
+    resolve_chart_mode
 )
 from utils.styling import get_css_styles, get_plotly_config, get_color_scale
 
@@ -25,7 +40,8 @@ st.set_page_config(
 # Apply custom styling
 st.markdown(get_css_styles(), unsafe_allow_html=True)
 
-def create_bar_chart(df: pd.DataFrame, metric: str, is_stress_metric: bool = False) -> go.Figure:
+def create_bar_chart(df: pd.DataFrame, metric: str, is_stress_metric: bool = False,
+                     mode: str = 'auto') -> go.Figure:
     """
     Create a bar chart for the selected metric.
     
@@ -33,6 +49,26 @@ def create_bar_chart(df: pd.DataFrame, metric: str, is_stress_metric: bool = Fal
         df (pd.DataFrame): Data frame containing bank data
         metric (str): Selected metric to display
         is_stress_metric (bool): Whether the metric is a stress test metric
+        mode (str): Chart mode; 'auto' switches to a reduced view for large universes
+        
+    Returns:
+        go.Figure: Plotly figure object
+    """
+    # Figures are shared across reruns and sessions until the dataset changes
+    mode = resolve_chart_mode(len(df), mode)
+    key = (get_dataset_version(df), metric, mode, is_stress_metric)
+    return get_cached_figure(key, lambda: build_bar_chart(df, metric, is_stress_metric, mode))
+
+def build_bar_chart(df: pd.DataFrame, metric: str, is_stress_metric: bool = False,
+                    mode: str = 'bars') -> go.Figure:
+    """
+    Build the bar chart for the selected metric without consulting the figure cache.
+    
+    Args:
+        df (pd.DataFrame): Data frame containing bank data
+        metric (str): Selected metric to display
+        is_stress_metric (bool): Whether the metric is a stress test metric
+        mode (str): 'bars' for one bar per bank, or one of LARGE_UNIVERSE_MODES
         
     Returns:
         go.Figure: Plotly figure object
@@ -40,31 +76,48 @@ def create_bar_chart(df: pd.DataFrame, metric: str, is_stress_metric: bool = Fal
     colors = get_color_scale()
     
     if is_stress_metric:
-        bar_colors = [
-            colors['pass'] if check_stress_threshold(metric, value) else colors['fail']
-            for value in df[metric]
-        ]
+        mask = evaluate_thresholds(df[[metric]])
+        if metric in mask.columns:
+            bar_colors = np.where(mask[metric].to_numpy(), colors['pass'], colors['fail'])
+        else:
+            # Metrics without a regulatory threshold always pass
+            bar_colors = [colors['pass']] * len(df)
     else:
         bar_colors = [colors['neutral']] * len(df)
     
-    fig = go.Figure()
-    fig.add_trace(
-        go.Bar(
-            x=df['Bank Name'],
-            y=df[metric],
-            marker_color=bar_colors,
-            text=df[metric].round(2),
-            textposition='auto',
+    if mode == 'bars':
+        # Compacted columns are float32; label them at their stored precision
+        values = to_float64(df[metric])
+        fig = go.Figure()
+        fig.add_trace(
+            go.Bar(
+                x=df['Bank Name'],
+                y=values,
+                marker_color=bar_colors,
+                text=np.round(values, 2),
+                textposition='auto',
+            )
+        )
+    else:
+        # Reduce large universes on the server so the payload stays bounded
+        fig = build_large_universe_figure(
+            df['Bank Name'].to_numpy(),
+            df[metric].to_numpy(dtype=float),
+            metric,
+            mode,
+            bar_colors=bar_colors,
+            standard=STRESS_THRESHOLDS.get(metric) if is_stress_metric else None,
+            colors=colors
         )
-    )
     
     # Update layout with custom styling
+    xaxis_title, yaxis_title = get_axis_titles(mode, metric)
     config = get_plotly_config()
     fig.update_layout(
         **config['layout'],
         title=f"{metric} by Bank",
-        xaxis_title="Banks",
-        yaxis_title=metric,
+        xaxis_title=xaxis_title,
+        yaxis_title=yaxis_title,
         showlegend=False,
         height=400
     )
@@ -77,9 +130,48 @@ def main():
     # Title
     st.markdown('<h1 class="main-title">Bank Financial Analysis Dashboard</h1>', unsafe_allow_html=True)
     
+    # Stage timings are always logged; the panel also turns on memory tracing
+    show_stages = st.sidebar.checkbox("Show stage timings", value=False)
+    recorder = start_run('financial_dashboard', trace_memory=show_stages)
+    
     try:
-        # Load data
-        df = load_data("data/bank_data.csv")
+        render_dashboard()
+    finally:
+        finish_run(recorder)
+        if show_stages:
+            render_stage_panel(recorder)
+
+def render_dashboard():
+    """Render the dashboard sections"""
+    try:
+        # One frozen copy per server process; each rerun gets a zero-copy read-only view.
+        # New versions are loaded and swapped in by a background refresher.
+        dataset = get_shared_dataset("data/bank_data.csv", compact=True)
+        refresher = start_refresher(dataset)
+        df = dataset.get()
+        if refresher.last_error:
+            st.warning(f"Showing the last good data; the latest file could not be loaded: {refresher.last_error}")
+
+        quality = df.attrs.get('quality_report')
+        if quality is not None and len(quality.issues):
+            bad_rows = int(quality.bad_rows.sum())
+            with st.expander(f"Data quality: {len(quality.issues)} issues, {bad_rows} rows with errors"):
+                st.dataframe(quality.issues, use_container_width=True, hide_index=True)
+        
+        # Large universes get a server-side reduced chart view
+        chart_mode = 'auto'
+        if len(df) > LARGE_UNIVERSE_THRESHOLD:
+            chart_mode = st.radio(
+                f"Chart view ({len(df)} banks)",
+                LARGE_UNIVERSE_MODES,
+                format_func=lambda m: {
+                    'extremes': 'Top and bottom banks',
+                    'quantiles': 'Percentile buckets',
+                    'histogram': 'Histogram',
+                    'points': 'All banks (WebGL)'
+                }[m],
+                horizontal=True
+            )
         
         # Create two columns for the dropdowns
         col1, col2 = st.columns(2)
@@ -95,8 +187,11 @@ def main():
             # Display financial ratio chart
             with st.container():
                 st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-                fig_ratio = create_bar_chart(df, selected_ratio)
-                st.plotly_chart(fig_ratio, use_container_width=True)
+                with stage('build_chart:ratio'):
+                    fig_ratio = create_bar_chart(df, selected_ratio, mode=chart_mode)
+                with stage('render_chart:ratio'):
+                    st.plotly_chart(fig_ratio, use_container_width=True)
+                mark_first_chart()
                 st.markdown('</div>', unsafe_allow_html=True)
         
         with col2:
@@ -110,11 +205,21 @@ def main():
             # Display stress test chart
             with st.container():
                 st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-                fig_stress = create_bar_chart(df, selected_stress, is_stress_metric=True)
-                st.plotly_chart(fig_stress, use_container_width=True)
+                with stage('build_chart:stress'):
+                    fig_stress = create_bar_chart(df, selected_stress, is_stress_metric=True, mode=chart_mode)
+                with stage('render_chart:stress'):
+                    st.plotly_chart(fig_stress, use_container_width=True)
                 st.markdown('</div>', unsafe_allow_html=True)
+            
+            # Summarize threshold breaches across all stress metrics
+            with stage('breach_summary'):
+                breaches = get_breach_summary(df)
+            st.caption(f"{len(breaches)} threshold breaches across {breaches['Bank Name'].nunique()} banks")
         
-        # Add metric cards
+        # Add metric cards; ranks and summary statistics are computed once per dataset version
+        with stage('rank_table'):
+            rank_table = get_rank_table(df)
+        stats = rank_table.get_stats(selected_ratio)
         st.subheader("Key Insights")
         metric_cols = st.columns(3)
         
@@ -123,7 +228,7 @@ def main():
             st.markdown(
                 f'''<div class="metric-card">
                     <h3>Average {selected_ratio}</h3>
-                    <p>{df[selected_ratio].mean():.2f}</p>
+                    <p>{stats['mean']:.2f}</p>
                 </div>''',
                 unsafe_allow_html=True
             )
@@ -132,7 +237,7 @@ def main():
             st.markdown(
                 f'''<div class="metric-card">
                     <h3>Highest {selected_ratio}</h3>
-                    <p>{df[selected_ratio].max():.2f}</p>
+                    <p>{stats['max']:.2f}</p>
                 </div>''',
                 unsafe_allow_html=True
             )
@@ -141,10 +246,36 @@ def main():
             st.markdown(
                 f'''<div class="metric-card">
                     <h3>Lowest {selected_ratio}</h3>
-                    <p>{df[selected_ratio].min():.2f}</p>
+                    <p>{stats['min']:.2f}</p>
                 </div>''',
                 unsafe_allow_html=True
             )
+
+        # League table of the best or worst banks on any metric
+        st.subheader("League Table")
+        league_cols = st.columns(3)
+        with league_cols[0]:
+            league_metric = st.selectbox(
+                "Rank by",
+                options=rank_table.metrics,
+                index=rank_table.metrics.index(selected_ratio) if rank_table.has_metric(selected_ratio) else 0,
+                key="league_metric"
+            )
+        with league_cols[1]:
+            league_end = st.radio("Show", ["Top", "Bottom"], horizontal=True, key="league_end")
+        with league_cols[2]:
+            league_size = st.number_input(
+                "Banks",
+                min_value=1,
+                max_value=max(1, min(MAX_LEAGUE_SIZE, len(df))),
+                value=max(1, min(DEFAULT_LEAGUE_SIZE, len(df))),
+                key="league_size"
+            )
+        with stage('league_table'):
+            league = rank_table.league_table(league_metric, int(league_size), bottom=league_end == "Bottom")
+        st.dataframe(league, use_container_width=True, hide_index=True)
+        st.caption("Rank 1 is the best bank on the metric; lower-is-better metrics rank their lowest value first. "
+                   "Percentile is the share of banks it does at least as well as.")
             
     except Exception as e:
         st.error(f"Error: {str(e)}")
@@ -1,13 +1,30 @@
 # This file makes the utils directory a Python package
-from .data_loader import load_data, get_financial_ratios, get_stress_metrics, check_stress_threshold
-from .styling import get_css_styles, get_plotly_config, get_color_scale
-
-__all__ = [
-    'load_data',
-    'get_financial_ratios',
-    'get_stress_metrics',
-    'check_stress_threshold',
-    'get_css_styles',
-    'get_plotly_config',
-    'get_color_scale'
-]
+import importlib
+
+# Exported names and the submodule that defines each one. Submodules are imported
+# on first access (PEP 562), so importing one utility doesn't pay for all of them.
+_EXPORTS = {
+    'load_data': 'data_loader',
+    'load_shared_data': 'shared_dataset',
+    'get_financial_ratios': 'data_loader',
+    'get_stress_metrics': 'data_loader',
+    'check_stress_threshold': 'data_loader',
+    'evaluate_thresholds': 'thresholds',
+    'get_breach_summary': 'thresholds',
+    'get_rank_table': 'ranking',
+    'get_css_styles': 'styling',
+    'get_plotly_config': 'styling',
+    'get_color_scale': 'styling'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from typing import Dict, List, Optional, Sequence
+
+# Above this many banks, bar charts switch to a server-side reduced view
+LARGE_UNIVERSE_THRESHOLD = 200
+LARGE_UNIVERSE_MODES = ['extremes', 'quantiles', 'histogram', 'points']
+DEFAULT_LARGE_MODE = 'extremes'
+EXTREMES_COUNT = 25
+QUANTILE_BUCKETS = 20
+HISTOGRAM_BINS = 50
+MAX_POINTS = 20000
+
+def resolve_chart_mode(n_banks: int, mode: str = 'auto') -> str:
+    """
+    Pick the chart mode for a universe size.
+    
+    Args:
+        n_banks (int): Number of banks in the chart
+        mode (str): Requested mode, or 'auto'
+        
+    Returns:
+        str: 'bars' for small universes, otherwise the requested or default reduced mode
+    """
+    if mode != 'auto':
+        return mode
+    return 'bars' if n_banks <= LARGE_UNIVERSE_THRESHOLD else DEFAULT_LARGE_MODE
+
+def get_extreme_positions(values: np.ndarray, n: int = EXTREMES_COUNT) -> np.ndarray:
+    """
+    Get the positions of the n highest and n lowest values.
+    
+    Uses argpartition, so only the selected 2n values are sorted.
+    
+    Args:
+        values (np.ndarray): Metric values, NaN for missing
+        n (int): Number of banks to keep at each end
+        
+    Returns:
+        np.ndarray: Positions ordered from highest to lowest value
+    """
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) <= 2 * n:
+        return valid[np.argsort(-values[valid], kind='stable')]
+    valid_values = values[valid]
+    top = valid[np.argpartition(-valid_values, n - 1)[:n]]
+    bottom = valid[np.argpartition(valid_values, n - 1)[:n]]
+    top = top[np.argsort(-values[top], kind='stable')]
+    bottom = bottom[np.argsort(-values[bottom], kind='stable')]
+    return np.concatenate([top, bottom])
+
+def get_quantile_buckets(values: np.ndarray, n_buckets: int = QUANTILE_BUCKETS) -> pd.DataFrame:
+    """
+    Split the values into equal-count buckets and summarize each one.
+    
+    Args:
+        values (np.ndarray): Metric values, NaN for missing
+        n_buckets (int): Number of buckets
+        
+    Returns:
+        pd.DataFrame: Label, count, mean, min and max per bucket
+    """
+    ordered = np.sort(values[~np.isnan(values)])
+    n_buckets = max(1, min(n_buckets, len(ordered)))
+    bounds = np.linspace(0, len(ordered), n_buckets + 1).astype(int)
+    starts, ends = bounds[:-1], bounds[1:]
+    if len(ordered) == 0:
+        return pd.DataFrame(columns=['label', 'count', 'mean', 'min', 'max'])
+
+    sums = np.add.reduceat(ordered, starts)
+    counts = ends - starts
+    percentiles = np.linspace(0, 100, n_buckets + 1).round().astype(int)
+    return pd.DataFrame({
+        'label': [f"P{lo}-P{hi}" for lo, hi in zip(percentiles[:-1], percentiles[1:])],
+        'count': counts,
+        'mean': sums / counts,
+        'min': ordered[starts],
+        'max': ordered[ends - 1]
+    })
+
+def get_histogram(values: np.ndarray, bins: int = HISTOGRAM_BINS) -> pd.DataFrame:
+    """
+    Bin the values into a histogram.
+    
+    Args:
+        values (np.ndarray): Metric values, NaN for missing
+        bins (int): Number of bins
+        
+    Returns:
+        pd.DataFrame: Center, width and count per bin
+    """
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+    return pd.DataFrame({
+        'center': (edges[:-1] + edges[1:]) / 2,
+        'width': np.diff(edges),
+        'count': counts
+    })
+
+def build_large_universe_figure(names: Sequence[str], values: np.ndarray, metric: str, mode: str,
+                                bar_colors: Optional[Sequence[str]] = None,
+                                standard: Optional[float] = None,
+                                highlight_position: Optional[int] = None,
+                                colors: Optional[Dict[str, str]] = None) -> go.Figure:
+    """
+    Build a bounded-size figure for a large bank universe.
+    
+    Args:
+        names (Sequence[str]): Bank names
+        values (np.ndarray): Metric values
+        metric (str): Metric being displayed
+        mode (str): One of LARGE_UNIVERSE_MODES
+        bar_colors (Sequence[str]): Per-bank colors, if any
+        standard (float): Threshold to draw as a line, if any
+        highlight_position (int): Row of a bank to highlight, if any
+        colors (Dict[str, str]): Color scale
+        
+    Returns:
+        go.Figure: Figure without layout styling
+    """
+    colors = colors or {'neutral': '#636efa'}
+    names = np.asarray(names, dtype=object)
+    values = np.asarray(values, dtype=float)
+    fig = go.Figure()
+
+    if mode == 'extremes':
+        positions = get_extreme_positions(values)
+        if highlight_position is not None and highlight_position not in positions:
+            positions = np.append(positions, highlight_position)
+        marker_colors = np.asarray(bar_colors)[positions] if bar_colors is not None else colors['neutral']
+        line_widths = np.where(positions == highlight_position, 3, 0)
+        fig.add_trace(go.Bar(
+            x=names[positions],
+            y=values[positions],
+            marker_color=marker_colors,
+            marker_line=dict(color='#ffffff', width=line_widths),
+            # Formatted like the other modes; compacted float32 values would otherwise show every digit
+            hovertemplate="%{x}<br>%{y:.3f}<extra></extra>",
+            name=f"Top and bottom {EXTREMES_COUNT} of {len(values)} banks"
+        ))
+    elif mode == 'quantiles':
+        buckets = get_quantile_buckets(values)
+        fig.add_trace(go.Bar(
+            x=buckets['label'],
+            y=buckets['mean'],
+            error_y=dict(
+                type='data',
+                symmetric=False,
+                array=buckets['max'] - buckets['mean'],
+                arrayminus=buckets['mean'] - buckets['min']
+            ),
+            customdata=buckets[['count', 'min', 'max']],
+            hovertemplate="%{x}<br>Mean %{y:.3f}<br>Range %{customdata[1]:.3f} - %{customdata[2]:.3f}"
+                          "<br>%{customdata[0]} banks<extra></extra>",
+            marker_color=colors['neutral'],
+            name='Bucket mean (min-max range)'
+        ))
+    elif mode == 'histogram':
+        histogram = get_histogram(values)
+        fig.add_trace(go.Bar(
+            x=histogram['center'],
+            y=histogram['count'],
+            width=histogram['width'],
+            marker_color=colors['neutral'],
+            name='Banks per bin'
+        ))
+    elif mode == 'points':
+        # WebGL keeps point-level detail responsive for tens of thousands of banks
+        order = np.argsort(-values, kind='stable')
+        order = order[~np.isnan(values[order])]
+        ranks = np.arange(1, len(order) + 1)
+        if len(order) > MAX_POINTS:
+            # Evenly spaced ranks keep the curve's shape, including both ends
+            keep = np.unique(np.linspace(0, len(order) - 1, MAX_POINTS).astype(int))
+            order, ranks = order[keep], ranks[keep]
+        marker_colors = np.asarray(bar_colors)[order] if bar_colors is not None else colors['neutral']
+        fig.add_trace(go.Scattergl(
+            x=ranks,
+            y=values[order],
+            mode='markers',
+            marker=dict(color=marker_colors, size=4),
+            text=names[order],
+            hovertemplate="%{text}<br>%{y:.3f}<extra></extra>",
+            name='Banks by rank'
+        ))
+        if highlight_position is not None and not np.isnan(values[highlight_position]):
+            rank = int(np.count_nonzero(values > values[highlight_position])) + 1
+            fig.add_trace(go.Scattergl(
+                x=[rank],
+                y=[values[highlight_position]],
+                mode='markers',
+                marker=dict(color='#ffffff', size=10, symbol='diamond'),
+                name=str(names[highlight_position])
+            ))
+    else:
+        raise ValueError(f"Unknown large-universe chart mode: {mode}")
+
+    if standard is not None:
+        # One shape instead of a per-bank array of the same value
+        if mode == 'histogram':
+            fig.add_vline(x=standard, line=dict(color='red', width=2, dash='dash'))
+        else:
+            fig.add_hline(y=standard, line=dict(color='red', width=2, dash='dash'))
+    if mode == 'histogram' and highlight_position is not None and not np.isnan(values[highlight_position]):
+        fig.add_vline(x=values[highlight_position], line=dict(color='#ffffff', width=2))
+
+    return fig
+
+def get_axis_titles(mode: str, metric: str) -> List[str]:
+    """
+    Get the axis titles for a chart mode.
+    
+    Args:
+        mode (str): Chart mode
+        metric (str): Metric being displayed
+        
+    Returns:
+        List[str]: The x and y axis titles
+    """
+    if mode == 'histogram':
+        return [metric, "Number of banks"]
+    if mode == 'quantiles':
+        return ["Percentile bucket", metric]
+    if mode == 'points':
+        return ["Rank", metric]
+    return ["Banks", metric]
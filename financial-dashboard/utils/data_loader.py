@@ -1,21 +1,45 @@
+import hashlib
+import weakref
+
 import pandas as pd
-from typing import Tuple, List
+from typing import Dict, List, Mapping, Optional
+
+from .instrumentation import stage
+from .metric_catalog import LOWER_IS_BETTER, get_group, get_thresholds
 
-def load_data(file_path: str) -> pd.DataFrame:
+def load_data(file_path: str, compact: bool = False, quarantine: bool = False) -> pd.DataFrame:
     """
     Load and validate the data file containing bank financial data.
     
     Args:
-        file_path (str): Path to the data file (Excel or CSV)
+        file_path (str): Path to the data file (Excel or CSV), or a panel
+            store directory to load its latest period
+        compact (bool): Store columns as float32, categoricals or Arrow strings
+            wherever that is lossless for display and leaves every stress
+            pass/fail result unchanged; the memory used before and after is
+            recorded in ``attrs['memory_usage']``
+        quarantine (bool): Drop the rows the data-quality check finds errors in;
+            the report is always in ``attrs['quality_report']``
         
     Returns:
         pd.DataFrame: Validated dataframe containing bank data
     """
+    # Imported here, so modules that only need versions or metric lists don't load
+    # the panel store, validation and compaction code
+    from .compact import compact_with_report
+    from .panel_store import is_panel_store, load_latest_period
+    from .validation import check_quality, quarantine_rows
+
     try:
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path, engine='openpyxl')
+        with stage('load_data'):
+            if is_panel_store(file_path):
+                df = load_latest_period(file_path)
+            elif file_path.endswith('.csv'):
+                df = pd.read_csv(file_path)
+            else:
+                df = pd.read_excel(file_path, engine='openpyxl')
+        # Panel stores identify their content; keep that version for the final frame
+        source_version = df.attrs.get('dataset_version')
         
         # Validate required columns
         required_columns = [
@@ -31,11 +55,84 @@ def load_data(file_path: str) -> pd.DataFrame:
         missing_columns = [col for col in required_columns if col not in df.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
-            
+
+        # Types, missing and infinite values, out-of-range ratios and duplicate names
+        with stage('validate'):
+            report = check_quality(df)
+        df.attrs['quality_report'] = report
+        if quarantine:
+            df, _ = quarantine_rows(df, report)
+        
+        if compact:
+            with stage('compact'):
+                df, usage = compact_with_report(df, STRESS_THRESHOLDS)
+            df.attrs['memory_usage'] = usage
+
+        # Quarantined frames lose rows, so they are hashed on first use instead
+        if source_version is not None and not quarantine:
+            set_dataset_version(df, source_version)
         return df
     except Exception as e:
         raise Exception(f"Error loading data: {str(e)}")
 
+class DatasetOwner:
+    """
+    Weak reference to the frame a dataset version was stamped on.
+    
+    Deep copies keep pointing at the stamped frame, and pickles point at nothing,
+    so neither a derived frame nor one sent to another process passes for it.
+    """
+    __slots__ = ('_ref',)
+
+    def __init__(self, df: Optional[pd.DataFrame] = None):
+        self._ref = None if df is None else weakref.ref(df)
+
+    def __call__(self) -> Optional[pd.DataFrame]:
+        return None if self._ref is None else self._ref()
+
+    def __deepcopy__(self, memo: Dict) -> 'DatasetOwner':
+        return self
+
+    def __reduce__(self):
+        return DatasetOwner, ()
+
+def set_dataset_version(df: pd.DataFrame, version: str) -> None:
+    """
+    Stamp a frame with its dataset version; frames derived from it don't inherit the stamp.
+    
+    pandas copies ``attrs`` into every derived frame, such as a sorted copy or one
+    with a replaced column, but the copied owner still points at this frame, so
+    get_dataset_version hashes the derived frame instead.
+    
+    Args:
+        df (pd.DataFrame): Data frame to stamp
+        version (str): Version identifying its contents
+    """
+    df.attrs['dataset_version'] = version
+    df.attrs['dataset_owner'] = DatasetOwner(df)
+    df.attrs['dataset_shape'] = df.shape
+
+def get_dataset_version(df: pd.DataFrame) -> str:
+    """
+    Get a content hash identifying this version of the dataset.
+    
+    Args:
+        df (pd.DataFrame): Data frame containing bank data
+        
+    Returns:
+        str: Hex digest of the frame's contents and columns
+    """
+    version = df.attrs.get('dataset_version')
+    owner = df.attrs.get('dataset_owner')
+    # Only trust a stamp made on this very frame, and not since resized in place
+    if version is None or owner is None or owner() is not df or df.attrs.get('dataset_shape') != df.shape:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        digest = hashlib.sha256(row_hashes.tobytes())
+        digest.update('|'.join(map(str, df.columns)).encode('utf-8'))
+        version = digest.hexdigest()
+        set_dataset_version(df, version)
+    return version
+
 def get_financial_ratios() -> List[str]:
     """
     Get list of available financial ratios.
@@ -43,7 +140,7 @@ def get_financial_ratios() -> List[str]:
     Returns:
         List[str]: List of financial ratio names
     """
-    return ['Liquidity Ratio', 'Capital Adequacy Ratio', 'ROE']
+    return list(get_group('ratio_analysis'))
 
 def get_stress_metrics() -> List[str]:
     """
@@ -52,7 +149,10 @@ def get_stress_metrics() -> List[str]:
     Returns:
         List[str]: List of stress test metric names
     """
-    return ['Post Stress CET1 Ratio', 'Stress Loss %']
+    return list(get_group('ccar_stress'))
+
+# Regulatory thresholds for the CCAR stress metrics, from the shared metric catalog
+STRESS_THRESHOLDS: Mapping[str, float] = get_thresholds('ccar_stress')
 
 def check_stress_threshold(metric: str, value: float) -> bool:
     """
@@ -65,13 +165,8 @@ def check_stress_threshold(metric: str, value: float) -> bool:
     Returns:
         bool: True if passes threshold, False otherwise
     """
-    thresholds = {
-        'Post Stress CET1 Ratio': 4.5,  # Minimum required CET1 ratio
-        'Stress Loss %': 3.0   # Maximum acceptable loss percentage
-    }
-    
-    if metric == 'Post Stress CET1 Ratio':
-        return value >= thresholds[metric]
-    elif metric == 'Stress Loss %':
-        return value <= thresholds[metric]
-    return True
+    if metric not in STRESS_THRESHOLDS:
+        return True
+    if metric in LOWER_IS_BETTER:
+        return value <= STRESS_THRESHOLDS[metric]
+    return value >= STRESS_THRESHOLDS[metric]
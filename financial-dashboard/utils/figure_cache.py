@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+MAX_ENTRIES = 128
+MAX_BYTES = 64 * 1024 * 1024
+# Rough JSON size of one data array element, and of a figure's layout and trace settings
+BYTES_PER_VALUE = 20
+BASE_FIGURE_BYTES = 4096
+BASE_TRACE_BYTES = 512
+# Trace properties, as dotted paths, that can hold one value per point
+DATA_ARRAYS = ('x', 'y', 'z', 'text', 'customdata', 'marker.color', 'marker.line.width', 'error_y.array',
+               'error_y.arrayminus', 'width')
+
+def estimate_figure_bytes(fig: go.Figure) -> int:
+    """
+    Estimate a figure's serialized size from the lengths of its data arrays.
+    
+    Serializing every figure just to measure it would double the cost of a miss;
+    an estimate is enough to bound the cache.
+    
+    Args:
+        fig (go.Figure): Figure to measure
+        
+    Returns:
+        int: Approximate size of the figure's JSON in bytes
+    """
+    size = BASE_FIGURE_BYTES
+    for trace in fig.data:
+        size += BASE_TRACE_BYTES
+        for path in DATA_ARRAYS:
+            value = trace
+            for name in path.split('.'):
+                value = getattr(value, name, None)
+                if value is None:
+                    break
+            if value is not None and not isinstance(value, (str, int, float)):
+                size += BYTES_PER_VALUE * int(np.size(value))
+    return size
+
+class FigureCache:
+    """
+    Thread-safe LRU cache of built figures, bounded by entry count and estimated serialized size.
+    
+    Cached figures are shared between sessions and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Hashable, Tuple[go.Figure, int]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], go.Figure]) -> go.Figure:
+        """
+        Get the figure for a key, building and caching it on a miss.
+        
+        Args:
+            key (Hashable): Cache key, e.g. (dataset version, metric, chart kind)
+            builder (Callable): Function that builds the figure
+            
+        Returns:
+            go.Figure: Cached or newly built figure
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        # Build outside the lock so slow figures don't block other sessions
+        fig = builder()
+        size = estimate_figure_bytes(fig)
+        if size > self.max_bytes:
+            return fig
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (fig, size)
+                self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+        return fig
+
+    def clear(self) -> None:
+        """Drop every cached figure."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache size and hit counts.
+        
+        Returns:
+            Dict[str, int]: Entry count, serialized bytes, hits and misses
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+# One cache per server process, shared by every session
+figure_cache = FigureCache()
+
+def get_cached_figure(key: Hashable, builder: Callable[[], go.Figure]) -> go.Figure:
+    """
+    Get a figure from the process-wide cache, building it on a miss.
+    
+    Args:
+        key (Hashable): Cache key, e.g. (dataset version, metric, chart kind)
+        builder (Callable): Function that builds the figure
+        
+    Returns:
+        go.Figure: Cached or newly built figure
+    """
+    return figure_cache.get_or_build(key, builder)
+
+def clear_figure_cache() -> None:
+    """Drop every figure in the process-wide cache."""
+    figure_cache.clear()
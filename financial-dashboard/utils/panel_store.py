@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import set_dataset_version
+
+MANIFEST_NAME = 'manifest.json'
+# Arrays every store holds besides its metric columns
+KEY_ARRAYS = ('bank_offsets', 'bank_codes', 'periods')
+
+def is_panel_store(path: str) -> bool:
+    """
+    Check whether a path is a panel store directory.
+    
+    Args:
+        path (str): Path to check
+        
+    Returns:
+        bool: True if the path holds a panel store manifest
+    """
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_NAME))
+
+def write_panel(df: pd.DataFrame, path: str, bank_column: str = 'Bank Name',
+                period_column: str = 'Period', freq: str = 'Q') -> None:
+    """
+    Write a (bank, period) panel as one NumPy file per metric, sorted by bank then period.
+    
+    Every numeric column other than the keys becomes a float64 metric column.
+    
+    Args:
+        df (pd.DataFrame): Panel data with one row per bank and period
+        path (str): Directory to write the store into
+        bank_column (str): Column holding the bank name
+        period_column (str): Column holding the period
+        freq (str): Pandas period frequency of the panel
+    """
+    periods = pd.PeriodIndex(df[period_column], freq=freq).asi8
+    codes, banks = pd.factorize(df[bank_column], sort=True)
+    if (codes < 0).any():
+        raise ValueError(f"Missing values in '{bank_column}'")
+
+    order = np.lexsort((periods, codes))
+    codes, periods = codes[order], periods[order]
+    duplicated = (np.diff(codes) == 0) & (np.diff(periods) == 0)
+    if duplicated.any():
+        raise ValueError("Duplicate (bank, period) rows in panel data")
+
+    target = Path(path)
+    target.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    # Every write uses new file names, so a rewrite never truncates a file a reader has mapped
+    prefix = uuid.uuid4().hex[:12]
+
+    # Row range of each bank: rows offsets[i]:offsets[i + 1]
+    offsets = np.searchsorted(codes, np.arange(len(banks) + 1))
+    arrays = {name: f"{prefix}_{name}.npy" for name in KEY_ARRAYS}
+    np.save(target / arrays['bank_offsets'], offsets)
+    np.save(target / arrays['bank_codes'], codes.astype(np.int64))
+    np.save(target / arrays['periods'], periods)
+    digest.update(codes.tobytes())
+    digest.update(periods.tobytes())
+
+    metric_columns = [
+        c for c in df.select_dtypes(include='number').columns
+        if c not in (bank_column, period_column)
+    ]
+    metric_files = {}
+    for i, metric in enumerate(metric_columns):
+        values = df[metric].to_numpy(dtype=np.float64)[order]
+        metric_files[metric] = f"{prefix}_metric_{i}.npy"
+        np.save(target / metric_files[metric], values)
+        digest.update(values.tobytes())
+
+    manifest = {
+        'bank_column': bank_column,
+        'period_column': period_column,
+        'freq': freq,
+        'banks': [str(b) for b in banks],
+        'arrays': arrays,
+        'metrics': metric_files,
+        'rows': int(len(codes)),
+        'version': digest.hexdigest()
+    }
+    # Swapping the manifest publishes the new files in one step; until then readers
+    # keep opening the previous write's files, which are left untouched
+    previous = _manifest_files(target)
+    tmp_manifest = target / f"{MANIFEST_NAME}.tmp"
+    with open(tmp_manifest, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_manifest, target / MANIFEST_NAME)
+
+    # Remove older writes' files; the previous write's stay for readers that have read
+    # its manifest but not yet opened its files. Open stores keep their mappings, since
+    # removing a mapped file only unlinks its name.
+    keep = previous | set(arrays.values()) | set(metric_files.values())
+    for stale in target.glob('*.npy'):
+        if stale.name not in keep:
+            try:
+                stale.unlink()
+            except OSError:
+                # Windows refuses to remove mapped files; the next write retries
+                pass
+
+def _manifest_files(path: Path) -> set:
+    try:
+        with open(path / MANIFEST_NAME, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    arrays = manifest.get('arrays', {name: f"{name}.npy" for name in KEY_ARRAYS})
+    return set(arrays.values()) | set(manifest['metrics'].values())
+
+class PanelStore:
+    """
+    Read-only view over a panel store; metric columns are memory-mapped on first use.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        with open(self.path / MANIFEST_NAME, 'r') as f:
+            self.manifest = json.load(f)
+
+        self.bank_column: str = self.manifest['bank_column']
+        self.period_column: str = self.manifest['period_column']
+        self.freq: str = self.manifest['freq']
+        self.version: str = self.manifest['version']
+        self.banks: List[str] = self.manifest['banks']
+        self.metrics: List[str] = list(self.manifest['metrics'])
+        self._bank_names = np.asarray(self.banks, dtype=object)
+        self._bank_codes = {bank: i for i, bank in enumerate(self.banks)}
+        # Stores written before file names were versioned use fixed names
+        files = self.manifest.get('arrays', {name: f"{name}.npy" for name in KEY_ARRAYS})
+        files = {**files, **self.manifest['metrics']}
+        # Mapping every file now pins this version's data even if the store is rewritten;
+        # pages are still only read on first access
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.load(self.path / file_name, mmap_mode='r') for name, file_name in files.items()
+        }
+        self._offsets = np.asarray(self._columns.pop('bank_offsets'))
+
+    def _column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            raise KeyError(f"Unknown metric: {name}")
+        return self._columns[name]
+
+    def _to_ordinal(self, period: Union[str, pd.Period, None]) -> Optional[int]:
+        if period is None:
+            return None
+        return pd.Period(period, freq=self.freq).ordinal
+
+    def _bank_code(self, bank: str) -> int:
+        try:
+            return self._bank_codes[bank]
+        except KeyError:
+            raise KeyError(f"Unknown bank: {bank}") from None
+
+    def _build_frame(self, rows: np.ndarray, metrics: Optional[Iterable[str]]) -> pd.DataFrame:
+        """
+        Gather the given rows; only the pages holding them are read from disk.
+        
+        Args:
+            rows (np.ndarray): Row positions to gather
+            metrics (Iterable[str]): Metrics to include, all metrics if None
+            
+        Returns:
+            pd.DataFrame: The rows, versioned by the store version and the rows taken
+        """
+        metrics = self.metrics if metrics is None else list(metrics)
+        codes = self._column('bank_codes')[rows]
+        periods = self._column('periods')[rows]
+        frame = pd.DataFrame({
+            self.bank_column: self._bank_names[codes],
+            self.period_column: pd.arrays.PeriodArray(
+                np.asarray(periods, dtype=np.int64), dtype=pd.PeriodDtype(self.freq)
+            ).astype(str)
+        })
+        for metric in metrics:
+            frame[metric] = np.asarray(self._column(metric)[rows])
+        # Slices of one version differ by their rows and metrics, so both go into the version
+        digest = hashlib.sha1(np.asarray(rows, dtype=np.int64).tobytes())
+        digest.update('|'.join(metrics).encode('utf-8'))
+        set_dataset_version(frame, f"{self.version}:{digest.hexdigest()[:16]}")
+        return frame
+
+    def slice(self, banks: Optional[Iterable[str]] = None, start: Union[str, pd.Period, None] = None,
+              end: Union[str, pd.Period, None] = None, metrics: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Get the rows for some banks over an inclusive period range.
+        
+        Args:
+            banks (Iterable[str]): Banks to include, all banks if None
+            start (str): First period to include, unbounded if None
+            end (str): Last period to include, unbounded if None
+            metrics (Iterable[str]): Metrics to include, all metrics if None
+            
+        Returns:
+            pd.DataFrame: One row per bank and period
+        """
+        start_ordinal, end_ordinal = self._to_ordinal(start), self._to_ordinal(end)
+        periods = self._column('periods')
+
+        if banks is None:
+            # All banks: filter on the period column alone
+            mask = np.ones(len(periods), dtype=bool)
+            if start_ordinal is not None:
+                mask &= periods >= start_ordinal
+            if end_ordinal is not None:
+                mask &= periods <= end_ordinal
+            return self._build_frame(np.flatnonzero(mask), metrics)
+
+        ranges = []
+        for bank in banks:
+            code = self._bank_code(bank)
+            lo, hi = self._offsets[code], self._offsets[code + 1]
+            # Periods are sorted within each bank's block
+            block = periods[lo:hi]
+            if start_ordinal is not None:
+                lo += np.searchsorted(block, start_ordinal, side='left')
+            if end_ordinal is not None:
+                hi = self._offsets[code] + np.searchsorted(block, end_ordinal, side='right')
+            ranges.append(np.arange(lo, max(lo, hi)))
+        rows = np.concatenate(ranges) if ranges else np.array([], dtype=np.int64)
+        return self._build_frame(rows, metrics)
+
+    def latest(self, metrics: Optional[Iterable[str]] = None,
+               as_of: Union[str, pd.Period, None] = None) -> pd.DataFrame:
+        """
+        Get one row per bank for its latest period.
+        
+        Args:
+            metrics (Iterable[str]): Metrics to include, all metrics if None
+            as_of (str): Latest period to consider, unbounded if None
+            
+        Returns:
+            pd.DataFrame: One row per bank with data on or before as_of
+        """
+        starts, ends = self._offsets[:-1], self._offsets[1:]
+        if as_of is None:
+            rows = ends - 1
+        else:
+            # Sorting by (bank, period) makes a combined key monotonic, so one searchsorted
+            # finds every bank's last row on or before as_of
+            periods = np.asarray(self._column('periods'))
+            base = periods.min()
+            span = int(periods.max() - base) + 1
+            keys = self._column('bank_codes') * span + (periods - base)
+            cutoff = min(max(self._to_ordinal(as_of) - base, -1), span - 1)
+            targets = np.arange(len(self.banks)) * span + cutoff
+            rows = np.searchsorted(keys, targets, side='right') - 1
+        rows = rows[(rows >= starts) & (rows < ends)]
+        return self._build_frame(rows, metrics)
+
+def load_latest_period(path: str) -> pd.DataFrame:
+    """
+    Load the latest period of a panel store.
+    
+    Args:
+        path (str): Panel store directory
+        
+    Returns:
+        pd.DataFrame: One row per bank for its latest period
+    """
+    return PanelStore(path).latest()
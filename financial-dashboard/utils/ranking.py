@@ -0,0 +1,159 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from .data_loader import LOWER_IS_BETTER, STRESS_THRESHOLDS, get_dataset_version
+
+MAX_CACHED_TABLES = 8
+DEFAULT_LEAGUE_SIZE = 25
+# Longest league table the dashboard renders
+MAX_LEAGUE_SIZE = 1000
+
+# Rank tables keyed by dataset version, oldest first
+_rank_cache: Dict[str, 'RankTable'] = {}
+
+class RankTable:
+    """
+    Every bank's rank and percentile on every numeric metric, computed once per dataset version.
+
+    Rank 1 is the best bank, so lower-is-better metrics rank their lowest value first.
+    Ties share the best rank among them. The percentile is the share of ranked banks
+    that a bank does at least as well as, so the best bank is at 100. Banks missing
+    a metric are not ranked on it.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df (pd.DataFrame): Data frame containing bank data
+        """
+        self.version = get_dataset_version(df)
+        self.names = df['Bank Name'].to_numpy(dtype=object)
+        self.metrics: List[str] = df.select_dtypes(include='number').columns.tolist()
+        self._positions = {metric: j for j, metric in enumerate(self.metrics)}
+
+        values = df[self.metrics].to_numpy(dtype=float)
+        signs = np.array([-1.0 if m in LOWER_IS_BETTER else 1.0 for m in self.metrics])
+        self.values = values
+        # Signed so that higher is always better; missing values stay NaN
+        self.scores = values * signs
+
+        ranks = pd.DataFrame(self.scores).rank(method='min', ascending=False).to_numpy()
+        self.counts = np.count_nonzero(~np.isnan(self.scores), axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percentiles = (self.counts - ranks + 1) / self.counts * 100
+        # float32 holds ranks exactly up to 16 million banks
+        self.ranks = ranks.astype(np.float32)
+        self.percentiles = percentiles.astype(np.float32)
+
+        with warnings.catch_warnings():
+            # Metrics no bank reports summarize to NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            stats = {
+                'mean': np.nanmean(values, axis=0),
+                'min': np.nanmin(values, axis=0),
+                'max': np.nanmax(values, axis=0),
+                'median': np.nanmedian(values, axis=0)
+            }
+        self.stats = pd.DataFrame(stats, index=self.metrics).assign(count=self.counts)
+
+    def has_metric(self, metric: str) -> bool:
+        """
+        Check whether a metric is ranked.
+
+        Args:
+            metric (str): Metric name
+
+        Returns:
+            bool: True if the metric is a numeric column of the dataset
+        """
+        return metric in self._positions
+
+    def get_stats(self, metric: str) -> pd.Series:
+        """
+        Get a metric's precomputed summary statistics.
+
+        Args:
+            metric (str): Metric name
+
+        Returns:
+            pd.Series: mean, min, max, median and count of the banks reporting it
+        """
+        return self.stats.loc[metric]
+
+    def top_positions(self, metric: str, n: int, bottom: bool = False) -> np.ndarray:
+        """
+        Get the rows of the n best (or worst) banks on a metric, best first (or worst first).
+
+        Uses argpartition, so only the selected n banks are sorted.
+
+        Args:
+            metric (str): Metric name
+            n (int): Number of banks
+            bottom (bool): Select the worst banks instead of the best
+
+        Returns:
+            np.ndarray: Row positions in ranking order; banks missing the metric are never selected
+        """
+        scores = self.scores[:, self._positions[metric]]
+        valid = np.flatnonzero(~np.isnan(scores))
+        # Sorting keys: ascending key order is the order wanted
+        keys = scores[valid] if bottom else -scores[valid]
+        n = max(0, min(n, len(valid)))
+        if n < len(valid):
+            selected = np.argpartition(keys, n - 1)[:n] if n else np.array([], dtype=np.intp)
+        else:
+            selected = np.arange(len(valid))
+        # Ties are listed in file order
+        order = np.lexsort((valid[selected], keys[selected]))
+        return valid[selected[order]]
+
+    def league_table(self, metric: str, n: Optional[int] = DEFAULT_LEAGUE_SIZE, bottom: bool = False) -> pd.DataFrame:
+        """
+        Build the league table rows for a metric.
+
+        Args:
+            metric (str): Metric name
+            n (Optional[int]): Number of banks; None for every ranked bank
+            bottom (bool): List the worst banks instead of the best
+
+        Returns:
+            pd.DataFrame: Rank, bank name, value, percentile and, for metrics with a
+                regulatory threshold, whether the bank passes it
+        """
+        j = self._positions[metric]
+        positions = self.top_positions(metric, len(self.names) if n is None else n, bottom)
+        values = self.values[positions, j]
+        table = pd.DataFrame({
+            'Rank': self.ranks[positions, j].astype(np.int64),
+            'Bank Name': self.names[positions],
+            metric: values,
+            'Percentile': self.percentiles[positions, j].round(1)
+        })
+        if metric in STRESS_THRESHOLDS:
+            threshold = STRESS_THRESHOLDS[metric]
+            table['Passes'] = values <= threshold if metric in LOWER_IS_BETTER else values >= threshold
+        return table
+
+def get_rank_table(df: pd.DataFrame) -> RankTable:
+    """
+    Get the cached rank table for this dataset version.
+
+    Args:
+        df (pd.DataFrame): Data frame containing bank data
+
+    Returns:
+        RankTable: Ranks, percentiles and summary statistics for every numeric metric
+    """
+    version = get_dataset_version(df)
+    if version not in _rank_cache:
+        if len(_rank_cache) >= MAX_CACHED_TABLES:
+            _rank_cache.pop(next(iter(_rank_cache)))
+        _rank_cache[version] = RankTable(df)
+    return _rank_cache[version]
+
+def clear_rank_cache() -> None:
+    """Drop every cached rank table."""
+    _rank_cache.clear()
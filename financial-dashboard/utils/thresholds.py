@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+from .data_loader import STRESS_THRESHOLDS, LOWER_IS_BETTER
+
+def build_threshold_rules(thresholds: Dict[str, float], lower_is_better: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    Build a threshold rule table from a thresholds mapping.
+    
+    Args:
+        thresholds (Dict[str, float]): Threshold bound per metric
+        lower_is_better (Iterable[str]): Metrics that pass at or below their bound
+        
+    Returns:
+        pd.DataFrame: Rule table with metric, bound and direction columns
+    """
+    lower_is_better = set(lower_is_better)
+    return pd.DataFrame({
+        'metric': list(thresholds.keys()),
+        'bound': [float(v) for v in thresholds.values()],
+        'direction': ['lower' if m in lower_is_better else 'higher' for m in thresholds]
+    })
+
+# The default rule table is built once at import instead of on every check
+THRESHOLD_RULES = build_threshold_rules(STRESS_THRESHOLDS, LOWER_IS_BETTER)
+
+def get_threshold_rules() -> pd.DataFrame:
+    """
+    Get the default threshold rule table.
+    
+    Returns:
+        pd.DataFrame: Rule table with metric, bound and direction columns
+    """
+    return THRESHOLD_RULES
+
+def evaluate_thresholds(df: pd.DataFrame, rules: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Evaluate every threshold rule against every bank in one vectorized pass.
+    
+    Args:
+        df (pd.DataFrame): Data frame containing bank data
+        rules (pd.DataFrame): Rule table, defaults to the regulatory thresholds
+        
+    Returns:
+        pd.DataFrame: Boolean pass mask (banks x metrics) for the rules whose
+            metric is present in df; missing values never pass
+    """
+    if rules is None:
+        rules = THRESHOLD_RULES
+    rules = rules[rules['metric'].isin(df.columns)]
+    metrics = rules['metric'].tolist()
+    
+    values = df[metrics].to_numpy(dtype=float, na_value=np.nan)
+    bounds = rules['bound'].to_numpy(dtype=float)
+    # Flip the sign of lower-is-better metrics so every rule reads "value >= bound"
+    signs = np.where(rules['direction'].to_numpy() == 'lower', -1.0, 1.0)
+    with np.errstate(invalid='ignore'):
+        passed = values * signs >= bounds * signs
+    
+    return pd.DataFrame(passed, index=df.index, columns=metrics)
+
+def get_breach_summary(df: pd.DataFrame, rules: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    List every bank and metric pair whose value fails its threshold.
+    
+    Missing values are left out; the data-quality report lists them.
+    
+    Args:
+        df (pd.DataFrame): Data frame containing bank data
+        rules (pd.DataFrame): Rule table, defaults to the regulatory thresholds
+        
+    Returns:
+        pd.DataFrame: One row per breach with bank name, metric, value and threshold
+    """
+    if rules is None:
+        rules = THRESHOLD_RULES
+    mask = evaluate_thresholds(df, rules)
+    values = df[mask.columns].to_numpy(dtype=float, na_value=np.nan)
+    # Missing values never pass, but they aren't breaches; the data-quality report lists them
+    rows, cols = np.nonzero(~mask.to_numpy() & ~np.isnan(values))
+    metrics = mask.columns.to_numpy()[cols]
+    bounds = rules.set_index('metric')['bound']
+    
+    return pd.DataFrame({
+        'Bank Name': df['Bank Name'].to_numpy()[rows],
+        'Metric': metrics,
+        'Value': values[rows, cols],
+        'Threshold': bounds.reindex(metrics).to_numpy()
+    })
@@ -0,0 +1,92 @@
+import numpy as np
+
+from grading import get_dataset_version
+
+MAX_CACHED_STORES = 8
+
+# Bank stores keyed by dataset version, oldest first
+_store_cache = {}
+
+
+def _first_positions(values):
+    """Map each distinct value to the row position it first appears at"""
+    # Positional, so a non-unique index doesn't matter
+    first = ~values.duplicated().to_numpy()
+    return dict(zip(values.to_numpy()[first], np.flatnonzero(first).tolist()))
+
+
+class BankStore:
+    """Row index over the bank data for constant-time per-bank lookups"""
+
+    def __init__(self, bank_data, name_column='Bank Name', id_column=None):
+        self.bank_data = bank_data
+        self.name_column = name_column
+        self.id_column = id_column
+
+        # The first row wins for duplicate names, matching the old boolean-mask lookups
+        self._positions = _first_positions(bank_data[name_column])
+        self._id_positions = {}
+        if id_column is not None and id_column in bank_data.columns:
+            self._id_positions = _first_positions(bank_data[id_column])
+
+        self.metrics = bank_data.select_dtypes(include='number').columns.tolist()
+        self._metric_positions = {metric: i for i, metric in enumerate(self.metrics)}
+        self._values = None
+
+    @property
+    def values(self):
+        """Every numeric column as one float64 matrix, built on the first row access"""
+        # Most callers only need positions, so the copy isn't made up front
+        if self._values is None:
+            self._values = self.bank_data[self.metrics].to_numpy(dtype=float, na_value=np.nan)
+        return self._values
+
+    def __contains__(self, bank_name):
+        return bank_name in self._positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def position(self, bank_name):
+        """Return the row position of a bank"""
+        try:
+            return self._positions[bank_name]
+        except KeyError:
+            raise KeyError(f"Unknown bank: {bank_name}") from None
+
+    def position_by_id(self, bank_id):
+        """Return the row position of a bank by its ID"""
+        try:
+            return self._id_positions[bank_id]
+        except KeyError:
+            raise KeyError(f"Unknown bank ID: {bank_id}") from None
+
+    def get_row(self, bank_name):
+        """Return a bank's full row"""
+        return self.bank_data.iloc[self.position(bank_name)]
+
+    def get_vector(self, bank_name, metrics=None):
+        """Return a bank's metric values as a NumPy vector"""
+        row = self.values[self.position(bank_name)]
+        if metrics is None:
+            return row
+        return row[[self._metric_positions[m] for m in metrics]]
+
+    def get_value(self, bank_name, metric):
+        """Return a single metric value for a bank"""
+        return self.values[self.position(bank_name), self._metric_positions[metric]]
+
+
+def get_bank_store(bank_data, id_column=None):
+    """Return the cached bank store for this dataset version"""
+    key = (get_dataset_version(bank_data), id_column)
+    if key not in _store_cache:
+        if len(_store_cache) >= MAX_CACHED_STORES:
+            _store_cache.pop(next(iter(_store_cache)))
+        _store_cache[key] = BankStore(bank_data, id_column=id_column)
+    return _store_cache[key]
+
+
+def clear_store_cache():
+    """Drop every cached bank store"""
+    _store_cache.clear()
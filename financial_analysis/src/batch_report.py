@@ -0,0 +1,205 @@
+import argparse
+import html
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from plotly.offline import get_plotlyjs
+
+from bank_store import get_bank_store
+from grading import get_dataset_version, get_grade_table, set_grade_table
+from utils import ROLES, create_radar_chart, get_metric_analysis, get_role_metrics, update_radar_chart
+from warmup import read_data
+
+REPORT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'reports'))
+# Banks per task: large enough to amortize task overhead, small enough to balance the workers
+DEFAULT_CHUNK_SIZE = 50
+PLOTLY_JS = 'plotly.min.js'
+
+# Set once per worker process by _init_worker
+_worker_state = {}
+
+
+def get_available_role_metrics(bank_data):
+    """Return each role's metrics that the dataset has"""
+    return {
+        role: {metric: info for metric, info in get_role_metrics(role).items() if metric in bank_data.columns}
+        for role in ROLES
+    }
+
+
+def _init_worker(bank_data, grade_table, role_metrics, pages_dir):
+    """Receive the dataset and its grade table once per worker, instead of once per task"""
+    set_grade_table(bank_data, grade_table)
+    _worker_state.update(bank_data=bank_data, role_metrics=role_metrics, pages_dir=pages_dir, figures={})
+
+
+def _to_json_value(value):
+    """Return a JSON-safe version of a scalar: NumPy types become Python ones, NaN becomes null"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def get_page_name(position):
+    """Return the report page file name for a bank; bank names aren't safe file names"""
+    return f"bank-{position:06d}.html"
+
+
+def render_page(title, body, plotly_src=None):
+    """Return a static HTML page, loading Plotly from plotly_src if the page has charts"""
+    script = f"<script src=\"{plotly_src}\"></script>\n" if plotly_src else ""
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{html.escape(title)}</title>\n{script}"
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:left}</style>\n"
+        f"</head>\n<body>\n<h1>{html.escape(title)}</h1>\n{body}\n</body>\n</html>\n"
+    )
+
+
+def render_role_section(role, analysis, fig):
+    """Return the HTML for one role: the metric table and the radar chart"""
+    rows = "".join(
+        f"<tr><td>{html.escape(metric)}</td><td>{result['value']:.2f}</td><td>{result['grade']}</td>"
+        f"<td>{result['threshold']}</td><td>{result['status']}</td></tr>"
+        for metric, result in analysis.items()
+    )
+    return (
+        f"<h2>{html.escape(role)}</h2>\n"
+        "<table><tr><th>Metric</th><th>Value</th><th>Grade</th><th>Threshold</th><th>Status</th></tr>"
+        f"{rows}</table>\n"
+        f"{fig.to_html(full_html=False, include_plotlyjs=False)}"
+    )
+
+
+def build_bank_report(bank_data, bank_name, role_metrics, pages_dir, figures):
+    """Analyze and chart one bank for every role, write its page and return its scorecard entry
+
+    ``figures`` holds one radar chart per role, created on first use and restyled for
+    every later bank, which is over ten times faster than creating a chart per bank.
+    """
+    position = get_bank_store(bank_data).position(bank_name)
+    roles = {}
+    sections = []
+    for role, metrics in role_metrics.items():
+        if not metrics:
+            continue
+        analysis = get_metric_analysis(bank_data, bank_name, metrics)
+        roles[role] = {
+            metric: {key: _to_json_value(value) for key, value in result.items() if key != 'description'}
+            for metric, result in analysis.items()
+        }
+        if role in figures:
+            fig = update_radar_chart(figures[role], bank_data, bank_name, metrics)
+        else:
+            fig = figures[role] = create_radar_chart(bank_data, bank_name, metrics)
+        sections.append(render_role_section(role, analysis, fig))
+
+    page = get_page_name(position)
+    with open(os.path.join(pages_dir, page), 'w', encoding='utf-8') as f:
+        # Bank pages sit one level below the shared copy of Plotly
+        f.write(render_page(bank_name, "\n".join(sections), plotly_src=f"../{PLOTLY_JS}"))
+    return {'bank': bank_name, 'page': f"banks/{page}", 'roles': roles}
+
+
+def _report_chunk(bank_names):
+    """Build the reports for one task's banks in a worker"""
+    state = _worker_state
+    return [
+        build_bank_report(state['bank_data'], name, state['role_metrics'], state['pages_dir'], state['figures'])
+        for name in bank_names
+    ]
+
+
+def render_index(reports, role_metrics):
+    """Return the index page: every bank's grades per role, linking to its page"""
+    roles = [role for role, metrics in role_metrics.items() if metrics]
+    header = "".join(f"<th>{html.escape(role)}</th>" for role in roles)
+
+    def summary(report, role):
+        results = report['roles'].get(role, {})
+        grades = "".join(result['grade'] for result in results.values())
+        passed = sum(result['status'] == 'Good' for result in results.values())
+        return f"{grades} ({passed}/{len(results)} at threshold)"
+
+    rows = "".join(
+        f"<tr><td><a href=\"{report['page']}\">{html.escape(report['bank'])}</a></td>"
+        + "".join(f"<td>{summary(report, role)}</td>" for role in roles)
+        + "</tr>"
+        for report in reports
+    )
+    body = f"<table><tr><th>Bank</th>{header}</tr>{rows}</table>"
+    return render_page(f"Bank scorecard ({len(reports)} banks)", body)
+
+
+def run_batch_report(bank_data, output_dir=REPORT_DIR, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Grade and chart every bank for every role across a process pool and write the report
+
+    The grade table (the cross-sectional percentile cut points) is computed once here
+    and handed to each worker when it starts, so tasks only carry bank names.
+    """
+    version = get_dataset_version(bank_data)
+    grade_table = get_grade_table(bank_data)
+    role_metrics = get_available_role_metrics(bank_data)
+
+    pages_dir = os.path.join(output_dir, 'banks')
+    os.makedirs(pages_dir, exist_ok=True)
+    with open(os.path.join(output_dir, PLOTLY_JS), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+
+    # Lookups resolve duplicate names to their first row, so each name is reported once
+    bank_names = bank_data['Bank Name'].drop_duplicates().tolist()
+    chunks = [bank_names[i:i + chunk_size] for i in range(0, len(bank_names), chunk_size)]
+    init_args = (bank_data, grade_table, role_metrics, pages_dir)
+    if workers == 1:
+        _init_worker(*init_args)
+        results = [_report_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+            results = list(pool.map(_report_chunk, chunks))
+    reports = [report for chunk in results for report in chunk]
+
+    _, cuts = grade_table
+    scorecard = {
+        'dataset_version': version,
+        'banks': len(reports),
+        'cut_points': {
+            metric: {'p25': _to_json_value(row['p25']), 'p75': _to_json_value(row['p75'])}
+            for metric, row in cuts.iterrows()
+        },
+        'reports': reports
+    }
+    with open(os.path.join(output_dir, 'scorecard.json'), 'w', encoding='utf-8') as f:
+        json.dump(scorecard, f, indent=2)
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(render_index(reports, role_metrics))
+    return scorecard
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the scorecard for every bank and role.")
+    parser.add_argument('--data', help="Bank data file to grade (default: the app's data file)")
+    parser.add_argument('--output', default=REPORT_DIR, help="Report directory to write")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per core)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Banks per task")
+    args = parser.parse_args()
+
+    bank_data = read_data(args.data)
+    if bank_data is None:
+        sys.exit("Could not load the bank data")
+
+    start = time.perf_counter()
+    scorecard = run_batch_report(bank_data, args.output, args.workers, args.chunk_size)
+    print(f"Scorecard for {scorecard['banks']} banks written to {args.output} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
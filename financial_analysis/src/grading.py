@@ -0,0 +1,153 @@
+import hashlib
+import os
+import weakref
+
+import numpy as np
+import pandas as pd
+
+GRADE_LABELS = np.array(['C', 'B', 'A'])
+MAX_CACHED_TABLES = 8
+# Grade tables pre-built by warmup.py, keyed by dataset version and metrics
+GRADE_CACHE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', '.snapshots'))
+
+# Grade tables keyed by (dataset version, metrics), oldest first
+_grade_cache = {}
+
+
+class DatasetOwner:
+    """Weak reference to the frame a dataset version was stamped on
+
+    Deep copies keep pointing at the stamped frame, and pickles point at nothing,
+    so neither a derived frame nor one sent to a worker process passes for it.
+    """
+    __slots__ = ('_ref',)
+
+    def __init__(self, bank_data=None):
+        self._ref = None if bank_data is None else weakref.ref(bank_data)
+
+    def __call__(self):
+        return None if self._ref is None else self._ref()
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return DatasetOwner, ()
+
+
+def get_dataset_version(bank_data):
+    """Return a content hash identifying this version of the dataset"""
+    version = bank_data.attrs.get('dataset_version')
+    owner = bank_data.attrs.get('dataset_owner')
+    # attrs are copied into derived frames, such as sorted or edited copies, but the
+    # owner still points at the stamped frame, so only trust it there
+    if version is None or owner is None or owner() is not bank_data or bank_data.attrs.get('dataset_shape') != bank_data.shape:
+        row_hashes = pd.util.hash_pandas_object(bank_data, index=False).to_numpy()
+        digest = hashlib.sha256(row_hashes.tobytes())
+        digest.update('|'.join(map(str, bank_data.columns)).encode('utf-8'))
+        version = digest.hexdigest()
+        bank_data.attrs['dataset_version'] = version
+        bank_data.attrs['dataset_owner'] = DatasetOwner(bank_data)
+        bank_data.attrs['dataset_shape'] = bank_data.shape
+    return version
+
+
+def get_numeric_metrics(bank_data):
+    """Return every numeric metric column in the dataset"""
+    return bank_data.select_dtypes(include='number').columns.tolist()
+
+
+def get_cut_points(bank_data, metrics):
+    """Compute the 25th and 75th percentile cut points for every metric at once"""
+    values = bank_data[metrics].to_numpy(dtype=float)
+    p25, p75 = np.nanpercentile(values, [25, 75], axis=0)
+    return pd.DataFrame({'p25': p25, 'p75': p75}, index=metrics)
+
+
+def build_grade_table(bank_data, metrics=None):
+    """Grade every bank on every metric in one vectorized pass"""
+    if metrics is None:
+        metrics = get_numeric_metrics(bank_data)
+    cuts = get_cut_points(bank_data, metrics)
+    values = bank_data[metrics].to_numpy(dtype=float)
+
+    # Counting the cut points at or below each value is a broadcast searchsorted:
+    # 0 -> below p25 (C), 1 -> between p25 and p75 (B), 2 -> at or above p75 (A)
+    with np.errstate(invalid='ignore'):
+        positions = (values >= cuts['p25'].to_numpy()).astype(np.int8)
+        positions += values >= cuts['p75'].to_numpy()
+
+    grades = pd.DataFrame(GRADE_LABELS[positions], index=bank_data.index, columns=metrics)
+    return grades, cuts
+
+
+def get_grade_table_path(bank_data, metrics, cache_dir=GRADE_CACHE_DIR):
+    """Return the file a pre-built grade table for this dataset version and metrics lives in"""
+    metrics_key = hashlib.sha1('|'.join(metrics).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, f"grades-{get_dataset_version(bank_data)[:16]}-{metrics_key}.npz")
+
+
+def save_grade_table(bank_data, metrics=None, cache_dir=GRADE_CACHE_DIR):
+    """Build a grade table and write it to disk, replacing any previous file atomically"""
+    if metrics is None:
+        metrics = get_numeric_metrics(bank_data)
+    grades, cuts = get_grade_table(bank_data, metrics)
+    path = get_grade_table_path(bank_data, metrics, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(
+        tmp_path,
+        grades=grades.to_numpy(dtype=GRADE_LABELS.dtype),
+        metrics=np.array(metrics),
+        p25=cuts['p25'].to_numpy(),
+        p75=cuts['p75'].to_numpy()
+    )
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_grade_table(bank_data, metrics, cache_dir=GRADE_CACHE_DIR):
+    """Return a pre-built grade table and cut points from disk, or None if there is none"""
+    path = get_grade_table_path(bank_data, metrics, cache_dir)
+    try:
+        with np.load(path, allow_pickle=False) as saved:
+            if saved['metrics'].tolist() != list(metrics) or len(saved['grades']) != len(bank_data):
+                return None
+            grades = pd.DataFrame(saved['grades'], index=bank_data.index, columns=list(metrics))
+            cuts = pd.DataFrame({'p25': saved['p25'], 'p75': saved['p75']}, index=list(metrics))
+    except (OSError, ValueError, KeyError):
+        return None
+    return grades, cuts
+
+
+def get_grade_table(bank_data, metrics=None):
+    """Return the cached grade table and cut points for this dataset version
+
+    Tables are looked up in memory, then on disk, and only built on a miss in both.
+    """
+    if metrics is None:
+        metrics = get_numeric_metrics(bank_data)
+    key = (get_dataset_version(bank_data), tuple(metrics))
+    if key not in _grade_cache:
+        if len(_grade_cache) >= MAX_CACHED_TABLES:
+            _grade_cache.pop(next(iter(_grade_cache)))
+        table = load_grade_table(bank_data, list(metrics))
+        if table is None:
+            table = build_grade_table(bank_data, list(metrics))
+        _grade_cache[key] = table
+    return _grade_cache[key]
+
+
+def set_grade_table(bank_data, table, metrics=None):
+    """Cache a grade table built elsewhere, such as in a parent process, for this dataset version"""
+    if metrics is None:
+        metrics = get_numeric_metrics(bank_data)
+    key = (get_dataset_version(bank_data), tuple(metrics))
+    if key not in _grade_cache and len(_grade_cache) >= MAX_CACHED_TABLES:
+        _grade_cache.pop(next(iter(_grade_cache)))
+    _grade_cache[key] = table
+
+
+def clear_grade_cache():
+    """Drop every cached grade table"""
+    _grade_cache.clear()
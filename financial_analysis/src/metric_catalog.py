@@ -0,0 +1,23 @@
+"""The shared metric catalog, loaded from Bank Stax Pro/utils/metric_catalog.py.
+
+There is one catalog for all three apps. This module loads that file and
+re-exports everything in it, so the catalog is edited in one place only.
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+CATALOG_PATH = Path(__file__).resolve().parents[2] / 'Bank Stax Pro' / 'utils' / 'metric_catalog.py'
+# Registered under its own name, so apps loaded into one process share a single copy
+_MODULE_NAME = 'shared_metric_catalog'
+
+def _load_catalog():
+    module = sys.modules.get(_MODULE_NAME)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(_MODULE_NAME, CATALOG_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[_MODULE_NAME] = module
+        spec.loader.exec_module(module)
+    return module
+
+globals().update({name: value for name, value in vars(_load_catalog()).items() if not name.startswith('__')})
@@ -2,6 +2,19 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 
+from grading import get_grade_table
+from bank_store import get_bank_store
+from metric_catalog import ROLE_METRICS, ROLES
+
+# Each role's metrics and thresholds, built once from the shared metric catalog
+_ROLE_METRICS = {
+    role: {
+        metric.name: {'threshold': metric.role_threshold, 'description': metric.description}
+        for metric in metrics
+    }
+    for role, metrics in ROLE_METRICS.items()
+}
+
 def load_data():
     """Load and prepare the bank data"""
     try:
@@ -25,60 +38,69 @@ def calculate_grade(value, series):
 
 def get_role_metrics(role):
     """Return relevant metrics based on user role"""
-    depositor_metrics = {
-        'Capital Ratio': {'threshold': 12, 'description': 'Measures bank\'s capital strength'},
-        'Liquidity Ratio': {'threshold': 100, 'description': 'Indicates bank\'s ability to meet short-term obligations'},
-        'NPL Ratio': {'threshold': 3, 'description': 'Shows quality of loan portfolio (lower is better)'},
-        'ROE': {'threshold': 15, 'description': 'Indicates profitability and efficiency'}
-    }
+    return _ROLE_METRICS['Depositor' if role == "Depositor" else 'Borrower']
+
+def grade_all_roles(bank_data):
+    """Grade every bank for every role in one batch over a shared grade table"""
+    role_metrics = {role: list(get_role_metrics(role)) for role in ROLES}
+    grades, _ = get_grade_table(bank_data)
     
-    borrower_metrics = {
-        'Interest Coverage Ratio': {'threshold': 2.5, 'description': 'Ability to pay interest on debt'},
-        'Debt Service Coverage Ratio': {'threshold': 1.8, 'description': 'Ability to service total debt'},
-        'Cost-to-Income Ratio': {'threshold': 55, 'description': 'Operational efficiency (lower is better)'},
-        'Loan-to-Deposit Ratio': {'threshold': 85, 'description': 'Lending practice sustainability'}
+    return {
+        role: grades[[m for m in metrics if m in grades.columns]]
+        for role, metrics in role_metrics.items()
     }
-    
-    return depositor_metrics if role == "Depositor" else borrower_metrics
 
 def create_radar_chart(bank_data, selected_bank, metrics):
     """Create a radar chart for the selected bank's metrics"""
-    bank_values = []
-    metric_names = list(metrics.keys())
-    
-    for metric in metric_names:
-        bank_values.append(bank_data[bank_data['Bank Name'] == selected_bank][metric].values[0])
-    
     fig = go.Figure()
     
     fig.add_trace(go.Scatterpolar(
-        r=bank_values,
-        theta=metric_names,
-        fill='toself',
-        name=selected_bank
+        theta=list(metrics.keys()),
+        fill='toself'
     ))
     
     fig.update_layout(
         polar=dict(
             radialaxis=dict(
-                visible=True,
-                range=[0, max(bank_values) * 1.2]
+                visible=True
             )),
         showlegend=True,
-        template="plotly_dark",
-        title=f"Financial Metrics Radar Chart - {selected_bank}"
+        template="plotly_dark"
     )
     
+    return update_radar_chart(fig, bank_data, selected_bank, metrics)
+
+def update_radar_chart(fig, bank_data, selected_bank, metrics):
+    """Point a radar chart at another bank's metrics
+
+    Applying the dark template dominates building a figure, so batch jobs restyle
+    one figure per role instead of creating one per bank.
+    """
+    metric_names = list(metrics.keys())
+    bank_values = get_bank_store(bank_data).get_vector(selected_bank, metric_names).tolist()
+    
+    # Setting properties directly skips update_layout's copy of the template
+    trace = fig.data[0]
+    trace.r = bank_values
+    trace.theta = metric_names
+    trace.name = selected_bank
+    fig.layout.polar.radialaxis.range = [0, max(bank_values) * 1.2]
+    fig.layout.title.text = f"Financial Metrics Radar Chart - {selected_bank}"
+    
     return fig
 
 def get_metric_analysis(bank_data, selected_bank, metrics):
     """Generate detailed analysis for each metric"""
     analysis = {}
-    bank_row = bank_data[bank_data['Bank Name'] == selected_bank]
+    store = get_bank_store(bank_data)
+    position = store.position(selected_bank)
+    # Cut points and grades are computed once per dataset version
+    grades, _ = get_grade_table(bank_data)
+    bank_grades = grades.iloc[position]
     
     for metric, info in metrics.items():
-        value = bank_row[metric].values[0]
-        grade = calculate_grade(value, bank_data[metric])
+        value = store.get_value(selected_bank, metric)
+        grade = bank_grades[metric]
         
         analysis[metric] = {
             'value': value,
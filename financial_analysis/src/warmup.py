@@ -0,0 +1,44 @@
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from bank_store import get_bank_store
+from grading import get_numeric_metrics, save_grade_table
+from utils import load_data
+
+
+def read_data(path=None):
+    """Return the bank data from a path, or from the app's default data file"""
+    if path is None:
+        return load_data()
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+
+def warm_up(bank_data):
+    """Pre-build the grade tables the app grades every role with"""
+    start = time.perf_counter()
+    path = save_grade_table(bank_data, get_numeric_metrics(bank_data))
+    print(f"Grade table for {len(bank_data)} banks written to {path} in {time.perf_counter() - start:.2f}s")
+
+    # Building the row index also checks the bank names before the first user does
+    store = get_bank_store(bank_data)
+    print(f"Bank index covers {len(store)} banks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-build grade tables at deploy time.")
+    parser.add_argument('--data', help="Bank data file to grade (default: the app's data file)")
+    args = parser.parse_args()
+
+    bank_data = read_data(args.data)
+    if bank_data is None:
+        sys.exit("Could not load the bank data")
+    warm_up(bank_data)
+
+
+if __name__ == "__main__":
+    main()